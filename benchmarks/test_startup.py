@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+from src.scripts.profile_startup import time_to_first_request
+
+APP_MODULE = "src.app.main"
+STARTUP_BUDGET = float(os.environ.get("STARTUP_BUDGET", "2.0"))
+LAZY_DEPENDENCIES = ("boto3", "botocore", "qrcode", "PIL")
+
+
+def test_heavy_dependencies_are_not_imported_at_startup() -> None:
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import json, sys, {APP_MODULE}; "
+            f"print(json.dumps([m for m in {LAZY_DEPENDENCIES!r} if m in sys.modules]))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
+
+
+def test_time_to_first_request_is_within_budget() -> None:
+    timings = time_to_first_request(APP_MODULE)
+    assert timings["total"] < STARTUP_BUDGET, timings
@@ -1,3 +1,4 @@
+from collections.abc import AsyncGenerator, Callable, Coroutine
 from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, Request
@@ -8,6 +9,8 @@ from ..core.db.database import async_get_db
 from ..core.exceptions.http_exceptions import ForbiddenException, RateLimitException, UnauthorizedException
 from ..core.logger import logging
 from ..core.security import oauth2_scheme, verify_token
+from ..core.utils import analytics
+from ..core.utils.client_ip import get_client_ip, rate_limit_bucket
 from ..core.utils.rate_limit import is_rate_limited
 from ..crud.crud_rate_limit import crud_rate_limits
 from ..crud.crud_tier import crud_tiers
@@ -19,11 +22,26 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_LIMIT = settings.DEFAULT_RATE_LIMIT_LIMIT
 DEFAULT_PERIOD = settings.DEFAULT_RATE_LIMIT_PERIOD
+MENU_LIMIT = settings.MENU_RATE_LIMIT_LIMIT
+MENU_PERIOD = settings.MENU_RATE_LIMIT_PERIOD
+UPLOAD_COST = settings.UPLOAD_RATE_LIMIT_COST
+UPLOAD_LIMIT = settings.UPLOAD_RATE_LIMIT_LIMIT
+UPLOAD_PERIOD = settings.UPLOAD_RATE_LIMIT_PERIOD
 
 
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[AsyncSession, Depends(async_get_db)]
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> dict[str, Any] | None:
+    """Resolve the user of a bearer token.
+
+    The user is kept in `request.state` with its token, so the sub-requests of a batch (see `api.v1.batch`), which
+    inherit the batch request's state and credentials, do not verify the token and look the user up again.
+    """
+    if getattr(request.state, "user_token", None) == token:
+        return request.state.user
+
     token_data = await verify_token(token, db)
     if token_data is None:
         raise UnauthorizedException("User not authenticated.")
@@ -34,6 +52,8 @@ async def get_current_user(
         user = await crud_users.get(db=db, username=token_data.username_or_email, is_deleted=False)
 
     if user:
+        request.state.user_token = token
+        request.state.user = user
         return user
 
     raise UnauthorizedException("User not authenticated.")
@@ -53,7 +73,7 @@ async def get_optional_user(request: Request, db: AsyncSession = Depends(async_g
         if token_data is None:
             return None
 
-        return await get_current_user(token_value, db=db)
+        return await get_current_user(request, token_value, db=db)
 
     except HTTPException as http_exc:
         if http_exc.status_code != 401:
@@ -72,30 +92,76 @@ async def get_current_superuser(current_user: Annotated[dict, Depends(get_curren
     return current_user
 
 
-async def rate_limiter(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], user: User | None = Depends(get_optional_user)
-) -> None:
-    path = sanitize_path(request.url.path)
-    if user:
-        user_id = user["id"]
-        tier = await crud_tiers.get(db, id=user["tier_id"])
-        if tier:
-            rate_limit = await crud_rate_limits.get(db=db, tier_id=tier["id"], path=path)
-            if rate_limit:
-                limit, period = rate_limit["limit"], rate_limit["period"]
+def create_rate_limiter(
+    cost: int = 1, limit: int | None = None, period: int | None = None, scope: str | None = None
+) -> Callable[..., Coroutine[Any, Any, None]]:
+    """Build a rate limiting dependency.
+
+    Logged in users are limited per tier by the matching `RateLimit` rule, whose `cost` overrides the one given here.
+    Anonymous callers are limited by network (see `rate_limit_bucket`), using the address found behind trusted proxies.
+
+    Parameters
+    ----------
+    cost: int, default 1
+        Units a request consumes when no rule says otherwise, e.g. 10 for an upload and 1 for a read.
+    limit: int | None
+        Units allowed per period without a rule; defaults to `DEFAULT_RATE_LIMIT_LIMIT`.
+    period: int | None
+        Window length in seconds without a rule; defaults to `DEFAULT_RATE_LIMIT_PERIOD`.
+    scope: str | None
+        A name shared by several routes so they draw from one bucket; defaults to the request path.
+    """
+    default_limit = limit or DEFAULT_LIMIT
+    default_period = period or DEFAULT_PERIOD
+    default_cost = cost
+
+    async def rate_limiter(
+        request: Request,
+        db: Annotated[AsyncSession, Depends(async_get_db)],
+        user: User | None = Depends(get_optional_user),
+    ) -> None:
+        path = sanitize_path(scope or request.url.path)
+        limit, period, cost = default_limit, default_period, default_cost
+        if user:
+            user_id = user["id"]
+            tier = await crud_tiers.get(db, id=user["tier_id"])
+            if tier:
+                rate_limit = await crud_rate_limits.get(db=db, tier_id=tier["id"], path=path)
+                if rate_limit:
+                    limit, period, cost = rate_limit["limit"], rate_limit["period"], rate_limit["cost"]
+                else:
+                    logger.warning(
+                        f"User {user_id} with tier '{tier['name']}' has no specific rate limit for path '{path}'. \
+                            Applying default rate limit."
+                    )
             else:
-                logger.warning(
-                    f"User {user_id} with tier '{tier['name']}' has no specific rate limit for path '{path}'. \
-                        Applying default rate limit."
-                )
-                limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
+                logger.warning(f"User {user_id} has no assigned tier. Applying default rate limit.")
         else:
-            logger.warning(f"User {user_id} has no assigned tier. Applying default rate limit.")
-            limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
-    else:
-        user_id = request.client.host
-        limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
+            user_id = rate_limit_bucket(get_client_ip(request) or "unknown")
+
+        is_limited = await is_rate_limited(db=db, user_id=user_id, path=path, limit=limit, period=period, cost=cost)
+        if is_limited:
+            raise RateLimitException("Rate limit exceeded.")
+
+    return rate_limiter
+
+
+rate_limiter = create_rate_limiter()
+menu_rate_limiter = create_rate_limiter(limit=MENU_LIMIT, period=MENU_PERIOD, scope="menu")
+upload_rate_limiter = create_rate_limiter(cost=UPLOAD_COST, limit=UPLOAD_LIMIT, period=UPLOAD_PERIOD, scope="upload")
+
+
+async def count_menu_scan(request: Request, user_id: str) -> AsyncGenerator[None, None]:
+    """Count the scan once the endpoint has answered, like `count_product_view`, so failed requests are not counted."""
+    yield
+    analytics.record_scan(user_id, get_client_ip(request))
+
+
+async def count_product_view(user_id: str, product_id: int) -> AsyncGenerator[None, None]:
+    """Count the view once the endpoint has answered, so ids it rejects never reach the popularity ranking.
 
-    is_limited = await is_rate_limited(db=db, user_id=user_id, path=path, limit=limit, period=period)
-    if is_limited:
-        raise RateLimitException("Rate limit exceeded.")
+    The endpoint's exceptions are raised at the `yield`, so a `404` skips the count, while cache hits, which only
+    exist for products that were found, are still counted.
+    """
+    yield
+    analytics.record_view(user_id, product_id)
@@ -11,6 +11,13 @@ from .category import router as category_router
 from .product import router as product_router
 from .menu_card import router as menu_card_router
 from .advertisement import router as advertisement_router
+from .images import router as images_router
+from .analytics import router as analytics_router
+from .queues import router as queues_router
+from .health import router as health_router
+from .profiles import router as profiles_router
+from .slow_queries import router as slow_queries_router
+from .batch import router as batch_router
 
 router = APIRouter(prefix="/v1")
 router.include_router(login_router)
@@ -20,6 +27,13 @@ router.include_router(category_router)
 router.include_router(product_router)
 router.include_router(menu_card_router)
 router.include_router(advertisement_router)
+router.include_router(images_router)
+router.include_router(analytics_router)
+router.include_router(queues_router)
+router.include_router(health_router)
+router.include_router(profiles_router)
+router.include_router(slow_queries_router)
+router.include_router(batch_router)
 # router.include_router(posts_router)
 # router.include_router(tasks_router)
 # router.include_router(tiers_router)
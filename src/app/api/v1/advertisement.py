@@ -1,22 +1,31 @@
+import asyncio
 from typing import Annotated, Any, List
 
 from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import UploadFile
 
 
-from ...api.dependencies import  get_current_user
+from ...api.dependencies import  get_current_user, upload_rate_limiter
 from ...core.db.database import async_get_db
-from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.exceptions.http_exceptions import (
+    BadRequestException,
+    CustomException,
+    ForbiddenException,
+    NotFoundException,
+)
+from ...core.utils import menu_version
 from ...core.utils.cache import cache
 from ...core.schemas import ResponseSchema
 from ...crud.crud_posts import crud_posts
-from ...crud.crud_advertisement import crud_advertisement
+from ...crud.crud_advertisement import create_advertisements, crud_advertisement
 from ...crud.crud_users import crud_users
 from ...schemas.advertisement import AdvertisementCreate, AdvertisementCreateInternal, AdvertisementRead, AdvertisementUpdate
 from ...schemas.user import UserRead
 from ...service.external.s3_bucket import S3Utils
 
-router = APIRouter(prefix='/user',tags=["users advertisement"])
+router = APIRouter(prefix='/user',tags=["users advertisement"], route_class=ReleaseSessionRoute)
 
 
 @router.get("/advertisement", response_model=ResponseSchema)
@@ -28,7 +37,7 @@ async def get_categories(
     if current_user is None:
         raise NotFoundException("User not found")
 
-    advertisement = await crud_advertisement.get_multi(db=db, created_by_user_id=current_user["id"])
+    advertisement = await crud_advertisement.get_multi(db=db, created_by_user_id=current_user["id"], is_deleted=False)
     if not advertisement:
         raise NotFoundException(detail="Advertisement not found")
 
@@ -48,7 +57,9 @@ async def get_advertisement(
     if current_user is None:
         raise NotFoundException("User not found")
 
-    advertisement = await crud_advertisement.get(db=db, id=advertisement_id)
+    advertisement = await crud_advertisement.get(
+        db=db, id=advertisement_id, created_by_user_id=current_user["id"], is_deleted=False
+    )
     if not advertisement:
         raise NotFoundException("Advertisement not found")
 
@@ -60,36 +71,51 @@ async def get_advertisement(
 
 
 
-@router.post("/advertisement", response_model=ResponseSchema, status_code=201)
+@router.post(
+    "/advertisement", response_model=ResponseSchema, status_code=201, dependencies=[Depends(upload_rate_limiter)]
+)
 async def write_advertisement(
     request: Request,
     current_user: Annotated[UserRead, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> ResponseSchema:
-    
-    # if current_user is None:
-    #     raise NotFoundException("User not found")
+    """Create one advertisement per uploaded image.
 
-    advertisement_internal_dict = {}
+    Images are uploaded to S3 concurrently and every advertisement is inserted in one statement. Images that could
+    not be uploaded are reported under `failed`; if the insert fails, the uploaded images are deleted again.
+    """
     form_data = await request.form()
-    images = form_data.get('images')
-    advertisement_internal_dict['name'] = form_data.get('name','advertisement')
-    advertisement_internal_dict["created_by_user_id"] = current_user["id"]
+    images = [image for image in form_data.getlist('images') if isinstance(image, UploadFile)]
+    if not images:
+        raise BadRequestException("No advertisement images provided")
+    name = form_data.get('name', 'advertisement')
 
     s3_object = S3Utils()
-    advertisements = []
-    print(images,type(images))
-    if images:
-        for image in images:
-            image_url = s3_object.upload_image_to_s3(name=f"{current_user['uuid']}-{advertisement_internal_dict['name']}", file=image)
-            advertisement_internal_dict["image"] = image_url
-            advertisement_internal = AdvertisementCreateInternal(**advertisement_internal_dict)
-            created_advertisement: AdvertisementRead = await crud_advertisement.create(db=db, object=advertisement_internal)
-            advertisements.append(created_advertisement)
+    results = await s3_object.upload_images_to_s3(name=f"{current_user['uuid']}-{name}", files=images)
+    uploaded = [result for result in results if isinstance(result, str)]
+    failed = [
+        {"filename": image.filename, "error": str(result) if result else "Upload failed"}
+        for image, result in zip(images, results)
+        if not isinstance(result, str)
+    ]
+    if not uploaded:
+        raise CustomException(status_code=status.HTTP_502_BAD_GATEWAY, detail={"failed": failed})
+
+    try:
+        version = await menu_version.bump(db=db, user_id=current_user["id"])
+        advertisements = await create_advertisements(
+            db=db, created_by_user_id=current_user["id"], name=name, images=uploaded
+        )
+    except Exception:
+        await db.rollback()
+        await asyncio.to_thread(s3_object.delete_images_from_s3, uploaded)
+        raise
+    await menu_version.publish(current_user["uuid"], version)
+
     return ResponseSchema(
         status_code= status.HTTP_201_CREATED,
         message="Advertisement successfully created",
-        data=advertisements
+        data={"created": advertisements, "failed": failed}
     )
 
 @router.patch("/advertisement/{advertisement_id}", response_model=ResponseSchema)
@@ -102,7 +128,9 @@ async def update_advertisement(
 
     if current_user is None:
         raise NotFoundException("User not found")
-    advertisement = await crud_advertisement.get(db=db, id=advertisement_id)
+    advertisement = await crud_advertisement.get(
+        db=db, id=advertisement_id, created_by_user_id=current_user["id"], is_deleted=False
+    )
     if not advertisement:
         raise NotFoundException("Advertisement not found")
     advertisement_update_dict = {}
@@ -120,8 +148,10 @@ async def update_advertisement(
         advertisement_update_dict["image_url"] = image_url
         s3_object.delete_image_from_s3(file_url=advertisement["image_url"])
 
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
     await crud_advertisement.update(db=db, object=advertisement_update_dict, id=advertisement["id"])
-    updated_advertisement = await crud_advertisement.get(db=db, id=advertisement["id"])
+    await menu_version.publish(current_user["uuid"], version)
+    updated_advertisement = await crud_advertisement.get(db=db, id=advertisement["id"], is_deleted=False)
   
     return ResponseSchema(
         status_code= status.HTTP_200_OK,
@@ -139,11 +169,15 @@ async def delete_advertisement(
     if current_user is None:
         raise NotFoundException("User not found")
 
-    advertisement = await crud_advertisement.get(db=db, id=advertisement_id)
+    advertisement = await crud_advertisement.get(
+        db=db, id=advertisement_id, created_by_user_id=current_user["id"], is_deleted=False
+    )
     if not advertisement:
         raise NotFoundException("Advertisement not found")
 
-    await crud_advertisement.db_delete(db=db, id=advertisement_id)
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
+    await crud_advertisement.delete(db=db, id=advertisement_id)
+    await menu_version.publish(current_user["uuid"], version)
     return ResponseSchema(
     status_code= status.HTTP_204_NO_CONTENT,
     message="Advertisement successfully deleted",
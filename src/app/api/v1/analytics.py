@@ -0,0 +1,35 @@
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...api.dependencies import get_current_user
+from ...core.db.database import async_get_db
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.schemas import ResponseSchema
+from ...core.utils.analytics import hour_of
+from ...crud.crud_analytics import get_dashboard
+from ...schemas.user import UserRead
+
+router = APIRouter(prefix="/user", tags=["analytics"], route_class=ReleaseSessionRoute)
+
+
+@router.get("/analytics", response_model=ResponseSchema)
+async def read_analytics(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    hours: Annotated[int, Query(ge=1, le=24 * 90)] = 24,
+    top: Annotated[int, Query(ge=1, le=50)] = 10,
+) -> ResponseSchema:
+    """Menu scans, unique visitors and most viewed products of the current user's menu over the last `hours` hours.
+
+    Read from the hourly rollups only, so figures lag live traffic by up to the rollup interval.
+    """
+    since = hour_of(datetime.now(UTC)) - timedelta(hours=hours - 1)
+    dashboard = await get_dashboard(db=db, created_by_user_id=current_user["id"], since=since, top=top)
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Analytics successfully fetched",
+        data=dashboard,
+    )
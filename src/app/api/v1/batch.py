@@ -0,0 +1,43 @@
+import asyncio
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Request, Response
+
+from ...api.dependencies import get_current_user
+from ...core.config import settings
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.exceptions.http_exceptions import BadRequestException
+from ...core.utils import batch
+from ...schemas.batch import BatchRequest
+
+router = APIRouter(tags=["batch"], route_class=ReleaseSessionRoute)
+
+MAX_REQUESTS = settings.BATCH_MAX_REQUESTS
+BATCH_PATH = "/api/v1/batch"
+
+
+@router.post("/batch")
+async def run_batch(
+    request: Request, batch_request: BatchRequest, current_user: Annotated[dict[str, Any], Depends(get_current_user)]
+) -> Response:
+    """Run several GET requests of the API in one round trip and return their responses in request order.
+
+    The caller is authenticated once: sub-requests carry the same credentials and reuse the user resolved here (see
+    `get_current_user`). They run concurrently, each with its own database session since a session cannot be used
+    by concurrent tasks, and identical URLs are only run once.
+
+    Example
+    -------
+    `{"requests": [{"url": "/api/v1/user/me/"}, {"url": "/api/v1/user/category"}, {"url": "/api/v1/user/product"}]}`
+    """
+    urls = [item.url for item in batch_request.requests]
+    if len(urls) > MAX_REQUESTS:
+        raise BadRequestException(f"A batch can hold at most {MAX_REQUESTS} requests")
+    if any(url.split("?", 1)[0].rstrip("/") == BATCH_PATH for url in urls):
+        raise BadRequestException("Batches cannot be nested")
+
+    unique_urls = list(dict.fromkeys(urls))
+    responses = await asyncio.gather(
+        *(batch.dispatch(request.app, batch.sub_scope(request.scope, url)) for url in unique_urls)
+    )
+    return Response(content=batch.render(urls, dict(zip(unique_urls, responses))), media_type="application/json")
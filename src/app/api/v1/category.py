@@ -1,14 +1,18 @@
 from typing import Annotated, Any, List
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from ...api.dependencies import get_current_superuser, get_current_user
+from ...api.dependencies import get_current_superuser, get_current_user, upload_rate_limiter
 from ...core.db.database import async_get_db
+from ...core.db.routing import ReleaseSessionRoute
 from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
+from ...core.utils import menu_version, typeahead
 from ...core.utils.cache import cache
+from ...core.utils.fields import fields_query, sparse_schema
 from ...core.schemas import ResponseSchema
 from ...crud.crud_posts import crud_posts
 from ...crud.crud_category import crud_category
@@ -18,39 +22,44 @@ from ...schemas.category import CategoryCreate, CategoryCreateInternal, Category
 from ...schemas.user import UserRead
 from ...service.external.s3_bucket import S3Utils
 
-router = APIRouter(prefix='/user',tags=["users category"])
+router = APIRouter(prefix='/user',tags=["users category"], route_class=ReleaseSessionRoute)
 
 
-@router.get("/category", response_model=ResponseSchema)
+@router.get("/category", response_model=ResponseSchema[list[CategoryRead]])
 async def get_categories(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
-) -> ResponseSchema:
+    fields: Annotated[str | None, Depends(fields_query(CategoryRead))],
+) -> ResponseSchema[list[CategoryRead]]:
+    schema = sparse_schema(CategoryRead, fields)
     
     if current_user is None:
         raise NotFoundException("User not found")
 
-    category = await crud_category.get_multi(db=db, created_by_user_id=current_user["id"])
+    category = await crud_category.get_multi(
+        db=db, schema_to_select=schema, created_by_user_id=current_user["id"], is_deleted=False
+    )
     if not category:
         raise NotFoundException(detail="Category not found")
 
-    return ResponseSchema(
+    envelope = ResponseSchema[list[schema]](
         status_code= status.HTTP_200_OK,
         message="Category successfully fetched",
         data=category["data"]
     )
+    return Response(content=to_json(envelope), media_type="application/json")
 
-@router.get("/category/{category_id}", response_model=ResponseSchema)
+@router.get("/category/{category_id}", response_model=ResponseSchema[CategoryRead])
 async def get_category(
     category_id: int,
     current_user: Annotated[UserRead, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
-) -> ResponseSchema:
+) -> ResponseSchema[CategoryRead]:
     
     if current_user is None:
         raise NotFoundException("User not found")
 
-    category = await crud_category.get(db=db, id=category_id)
+    category = await crud_category.get(db=db, id=category_id, created_by_user_id=current_user["id"], is_deleted=False)
     if not category:
         raise NotFoundException("Category not found")
 
@@ -62,7 +71,7 @@ async def get_category(
 
 
 
-@router.post("/category", response_model=ResponseSchema, status_code=201)
+@router.post("/category", response_model=ResponseSchema, status_code=201, dependencies=[Depends(upload_rate_limiter)])
 async def write_category(
     request: Request,
     current_user: Annotated[UserRead, Depends(get_current_user)],
@@ -84,7 +93,10 @@ async def write_category(
         image_url = s3_object.upload_image_to_s3(name=f"{current_user['uuid']}-{category_internal_dict['name']}", file=image)
         category_internal_dict["image"] = image_url
     category_internal = CategoryCreateInternal(**category_internal_dict)
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
     created_category: CategoryRead = await crud_category.create(db=db, object=category_internal)
+    await menu_version.publish(current_user["uuid"], version)
+    typeahead.upsert(current_user["uuid"], typeahead.CATEGORY, created_category.id, created_category.name)
     
     return ResponseSchema(
         status_code= status.HTTP_201_CREATED,
@@ -102,7 +114,7 @@ async def update_category(
 
     if current_user is None:
         raise NotFoundException("User not found")
-    category = await crud_category.get(db=db, id=category_id)
+    category = await crud_category.get(db=db, id=category_id, created_by_user_id=current_user["id"], is_deleted=False)
     if not category:
         raise NotFoundException("Category not found")
     category_update_dict = {}
@@ -121,8 +133,11 @@ async def update_category(
         category_update_dict["image_url"] = image_url
         s3_object.delete_image_from_s3(file_url=category["image_url"])
 
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
     await crud_category.update(db=db, object=category_update_dict, id=category["id"])
-    updated_category = await crud_category.get(db=db, id=category["id"])
+    await menu_version.publish(current_user["uuid"], version)
+    updated_category = await crud_category.get(db=db, id=category["id"], is_deleted=False)
+    typeahead.upsert(current_user["uuid"], typeahead.CATEGORY, category["id"], updated_category["name"])
   
     return ResponseSchema(
         status_code= status.HTTP_200_OK,
@@ -140,11 +155,14 @@ async def delete_category(
     if current_user is None:
         raise NotFoundException("User not found")
 
-    category = await crud_category.get(db=db, id=category_id)
+    category = await crud_category.get(db=db, id=category_id, created_by_user_id=current_user["id"], is_deleted=False)
     if not category:
         raise NotFoundException("Category not found")
 
-    await crud_category.db_delete(db=db, id=category_id)
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
+    await crud_category.delete(db=db, id=category_id)
+    await menu_version.publish(current_user["uuid"], version)
+    typeahead.discard(current_user["uuid"], typeahead.CATEGORY, category_id)
     return ResponseSchema(
     status_code= status.HTTP_204_NO_CONTENT,
     message="Category successfully deleted",
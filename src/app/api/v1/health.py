@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Response, status
+
+from ...core.config import settings
+from ...core.schemas import HealthCheck, ResponseSchema
+from ...core.utils.health import check_readiness
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live", response_model=HealthCheck)
+async def liveness() -> HealthCheck:
+    """Answer as long as the process can serve requests, without touching any dependency."""
+    return HealthCheck(
+        name=settings.APP_NAME,
+        version=settings.APP_VERSION or "unknown",
+        description=settings.APP_DESCRIPTION or "",
+    )
+
+
+@router.get("/ready", response_model=ResponseSchema)
+async def readiness(response: Response) -> ResponseSchema:
+    """Probe the database, the three Redis roles and the storage bucket; answer 503 if any of them is unavailable."""
+    result = await check_readiness()
+    status_code = status.HTTP_200_OK if result["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    response.status_code = status_code
+    response.headers["Cache-Control"] = "no-store"
+    return ResponseSchema(
+        status_code=status_code,
+        message="Ready" if result["ready"] else "Not ready",
+        data=result["dependencies"],
+    )
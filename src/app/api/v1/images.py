@@ -0,0 +1,56 @@
+import hashlib
+from typing import Literal
+
+from fastapi import APIRouter, Request, Response, status
+
+from ...core.config import settings
+from ...core.exceptions.http_exceptions import (
+    BadRequestException,
+    CustomException,
+    NotFoundException,
+    UnprocessableEntityException,
+)
+from ...service.utils.image_transform import FORMATS, InvalidImageError, UnsupportedImageError
+from ...service.utils.image_variants import ALLOWED_WIDTHS, SourceTooLargeError, read_variant
+
+router = APIRouter(tags=["images"])
+
+KEY_PREFIX = "menu-card/"
+CACHE_CONTROL = f"public, max-age={settings.IMAGE_CACHE_MAX_AGE}"
+
+
+@router.get("/img/{key:path}", response_class=Response)
+async def get_image(request: Request, key: str, w: int, fmt: Literal["webp", "jpeg", "png"] = "webp") -> Response:
+    """Serve a stored image resized to one of the whitelisted widths and re-encoded as `fmt`.
+
+    Variants are rendered once and then served from the local disk cache, with an `ETag` so clients can revalidate
+    with `If-None-Match` and get an empty `304 Not Modified`. Sources that are too large, not images or corrupt are
+    answered with a 413, 415 or 422.
+    """
+    if w not in ALLOWED_WIDTHS:
+        raise BadRequestException(f"Width must be one of {sorted(ALLOWED_WIDTHS)}")
+
+    if not key.startswith(KEY_PREFIX) or ".." in key:
+        raise NotFoundException("Image not found")
+
+    try:
+        variant = await read_variant(key, w, fmt)
+    except SourceTooLargeError:
+        raise CustomException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Source image is too large")
+    except UnsupportedImageError:
+        raise CustomException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Source is not a supported image"
+        )
+    except InvalidImageError:
+        raise UnprocessableEntityException("Source image is corrupt")
+
+    if variant is None:
+        raise NotFoundException("Image not found")
+
+    stat, content = variant
+    etag = '"' + hashlib.md5(f"{key}|{w}|{fmt}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content, media_type=FORMATS[fmt][1], headers=headers)
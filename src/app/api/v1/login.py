@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.config import settings
 from ...core.db.database import async_get_db
+from ...core.db.routing import ReleaseSessionRoute
 from ...core.exceptions.http_exceptions import UnauthorizedException
 from ...core.schemas import Token
 from ...core.security import (
@@ -17,7 +18,7 @@ from ...core.security import (
     verify_token,
 )
 
-router = APIRouter(tags=["login"])
+router = APIRouter(tags=["login"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/login", response_model=Token)
@@ -3,10 +3,11 @@ from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.db.database import async_get_db
+from ...core.db.routing import ReleaseSessionRoute
 from ...core.exceptions.http_exceptions import UnauthorizedException
 from ...core.security import blacklist_token, oauth2_scheme
 
-router = APIRouter(tags=["login"])
+router = APIRouter(tags=["login"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/logout")
@@ -1,58 +1,86 @@
 from typing import Annotated, Any, List
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from ...api.dependencies import get_current_superuser, get_current_user
+from ...api.dependencies import (
+    count_menu_scan,
+    count_product_view,
+    get_current_superuser,
+    get_current_user,
+    menu_rate_limiter,
+)
 from ...core.db.database import async_get_db
-from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.exceptions.http_exceptions import (
+    BadRequestException,
+    CustomException,
+    ForbiddenException,
+    NotFoundException,
+)
+from ...core.utils import live, menu_version, multi_get, popularity, typeahead
 from ...core.utils.cache import cache
-from ...core.schemas import ResponseSchema
+from ...core.utils.fields import fields_query, sparse_schema
+from ...core.utils.streaming import StreamFormat, select_schema_columns, stream_rows
+from ...core.schemas import ResponseSchema, get_type_adapter
 from ...crud.crud_posts import crud_posts
 from ...crud.crud_category import crud_category
+from ...crud.crud_menu import get_menu_changes, get_menu_items_by_ids
 from ...crud.crud_products import crud_product
+from ...crud.crud_search import search_products
+from ...models.product import Product
 from ...crud.crud_users import crud_users
 from ...schemas.post import PostCreate, PostCreateInternal, PostRead, PostUpdate
 from ...schemas.category import CategoryCreate, CategoryCreateInternal, CategoryRead, CategoryUpdate
+from ...schemas.product import ProductRead
 from ...schemas.user import UserRead
 from ...service.external.s3_bucket import S3Utils
 
-router = APIRouter(tags=["Menu Card"])
+router = APIRouter(tags=["Menu Card"], route_class=ReleaseSessionRoute, dependencies=[Depends(menu_rate_limiter)])
 
 
-@router.get("/category", response_model=ResponseSchema)
+@router.get("/category", response_model=ResponseSchema[list[CategoryRead]], dependencies=[Depends(count_menu_scan)])
+@cache(key_prefix="menu:{user_id}:categories:{fields}", resource_id_name="user_id", index_key="menu_keys:{user_id}")
 async def get_categories(
+    request: Request,
     user_id: str,
     db: Annotated[AsyncSession, Depends(async_get_db)],
-) -> ResponseSchema:
+    fields: Annotated[str | None, Depends(fields_query(CategoryRead))],
+) -> ResponseSchema[list[CategoryRead]]:
+    schema = sparse_schema(CategoryRead, fields)
     current_user = await crud_users.get(db=db, uuid = user_id)
     if current_user is None:
         raise NotFoundException("User not found")
 
-    category = await crud_category.get_multi(db=db, created_by_user_id=current_user["id"])
+    category = await crud_category.get_multi(
+        db=db, schema_to_select=schema, created_by_user_id=current_user["id"], is_deleted=False
+    )
     if not category:
         raise NotFoundException(detail="Category not found")
 
-    return ResponseSchema(
+    return ResponseSchema[list[schema]](
         status_code= status.HTTP_200_OK,
         message="Category successfully fetched",
         data=category["data"]
     )
 
-@router.get("/category/{category_id}", response_model=ResponseSchema)
+@router.get("/category/{category_id}", response_model=ResponseSchema[CategoryRead])
+@cache(key_prefix="menu:{user_id}:category", resource_id_name="category_id", index_key="menu_keys:{user_id}")
 async def get_category(
+    request: Request,
     category_id: int,
     user_id: str,
     db: Annotated[AsyncSession, Depends(async_get_db)],
-) -> ResponseSchema:
+) -> ResponseSchema[CategoryRead]:
     
     current_user = await crud_users.get(db=db, uuid = user_id)
     if current_user is None:
         raise NotFoundException("User not found")
 
-    category = await crud_category.get(db=db, id=category_id)
+    category = await crud_category.get(db=db, id=category_id, created_by_user_id=current_user["id"], is_deleted=False)
     if not category:
         raise NotFoundException("Category not found")
 
@@ -64,44 +92,274 @@ async def get_category(
 
 
 
-@router.get("/product", response_model=ResponseSchema)
+@router.get("/product", response_model=ResponseSchema[list[ProductRead]])
+@cache(key_prefix="menu:{user_id}:products:{fields}", resource_id_name="category_id", index_key="menu_keys:{user_id}")
 async def get_product(
+    request: Request,
     user_id: str,
     db: Annotated[AsyncSession, Depends(async_get_db)],
-    category_id : int = None
-) -> ResponseSchema:
-    
+    fields: Annotated[str | None, Depends(fields_query(ProductRead))],
+    category_id : int = None,
+) -> ResponseSchema[list[ProductRead]]:
+    schema = sparse_schema(ProductRead, fields)
     current_user = await crud_users.get(db=db, uuid = user_id)
     if current_user is None:
         raise NotFoundException("User not found")
     if category_id:
-        product = await crud_product.get_multi(db=db, created_by_user_id=current_user["id"],category_id=category_id)
+        product = await crud_product.get_multi(
+            db=db,
+            schema_to_select=schema,
+            created_by_user_id=current_user["id"],
+            category_id=category_id,
+            is_deleted=False,
+        )
     else:
-        product = await crud_product.get_multi(db=db, created_by_user_id=current_user["id"])
+        product = await crud_product.get_multi(
+            db=db, schema_to_select=schema, created_by_user_id=current_user["id"], is_deleted=False
+        )
     if not product:
         raise NotFoundException("Product not found")
-    return ResponseSchema(
+    return ResponseSchema[list[schema]](
         status_code= status.HTTP_200_OK,
         message="Product successfully fetched",
         data=product["data"]
     )
 
 
-@router.get("/product/{product_id}", response_model=ResponseSchema)
+@router.get("/products/stream")
+async def stream_products(
+    user_id: str,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    category_id: int | None = None,
+    format: StreamFormat = "ndjson",
+) -> StreamingResponse:
+    """Stream every product of a restaurant as NDJSON or as a JSON array, in constant memory."""
+    current_user = await crud_users.get(db=db, uuid=user_id)
+    if current_user is None:
+        raise NotFoundException("User not found")
+
+    statement = (
+        select_schema_columns(Product, ProductRead)
+        .where(Product.created_by_user_id == current_user["id"], Product.is_deleted.is_(False))
+        .order_by(Product.id)
+    )
+    if category_id:
+        statement = statement.where(Product.category_id == category_id)
+
+    return stream_rows(statement, stream_format=format)
+
+
+@router.get(
+    "/product/{product_id}", response_model=ResponseSchema[ProductRead], dependencies=[Depends(count_product_view)]
+)
+@cache(key_prefix="menu:{user_id}:product", resource_id_name="product_id", index_key="menu_keys:{user_id}")
 async def get_product(
+    request: Request,
     product_id: int,
     user_id: str,
     db: Annotated[AsyncSession, Depends(async_get_db)],
-) -> ResponseSchema:
+) -> ResponseSchema[ProductRead]:
     current_user = await crud_users.get(db=db, uuid = user_id)
     if current_user is None:
         raise NotFoundException("User not found")
 
-    product = await crud_product.get(db=db, created_by_user_id=current_user["id"], id=product_id)
+    product = await crud_product.get(db=db, created_by_user_id=current_user["id"], id=product_id, is_deleted=False)
     if not product:
         raise NotFoundException("Product not found")
     return ResponseSchema(
         status_code= status.HTTP_200_OK,
         message="Product successfully fetched",
         data=product
-    )
\ No newline at end of file
+    )
+
+
+MULTI_GET_MAX_IDS = 100
+IDS_DESCRIPTION = f"Comma separated ids, at most {MULTI_GET_MAX_IDS}, e.g. `12,7,31`."
+
+
+def _parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = [int(id) for id in ids.split(",") if id.strip()]
+    except ValueError:
+        raise BadRequestException("ids must be a comma separated list of integers")
+
+    if not parsed or len(parsed) > MULTI_GET_MAX_IDS:
+        raise BadRequestException(f"Between 1 and {MULTI_GET_MAX_IDS} ids can be requested at once")
+    return parsed
+
+
+async def _get_menu_items(db: AsyncSession, user_id: str, name: str, schema: Any, ids: list[int]) -> list[bytes | None]:
+    async def load(missing: list[int]) -> dict[int, bytes]:
+        current_user = await crud_users.get(db=db, uuid=user_id)
+        if current_user is None:
+            raise NotFoundException("User not found")
+
+        rows = await get_menu_items_by_ids(db=db, name=name, created_by_user_id=current_user["id"], ids=missing)
+        adapter = get_type_adapter(schema)
+        return {id: adapter.dump_json(adapter.validate_python(row)) for id, row in rows.items()}
+
+    return await multi_get.get_many(user_id, name, ids, load)
+
+
+@router.get("/products/multi", response_model=ResponseSchema[list[ProductRead | None]])
+async def get_products_by_ids(
+    user_id: str,
+    ids: Annotated[str, Query(description=IDS_DESCRIPTION)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> Response:
+    """Several products of a menu by id, e.g. to validate a cart, in the order asked.
+
+    Ids that are unknown, deleted or belong to another menu come back as `null`. Cached products cost a single Redis
+    round trip; the rest are loaded with one query and cached.
+    """
+    items = await _get_menu_items(db, user_id, "products", ProductRead, _parse_ids(ids))
+    return Response(content=multi_get.render("Products successfully fetched", items), media_type="application/json")
+
+
+@router.get("/categories/multi", response_model=ResponseSchema[list[CategoryRead | None]])
+async def get_categories_by_ids(
+    user_id: str,
+    ids: Annotated[str, Query(description=IDS_DESCRIPTION)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> Response:
+    """Several categories of a menu by id, in the order asked, with `null` for the ones not found."""
+    items = await _get_menu_items(db, user_id, "categories", CategoryRead, _parse_ids(ids))
+    return Response(content=multi_get.render("Categories successfully fetched", items), media_type="application/json")
+
+
+@router.get("/search", response_model=ResponseSchema)
+async def search_menu(
+    user_id: str,
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    items_per_page: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> ResponseSchema:
+    """Search a restaurant's products by name, description and category name, best matches first."""
+    current_user = await crud_users.get(db=db, uuid=user_id)
+    if current_user is None:
+        raise NotFoundException("User not found")
+
+    products_data = await search_products(
+        db=db,
+        created_by_user_id=current_user["id"],
+        query=q,
+        offset=compute_offset(page, items_per_page),
+        limit=items_per_page,
+    )
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Products successfully searched",
+        data=paginated_response(crud_data=products_data, page=page, items_per_page=items_per_page),
+    )
+
+
+@router.get("/suggest", response_model=ResponseSchema)
+async def suggest_menu_items(
+    user_id: str,
+    q: Annotated[str, Query(max_length=100)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    limit: Annotated[int, Query(ge=1, le=20)] = 8,
+) -> ResponseSchema:
+    """Suggest product and category names starting with what the diner typed so far.
+
+    Served from an in-memory index of the menu, so only the first request for a menu touches the database.
+    """
+    index = await typeahead.get_index(db=db, restaurant_uuid=user_id)
+    if index is None:
+        raise NotFoundException("User not found")
+
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Suggestions successfully fetched",
+        data=index.search(q, limit=limit),
+    )
+
+
+@router.get("/menu/{user_id}/version", response_model=ResponseSchema)
+async def get_menu_version(user_id: str, response: Response) -> ResponseSchema:
+    """Return the current version of a restaurant's menu, straight from Redis.
+
+    The version increases with every category, product or advertisement change, so clients can poll this instead
+    of the menu itself and only sync when it moved.
+    """
+    version = await menu_version.get_current(user_id)
+    if version is None:
+        raise NotFoundException("User not found")
+
+    response.headers["Cache-Control"] = "no-cache"
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Menu version successfully fetched",
+        data={"version": version},
+    )
+
+
+@router.get("/menu/{user_id}/changes", response_model=ResponseSchema)
+async def get_menu_changes_since(
+    user_id: str,
+    since: Annotated[int, Query(ge=0)],
+    response: Response,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> ResponseSchema:
+    """Return what changed in a restaurant's menu after version `since`.
+
+    Changed rows are returned whole and deleted rows by id. When `since` is too old to be resolved, `full_sync` is
+    set and the client should fetch the whole menu again.
+    """
+    version = await menu_version.get_current(user_id)
+    if version is None:
+        raise NotFoundException("User not found")
+
+    response.headers["Cache-Control"] = "no-cache"
+    data: dict[str, Any] = {"version": version, "full_sync": False}
+    if since >= version:
+        return ResponseSchema(status_code=status.HTTP_200_OK, message="Menu is up to date", data=data)
+
+    changed_at = await menu_version.get_changed_at(user_id, since + 1)
+    if changed_at is None:
+        data["full_sync"] = True
+        return ResponseSchema(status_code=status.HTTP_200_OK, message="Menu needs a full sync", data=data)
+
+    current_user = await crud_users.get(db=db, uuid=user_id)
+    if current_user is None:
+        raise NotFoundException("User not found")
+
+    data.update(await get_menu_changes(db=db, created_by_user_id=current_user["id"], since=changed_at))
+    return ResponseSchema(status_code=status.HTTP_200_OK, message="Menu changes successfully fetched", data=data)
+
+
+@router.get("/menu/{user_id}/popular", response_model=ResponseSchema)
+async def get_popular_products(
+    user_id: str,
+    n: Annotated[int, Query(ge=1, le=50)] = 10,
+) -> ResponseSchema:
+    """Return the ids of a restaurant's most viewed products, ranked by a score decaying over time.
+
+    Answered straight from a Redis sorted set; clients already hold the products themselves from the menu.
+    """
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Popular products successfully fetched",
+        data=await popularity.top(user_id, n=n),
+    )
+
+
+@router.get("/menu/{user_id}/events")
+async def stream_menu_events(user_id: str) -> StreamingResponse:
+    """Push a restaurant's product changes to the diner as Server-Sent Events.
+
+    Each event carries the menu version it was committed as; a client that sees a gap, or whose stream ends, resyncs
+    through `/menu/{user_id}/changes` and reconnects.
+    """
+    if await menu_version.get_current(user_id) is None:
+        raise NotFoundException("User not found")
+
+    if live.at_capacity():
+        raise CustomException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many live connections")
+
+    return StreamingResponse(
+        live.event_stream(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
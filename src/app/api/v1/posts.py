@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...api.dependencies import get_current_superuser, get_current_user
 from ...core.db.database import async_get_db
+from ...core.db.routing import ReleaseSessionRoute
 from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
 from ...core.utils.cache import cache
 from ...crud.crud_posts import crud_posts
@@ -13,7 +14,7 @@ from ...crud.crud_users import crud_users
 from ...schemas.post import PostCreate, PostCreateInternal, PostRead, PostUpdate
 from ...schemas.user import UserRead
 
-router = APIRouter(tags=["posts"])
+router = APIRouter(tags=["posts"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/{username}/post", response_model=PostRead, status_code=201)
@@ -1,57 +1,73 @@
 from typing import Annotated, Any, List
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from ...api.dependencies import get_current_superuser, get_current_user
+from ...api.dependencies import get_current_superuser, get_current_user, upload_rate_limiter
 from ...core.db.database import async_get_db
-from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.exceptions.http_exceptions import BadRequestException, ForbiddenException, NotFoundException
+from ...core.utils import live, menu_version, popularity, typeahead
 from ...core.utils.cache import cache
+from ...core.utils.fields import fields_query, sparse_schema
 from ...core.schemas import ResponseSchema
-from ...crud.crud_products import crud_product
+from ...crud.crud_products import bulk_update_products, crud_product
 from ...crud.crud_category import crud_category
 from ...crud.crud_users import crud_users
 from ...schemas.post import PostCreate, PostCreateInternal, PostRead, PostUpdate
 from ...schemas.category import CategoryCreate, CategoryCreateInternal, CategoryRead, CategoryUpdate
-from ...schemas.product import ProductRead, ProductCreate, ProductCreateInternal, ProductUpdateInternal, ProductUpdate
+from ...schemas.product import (
+    ProductBulkUpdateItem,
+    ProductCreate,
+    ProductCreateInternal,
+    ProductRead,
+    ProductUpdate,
+    ProductUpdateInternal,
+)
 from ...schemas.user import UserRead
 from ...service.external.s3_bucket import S3Utils
 
-router = APIRouter(prefix="/user", tags=["users products"])
+router = APIRouter(prefix="/user", tags=["users products"], route_class=ReleaseSessionRoute)
 
 
-@router.get("/product", response_model=ResponseSchema)
+@router.get("/product", response_model=ResponseSchema[list[ProductRead]])
 async def get_product(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
-) -> ResponseSchema:
+    fields: Annotated[str | None, Depends(fields_query(ProductRead))],
+) -> ResponseSchema[list[ProductRead]]:
+    schema = sparse_schema(ProductRead, fields)
 
     if current_user is None:
         raise NotFoundException("User not found")
 
-    product = await crud_product.get_multi(db=db, created_by_user_id=current_user["id"])
+    product = await crud_product.get_multi(
+        db=db, schema_to_select=schema, created_by_user_id=current_user["id"], is_deleted=False
+    )
     if not product:
         raise NotFoundException("Product not found")
-    return ResponseSchema(
+    envelope = ResponseSchema[list[schema]](
         status_code= status.HTTP_200_OK,
         message="Product successfully fetched",
         data=product["data"]
     )
+    return Response(content=to_json(envelope), media_type="application/json")
 
 
-@router.get("/product/{product_id}", response_model=ResponseSchema)
+@router.get("/product/{product_id}", response_model=ResponseSchema[ProductRead])
 async def get_product(
     product_id: int,
     current_user: Annotated[UserRead, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
-) -> ResponseSchema:
+) -> ResponseSchema[ProductRead]:
 
     if current_user is None:
         raise NotFoundException("User not found")
 
-    product = await crud_product.get(db=db, created_by_user_id=current_user["id"], id=product_id)
+    product = await crud_product.get(db=db, created_by_user_id=current_user["id"], id=product_id, is_deleted=False)
     if not product:
         raise NotFoundException("Product not found")
     return ResponseSchema(
@@ -60,7 +76,7 @@ async def get_product(
         data=product
     )
 
-@router.post("/product", response_model=ResponseSchema, status_code=201)
+@router.post("/product", response_model=ResponseSchema, status_code=201, dependencies=[Depends(upload_rate_limiter)])
 async def write_product(
     request: Request,
     current_user: Annotated[UserRead, Depends(get_current_user)],
@@ -78,7 +94,7 @@ async def write_product(
     product_internal_dict['stock_available'] = form_data.get('stock_available')
     product_internal_dict['price'] = form_data.get('price')
     category_id = int(form_data.get('category_id'))
-    category = await crud_category.get(db=db, id=category_id, created_by_user_id=current_user["id"])
+    category = await crud_category.get(db=db, id=category_id, created_by_user_id=current_user["id"], is_deleted=False)
     if category is None:
         raise NotFoundException("Category not found")
     product_internal_dict['category_id'] = category_id
@@ -89,7 +105,12 @@ async def write_product(
         image_url = s3_object.upload_image_to_s3(name=product_internal_dict['name'], file=image)
         product_internal_dict["image"] = image_url
     product_internal = ProductCreateInternal(**product_internal_dict)
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
     created_product: ProductRead = await crud_product.create(db=db, object=product_internal)
+    await menu_version.publish(current_user["uuid"], version)
+    typeahead.upsert(current_user["uuid"], typeahead.PRODUCT, created_product.id, created_product.name)
+    created = ProductRead.model_validate(created_product, from_attributes=True).model_dump()
+    await live.publish_products(current_user["uuid"], "product.created", version.version, [created])
     return ResponseSchema(
         status_code= status.HTTP_201_CREATED,
         message="Product successfully created",
@@ -98,6 +119,37 @@ async def write_product(
 
 
 
+@router.patch("/products/bulk", response_model=ResponseSchema)
+async def bulk_update_product(
+    items: list[ProductBulkUpdateItem],
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> ResponseSchema:
+    """Update the price and/or stock of many products of the current user at once.
+
+    The whole batch is applied in a single `UPDATE ... FROM (VALUES ...)` statement and the menu cache is
+    invalidated once, however many products changed.
+    """
+    if not items:
+        raise BadRequestException("No products to update")
+
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
+    updated_products = await bulk_update_products(db=db, created_by_user_id=current_user["id"], items=items)
+    await menu_version.publish(current_user["uuid"], version)
+    if updated_products:
+        await live.publish_products(current_user["uuid"], "product.updated", version.version, updated_products)
+
+    updated_ids = {product["id"] for product in updated_products}
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Products successfully updated",
+        data={
+            "updated": updated_products,
+            "not_found": sorted({item.id for item in items} - updated_ids),
+        },
+    )
+
+
 @router.patch("/product/{product_id}", response_model=ResponseSchema)
 async def update_product(
     product_id: int,
@@ -108,7 +160,7 @@ async def update_product(
 
     if current_user is None:
         raise NotFoundException("User not found")
-    product = await crud_product.get(db=db, id=product_id)
+    product = await crud_product.get(db=db, id=product_id, created_by_user_id=current_user["id"], is_deleted=False)
     if not product:
         raise NotFoundException("Product not found")
 
@@ -121,7 +173,9 @@ async def update_product(
     product_update_dict['description'] = form_data.get('description')
     category_id = form_data.get('category_id')
     if category_id:
-        category = await crud_category.get(db=db, id=int(category_id), created_by_user_id=current_user["id"])
+        category = await crud_category.get(
+            db=db, id=int(category_id), created_by_user_id=current_user["id"], is_deleted=False
+        )
         if category is None:
             raise NotFoundException("Category not found")
 
@@ -138,8 +192,14 @@ async def update_product(
     product_update_dict = product_obj.model_dump(exclude_unset=True)
     # Filter out keys with None values
     product_update_dict = {k: v for k,v in product_update_dict.items() if v is not None}
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
     await crud_product.update(db=db, object=product_update_dict, id=product_id)
-    updated_product = await crud_product.get(db=db, id=product_id)
+    await menu_version.publish(current_user["uuid"], version)
+    updated_product = await crud_product.get(
+        db=db, id=product_id, created_by_user_id=current_user["id"], is_deleted=False
+    )
+    typeahead.upsert(current_user["uuid"], typeahead.PRODUCT, product_id, updated_product["name"])
+    await live.publish_products(current_user["uuid"], "product.updated", version.version, [updated_product])
     
     
     return ResponseSchema(
@@ -158,11 +218,16 @@ async def delete_product(
     if current_user is None:
         raise NotFoundException("User not found")
 
-    product = await crud_product.get(db=db, id=product_id)
+    product = await crud_product.get(db=db, id=product_id, created_by_user_id=current_user["id"], is_deleted=False)
     if not product:
         raise NotFoundException("Product not found")
 
-    await crud_product.db_delete(db=db, id=product_id)
+    version = await menu_version.bump(db=db, user_id=current_user["id"])
+    await crud_product.delete(db=db, id=product_id)
+    await menu_version.publish(current_user["uuid"], version)
+    typeahead.discard(current_user["uuid"], typeahead.PRODUCT, product_id)
+    await popularity.discard(current_user["uuid"], product_id)
+    await live.publish_products(current_user["uuid"], "product.deleted", version.version, [{"id": product_id}])
     
     return ResponseSchema(
     status_code= status.HTTP_204_NO_CONTENT,
@@ -0,0 +1,36 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import HTMLResponse, PlainTextResponse
+
+from ...api.dependencies import get_current_superuser
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.exceptions.http_exceptions import NotFoundException
+from ...core.utils import profiler
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["profiles"],
+    route_class=ReleaseSessionRoute,
+    dependencies=[Depends(get_current_superuser)],
+)
+
+
+@router.get("/{profile_id}", response_class=HTMLResponse)
+async def read_profile(profile_id: str, format: Literal["html", "text", "speedscope"] = "html") -> Response:
+    """A request profile recorded by `ProfilerMiddleware`.
+
+    `html` is pyinstrument's interactive call tree, `text` the same tree as plain text, and `speedscope` a flame graph
+    to open in https://www.speedscope.app.
+    """
+    session = await profiler.get_profile(profile_id)
+    if session is None:
+        raise NotFoundException("Profile not found")
+
+    from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer, SpeedscopeRenderer
+
+    if format == "text":
+        return PlainTextResponse(ConsoleRenderer(unicode=True, color=False, show_all=False).render(session))
+    if format == "speedscope":
+        return Response(SpeedscopeRenderer().render(session), media_type="application/json")
+    return HTMLResponse(HTMLRenderer().render(session))
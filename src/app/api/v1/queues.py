@@ -0,0 +1,33 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, status
+
+from ...api.dependencies import get_current_superuser
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.schemas import ResponseSchema
+from ...core.utils import queue
+
+router = APIRouter(
+    prefix="/queues", tags=["queues"], route_class=ReleaseSessionRoute, dependencies=[Depends(get_current_superuser)]
+)
+
+
+@router.get("", response_model=ResponseSchema)
+async def read_queues() -> ResponseSchema:
+    """Depth, in progress jobs, oldest pending job age, latency percentiles and failure rate of every queue."""
+    stats = await asyncio.gather(*(queue.get_queue_stats(queue_name) for queue_name in queue.QUEUES.values()))
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Queues successfully fetched",
+        data=dict(zip(queue.QUEUES, stats)),
+    )
+
+
+@router.get("/{priority}", response_model=ResponseSchema)
+async def read_queue(priority: queue.Priority) -> ResponseSchema:
+    """Depth, in progress jobs, oldest pending job age, latency percentiles and failure rate of one queue."""
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Queue successfully fetched",
+        data=await queue.get_queue_stats(queue.QUEUES[priority]),
+    )
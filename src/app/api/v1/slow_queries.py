@@ -0,0 +1,31 @@
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, Query, status
+
+from ...api.dependencies import get_current_superuser
+from ...core.db import slow_query_log
+from ...core.db.routing import ReleaseSessionRoute
+from ...core.schemas import ResponseSchema
+
+router = APIRouter(
+    prefix="/slow-queries",
+    tags=["slow queries"],
+    route_class=ReleaseSessionRoute,
+    dependencies=[Depends(get_current_superuser)],
+)
+
+
+@router.get("", response_model=ResponseSchema)
+async def read_slow_queries(
+    top: Annotated[int, Query(ge=1, le=200)] = 20, order_by: Literal["total", "max"] = "total"
+) -> ResponseSchema:
+    """Slowest statements over `SLOW_QUERY_THRESHOLD_MS`, aggregated by normalized SQL.
+
+    Each entry has the normalized statement, its parameter types, the route that last ran it, execution count,
+    total, mean and maximum time, and the `EXPLAIN (ANALYZE, BUFFERS)` plan if one was sampled.
+    """
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        message="Slow queries successfully fetched",
+        data=await slow_query_log.get_slow_statements(top=top, order_by=order_by),
+    )
@@ -4,10 +4,11 @@ from arq.jobs import Job as ArqJob
 from fastapi import APIRouter, Depends
 
 from ...api.dependencies import rate_limiter
+from ...core.db.routing import ReleaseSessionRoute
 from ...core.utils import queue
 from ...schemas.job import Job
 
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+router = APIRouter(prefix="/tasks", tags=["tasks"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/task", response_model=Job, status_code=201, dependencies=[Depends(rate_limiter)])
@@ -22,9 +23,11 @@ async def create_task(message: str) -> dict[str, str]:
     Returns
     -------
     dict[str, str]
-        A dictionary containing the ID of the created task.
+        A dictionary containing the ID of the created task, or of the identical task already queued.
     """
-    job = await queue.pool.enqueue_job("sample_background_task", message)  # type: ignore
+    job = await queue.enqueue("sample_background_task", message)
+    if job is None:
+        return {"id": queue.job_id_for("sample_background_task", message)}
     return {"id": job.job_id}
 
 
@@ -42,6 +45,6 @@ async def get_task(task_id: str) -> dict[str, Any] | None:
     Optional[dict[str, Any]]
         A dictionary containing information about the task if found, or None otherwise.
     """
-    job = ArqJob(task_id, queue.pool)
+    job = ArqJob(task_id, queue.pool, _queue_name=queue.HIGH_PRIORITY_QUEUE)
     job_info: dict = await job.info()
     return vars(job_info)
@@ -6,11 +6,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...api.dependencies import get_current_superuser
 from ...core.db.database import async_get_db
+from ...core.db.routing import ReleaseSessionRoute
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
 from ...crud.crud_tier import crud_tiers
 from ...schemas.tier import TierCreate, TierCreateInternal, TierRead, TierUpdate
 
-router = APIRouter(tags=["tiers"])
+router = APIRouter(tags=["tiers"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/tier", dependencies=[Depends(get_current_superuser)], status_code=201)
@@ -1,23 +1,27 @@
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...api.dependencies import get_current_superuser, get_current_user
 from ...core.db.database import async_get_db
+from ...core.db.routing import ReleaseSessionRoute
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
 from ...core.security import blacklist_token, get_password_hash, oauth2_scheme
 from ...core.schemas import ResponseSchema
+from ...core.utils import queue
+from ...core.utils.streaming import StreamFormat, select_schema_columns, stream_rows
 from ...crud.crud_users import crud_users
 from ...crud.crud_category import crud_category
 from ...crud.crud_products import crud_product
+from ...models.user import User
 from ...schemas.user import UserCreate, UserCreateInternal, UserRead
-from ...service.external.s3_bucket import S3Utils
-from ...service.utils.qr_code import generate_qr_code
+from ...service.external.s3_bucket import S3Utils, qr_image_url
 
 
-router = APIRouter(tags=["users"])
+router = APIRouter(tags=["users"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/user", response_model=ResponseSchema, status_code=201)
@@ -53,8 +57,10 @@ async def write_user(
 
     user_internal = UserCreateInternal(**user_internal_dict)
     created_user: UserRead = await crud_users.create(db=db, object=user_internal)
-    qr_code = generate_qr_code(url=f"https://menucard.site/users/index/{created_user.uuid}")
+    # The QR code is rendered and uploaded by the worker, to the URL already stored here
+    qr_code = qr_image_url(str(created_user.uuid))
     await crud_users.update(db=db,object={'qr_code' : qr_code}, id = created_user.id)
+    await queue.enqueue("regenerate_qr_code", created_user.id, str(created_user.uuid))
     created_user.qr_code = qr_code
     return ResponseSchema(
         status_code=status.HTTP_201_CREATED,
@@ -80,10 +86,17 @@ async def read_users(
     return response
 
 
+@router.get("/users/stream", dependencies=[Depends(get_current_superuser)])
+async def stream_users(format: StreamFormat = "ndjson") -> StreamingResponse:
+    """Stream every user as NDJSON or as a JSON array, in constant memory."""
+    statement = select_schema_columns(User, UserRead).where(User.is_deleted.is_(False)).order_by(User.id)
+    return stream_rows(statement, stream_format=format)
+
+
 @router.get("/user/me/", response_model=ResponseSchema)
 async def read_users_me(request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], current_user: Annotated[UserRead, Depends(get_current_user)]) -> ResponseSchema:
-    total_cat = await crud_category.count(db=db,created_by_user_id=current_user["id"])
-    total_prod = await crud_product.count(db=db,created_by_user_id=current_user["id"])
+    total_cat = await crud_category.count(db=db, created_by_user_id=current_user["id"], is_deleted=False)
+    total_prod = await crud_product.count(db=db, created_by_user_id=current_user["id"], is_deleted=False)
     # current_user = current_user.model_dumps()
     current_user["total_product"] = total_prod
     current_user["total_category"] = total_cat
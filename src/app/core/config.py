@@ -1,4 +1,5 @@
 import os
+import tempfile
 from enum import Enum
 
 from pydantic_settings import BaseSettings
@@ -26,7 +27,7 @@ class CryptSettings(BaseSettings):
 
 
 class DatabaseSettings(BaseSettings):
-    pass
+    CREATE_TABLES_ON_START: bool = config("CREATE_TABLES_ON_START", default=True)
 
 
 class SQLiteSettings(DatabaseSettings):
@@ -88,24 +89,124 @@ class RedisQueueSettings(BaseSettings):
     REDIS_QUEUE_PORT: int = config("REDIS_QUEUE_PORT", default=6379)
 
 
+class ArqWorkerSettings(BaseSettings):
+    WORKER_MAX_JOBS: int = config("WORKER_MAX_JOBS", default=10)
+    WORKER_JOB_TIMEOUT: int = config("WORKER_JOB_TIMEOUT", default=300)
+    WORKER_MAX_TRIES: int = config("WORKER_MAX_TRIES", default=5)
+    WORKER_RETRY_BACKOFF: int = config("WORKER_RETRY_BACKOFF", default=2)
+    WORKER_KEEP_RESULT: int = config("WORKER_KEEP_RESULT", default=3600)
+    WORKER_PROCESSES: int = config("WORKER_PROCESSES", default=2)
+
+
 class RedisRateLimiterSettings(BaseSettings):
     REDIS_RATE_LIMIT_HOST: str = config("REDIS_RATE_LIMIT_HOST", default="localhost")
     REDIS_RATE_LIMIT_PORT: int = config("REDIS_RATE_LIMIT_PORT", default=6379)
     REDIS_RATE_LIMIT_URL: str = f"redis://{REDIS_RATE_LIMIT_HOST}:{REDIS_RATE_LIMIT_PORT}"
+    RATE_LIMIT_HYBRID: bool = config("RATE_LIMIT_HYBRID", default=False)
+    RATE_LIMIT_SYNC_MS: int = config("RATE_LIMIT_SYNC_MS", default=5)
+    RATE_LIMIT_ERROR_BOUND: float = config("RATE_LIMIT_ERROR_BOUND", default=0.05)
 
 
 class DefaultRateLimitSettings(BaseSettings):
     DEFAULT_RATE_LIMIT_LIMIT: int = config("DEFAULT_RATE_LIMIT_LIMIT", default=10)
     DEFAULT_RATE_LIMIT_PERIOD: int = config("DEFAULT_RATE_LIMIT_PERIOD", default=3600)
+    MENU_RATE_LIMIT_LIMIT: int = config("MENU_RATE_LIMIT_LIMIT", default=600)
+    MENU_RATE_LIMIT_PERIOD: int = config("MENU_RATE_LIMIT_PERIOD", default=60)
+    UPLOAD_RATE_LIMIT_COST: int = config("UPLOAD_RATE_LIMIT_COST", default=10)
+    UPLOAD_RATE_LIMIT_LIMIT: int = config("UPLOAD_RATE_LIMIT_LIMIT", default=600)
+    UPLOAD_RATE_LIMIT_PERIOD: int = config("UPLOAD_RATE_LIMIT_PERIOD", default=3600)
+    TRUSTED_PROXIES: str = config(
+        "TRUSTED_PROXIES", default="127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    )
+    RATE_LIMIT_IPV4_PREFIX: int = config("RATE_LIMIT_IPV4_PREFIX", default=32)
+    RATE_LIMIT_IPV6_PREFIX: int = config("RATE_LIMIT_IPV6_PREFIX", default=64)
+
+
+class TypeaheadSettings(BaseSettings):
+    TYPEAHEAD_MAX_MENUS: int = config("TYPEAHEAD_MAX_MENUS", default=1000)
+    TYPEAHEAD_TTL: int = config("TYPEAHEAD_TTL", default=300)
+
+
+class ImageSettings(BaseSettings):
+    IMAGE_CACHE_DIR: str = config("IMAGE_CACHE_DIR", default=os.path.join(tempfile.gettempdir(), "menu-card-images"))
+    IMAGE_CACHE_MAX_BYTES: int = config("IMAGE_CACHE_MAX_BYTES", default=512 * 1024 * 1024)
+    IMAGE_CACHE_MAX_AGE: int = config("IMAGE_CACHE_MAX_AGE", default=7 * 24 * 60 * 60)
+    IMAGE_WIDTHS: str = config("IMAGE_WIDTHS", default="160,320,640,1024")
+    IMAGE_MAX_SOURCE_BYTES: int = config("IMAGE_MAX_SOURCE_BYTES", default=20 * 1024 * 1024)
+    IMAGE_WORKERS: int = config("IMAGE_WORKERS", default=2)
+
+
+class LiveSettings(BaseSettings):
+    LIVE_MAX_CONNECTIONS: int = config("LIVE_MAX_CONNECTIONS", default=20000)
+    LIVE_HEARTBEAT_SECONDS: int = config("LIVE_HEARTBEAT_SECONDS", default=15)
+    LIVE_QUEUE_SIZE: int = config("LIVE_QUEUE_SIZE", default=64)
+
+
+class AnalyticsSettings(BaseSettings):
+    ANALYTICS_FLUSH_SECONDS: int = config("ANALYTICS_FLUSH_SECONDS", default=10)
+    ANALYTICS_MAX_KEYS: int = config("ANALYTICS_MAX_KEYS", default=100000)
+    ANALYTICS_RETENTION_HOURS: int = config("ANALYTICS_RETENTION_HOURS", default=48)
+
+
+class PopularitySettings(BaseSettings):
+    POPULARITY_DECAY: float = config("POPULARITY_DECAY", default=0.9)
+    POPULARITY_MIN_SCORE: float = config("POPULARITY_MIN_SCORE", default=0.01)
+
 
 class S3BUCKET(BaseSettings):
     S3_BUCKET: str = config("S3_BUCKET")
     S3_BUCKET_ACCESS_KEY: str = config("S3_BUCKET_ACCESS_KEY")
     S3_BUCKET_SECRET_KEY: str = config("S3_BUCKET_SECRET_KEY")
     S3_BUCKET_REGION: str = config("S3_BUCKET_REGION")
+    S3_UPLOAD_CONCURRENCY: int = config("S3_UPLOAD_CONCURRENCY", default=4)
     
 
 
+class ServerSettings(BaseSettings):
+    SERVER_HOST: str = config("SERVER_HOST", default="0.0.0.0")
+    SERVER_PORT: int = config("SERVER_PORT", default=8000)
+    SERVER_WORKERS: int = config("SERVER_WORKERS", default=0)
+    SERVER_KEEPALIVE: int = config("SERVER_KEEPALIVE", default=5)
+    SERVER_BACKLOG: int = config("SERVER_BACKLOG", default=2048)
+    SERVER_TIMEOUT: int = config("SERVER_TIMEOUT", default=60)
+    SERVER_GRACEFUL_TIMEOUT: int = config("SERVER_GRACEFUL_TIMEOUT", default=30)
+    SERVER_MAX_REQUESTS: int = config("SERVER_MAX_REQUESTS", default=10000)
+    SERVER_MAX_REQUESTS_JITTER: int = config("SERVER_MAX_REQUESTS_JITTER", default=1000)
+    SERVER_ACCESS_LOG: bool = config("SERVER_ACCESS_LOG", default=False)
+
+
+class HealthCheckSettings(BaseSettings):
+    HEALTH_CHECK_TIMEOUT: float = config("HEALTH_CHECK_TIMEOUT", default=1.0)
+    HEALTH_CHECK_CACHE_SECONDS: float = config("HEALTH_CHECK_CACHE_SECONDS", default=1.0)
+
+
+class TracingSettings(BaseSettings):
+    TRACING_ENABLED: bool = config("TRACING_ENABLED", default=False)
+    TRACING_SAMPLE_RATE: float = config("TRACING_SAMPLE_RATE", default=0.01)
+    TRACING_EXPORTER: str = config("TRACING_EXPORTER", default="file")
+    TRACING_FILE: str = config("TRACING_FILE", default="")
+
+
+class ProfilerSettings(BaseSettings):
+    PROFILER_ENABLED: bool = config("PROFILER_ENABLED", default=True)
+    PROFILER_INTERVAL: float = config("PROFILER_INTERVAL", default=0.001)
+    PROFILER_TTL: int = config("PROFILER_TTL", default=24 * 60 * 60)
+
+
+class SlowQuerySettings(BaseSettings):
+    SLOW_QUERY_LOG_ENABLED: bool = config("SLOW_QUERY_LOG_ENABLED", default=True)
+    SLOW_QUERY_THRESHOLD_MS: float = config("SLOW_QUERY_THRESHOLD_MS", default=200)
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = config("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", default=0.1)
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = config("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", default=10000)
+    SLOW_QUERY_MAX_STATEMENTS: int = config("SLOW_QUERY_MAX_STATEMENTS", default=1000)
+    SLOW_QUERY_RETENTION_HOURS: int = config("SLOW_QUERY_RETENTION_HOURS", default=7 * 24)
+
+
+class BatchSettings(BaseSettings):
+    BATCH_MAX_REQUESTS: int = config("BATCH_MAX_REQUESTS", default=20)
+    BATCH_TIMEOUT_SECONDS: float = config("BATCH_TIMEOUT_SECONDS", default=10.0)
+
+
 class EnvironmentOption(Enum):
     LOCAL = "local"
     STAGING = "staging"
@@ -125,8 +226,20 @@ class Settings(
     RedisCacheSettings,
     ClientSideCacheSettings,
     RedisQueueSettings,
+    ArqWorkerSettings,
     RedisRateLimiterSettings,
     DefaultRateLimitSettings,
+    TypeaheadSettings,
+    ImageSettings,
+    LiveSettings,
+    AnalyticsSettings,
+    PopularitySettings,
+    ServerSettings,
+    HealthCheckSettings,
+    TracingSettings,
+    ProfilerSettings,
+    SlowQuerySettings,
+    BatchSettings,
     EnvironmentSettings,
     S3BUCKET,
 ):
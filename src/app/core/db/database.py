@@ -1,3 +1,6 @@
+from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, MappedAsDataclass, sessionmaker
@@ -17,8 +20,32 @@ async_engine = create_async_engine(DATABASE_URL, echo=False, future=True)
 
 local_session = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
+_request_session: ContextVar[AsyncSession | None] = ContextVar("request_session", default=None)
+
+
+async def async_get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield the database session of the current request.
+
+    The session is lazy: no connection is checked out of the pool until its first statement, so requests answered
+    from cache or rejected early never touch the pool. FastAPI caches this dependency per request, so
+    `get_current_user`, `rate_limiter` and the endpoint all share one session and one connection.
+    The session is also tracked so `release_request_session` can hand the connection back as soon as the endpoint
+    returns (see `core.db.routing.ReleaseSessionRoute`).
+    """
+    async with local_session() as db:
+        _request_session.set(db)
+        try:
+            yield db
+        finally:
+            _request_session.set(None)
+
+
+async def release_request_session() -> None:
+    """Close the current request's session, returning its connection to the pool.
 
-async def async_get_db() -> AsyncSession:
-    async_session = local_session
-    async with async_session() as db:
-        yield db
+    Closing rolls back anything left uncommitted, exactly like the end of `async_get_db` would. The session remains
+    usable afterwards and simply checks out a new connection if another statement is issued.
+    """
+    db = _request_session.get()
+    if db is not None:
+        await db.close()
@@ -0,0 +1,52 @@
+import asyncio
+import functools
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from .database import release_request_session
+from .slow_query_log import current_route
+
+
+class ReleaseSessionRoute(APIRoute):
+    """Route releasing the request's database connection as soon as the endpoint returns.
+
+    FastAPI only exits `async_get_db` after the response has been validated and serialized, which keeps a pooled
+    connection busy for the slowest, purely CPU bound part of the request. Wrapping the endpoint returns the
+    connection to the pool first; serialization then runs without holding it.
+
+    The route's path template is also made available to the slow query log while the request is handled, dependencies
+    included.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = _release_session_after(endpoint)
+
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        route = f"{','.join(sorted(self.methods))} {self.path}"
+
+        async def route_handler(request: Request) -> Response:
+            token = current_route.set(route)
+            try:
+                return await handler(request)
+            finally:
+                current_route.reset(token)
+
+        return route_handler
+
+
+def _release_session_after(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            await release_request_session()
+
+    return wrapper
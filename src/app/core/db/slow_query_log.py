@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from ..logger import logging
+from ..utils import cache
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+EXPLAIN_SAMPLE_RATE = settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+EXPLAIN_TIMEOUT_MS = settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS
+MAX_STATEMENTS = settings.SLOW_QUERY_MAX_STATEMENTS
+RETENTION = settings.SLOW_QUERY_RETENTION_HOURS * 60 * 60
+MAX_CONCURRENT_EXPLAINS = 2
+
+TOTAL_KEY = "slow_queries:total"
+MAX_KEY = "slow_queries:max"
+STATEMENT_KEY = "slow_queries:{fingerprint}"
+
+current_route: ContextVar[str | None] = ContextVar("current_route", default=None)
+_explaining: ContextVar[bool] = ContextVar("explaining", default=False)
+_tasks: set[asyncio.Task] = set()
+_explains: set[asyncio.Task] = set()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+(?:::\w+(?:\[\])?)?|%\(\w+\)s|(?<!:):(?!:)\w+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Reduce a statement to its shape: literals and bound parameters become `?` and lists of them `(?, ...)`.
+
+    Example
+    -------
+    >>> normalize("SELECT * FROM product WHERE id IN ($1::INTEGER, $2::INTEGER) AND name = 'x'")
+    'SELECT * FROM product WHERE id IN (?, ...) AND name = ?'
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _LIST.sub("(?, ...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def parameter_shape(parameters: Any, many: bool = False) -> Any:
+    """Describe bound parameters by type only, so values never reach the log.
+
+    Example
+    -------
+    >>> parameter_shape((3, "pizza", [1, 2]))
+    ['int', 'str', 'list[2]']
+    """
+    if many:
+        return {"executemany": len(parameters), "rows": parameter_shape(parameters[0]) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: parameter_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        if any(isinstance(value, list | tuple | dict) for value in parameters) or len(parameters) <= 20:
+            return [_type_of(value) for value in parameters]
+        return f"{type(parameters).__name__}[{len(parameters)}]"
+    return _type_of(parameters)
+
+
+def _type_of(value: Any) -> str:
+    if isinstance(value, list | tuple):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+# -------------- recording --------------
+def instrument(engine: AsyncEngine) -> None:
+    """Time every statement executed through `engine` and record those slower than `SLOW_QUERY_THRESHOLD_MS`.
+
+    Recording happens in a background task, so the statement's caller never waits on Redis. A sample of slow SELECTs,
+    `SLOW_QUERY_EXPLAIN_SAMPLE_RATE` of them, is also run again under `EXPLAIN (ANALYZE, BUFFERS)` in a transaction
+    that is rolled back, and the plan is kept with the statement.
+    """
+    sync_engine = engine.sync_engine
+    if getattr(sync_engine, "_slow_query_log", False):
+        return
+    sync_engine._slow_query_log = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+    ) -> None:
+        if context is not None:
+            context._slow_query_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool) -> None:
+        started_at = getattr(context, "_slow_query_started_at", None)
+        if started_at is None or _explaining.get():
+            return
+
+        elapsed = time.perf_counter() - started_at
+        if elapsed < THRESHOLD:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        task = loop.create_task(_record(engine, statement, parameters, many, elapsed * 1000, current_route.get()))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+async def _record(
+    engine: AsyncEngine, statement: str, parameters: Any, many: bool, elapsed_ms: float, route: str | None
+) -> None:
+    if cache.client is None:
+        return
+
+    normalized = normalize(statement)
+    key = fingerprint(normalized)
+    statement_key = STATEMENT_KEY.format(fingerprint=key)
+    try:
+        async with cache.client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(statement_key, "count", 1)
+            pipe.hincrbyfloat(statement_key, "total_ms", elapsed_ms)
+            pipe.hset(
+                statement_key,
+                mapping={
+                    "statement": normalized,
+                    "parameters": json.dumps(parameter_shape(parameters, many)),
+                    "route": route or "",
+                    "last_seen": datetime.now(UTC).isoformat(),
+                },
+            )
+            pipe.expire(statement_key, RETENTION)
+            pipe.zincrby(TOTAL_KEY, elapsed_ms, key)
+            pipe.zadd(MAX_KEY, {key: elapsed_ms}, gt=True)
+            pipe.zremrangebyrank(TOTAL_KEY, 0, -MAX_STATEMENTS - 1)
+            pipe.zremrangebyrank(MAX_KEY, 0, -MAX_STATEMENTS - 1)
+            pipe.expire(TOTAL_KEY, RETENTION)
+            pipe.expire(MAX_KEY, RETENTION)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Error recording slow statement {key}: {e}")
+        return
+
+    if (
+        not many
+        and normalized.upper().startswith("SELECT")
+        and "FOR UPDATE" not in normalized.upper()
+        and len(_explains) < MAX_CONCURRENT_EXPLAINS
+        and random.random() < EXPLAIN_SAMPLE_RATE
+    ):
+        task = asyncio.create_task(_explain(engine, statement, parameters, statement_key))
+        _explains.add(task)
+        task.add_done_callback(_explains.discard)
+
+
+async def _explain(engine: AsyncEngine, statement: str, parameters: Any, statement_key: str) -> None:
+    """Capture the plan of a slow SELECT, bounded by `SLOW_QUERY_EXPLAIN_TIMEOUT_MS` and always rolled back."""
+    _explaining.set(True)
+    try:
+        async with engine.connect() as conn:
+            async with conn.begin() as transaction:
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(EXPLAIN_TIMEOUT_MS)}")
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}",
+                    tuple(parameters) if isinstance(parameters, list) else parameters or (),
+                )
+                plan = result.scalar()
+                await transaction.rollback()
+
+        if cache.client is not None:
+            await cache.client.hset(statement_key, "plan", plan if isinstance(plan, str) else json.dumps(plan))
+    except Exception as e:
+        logger.warning(f"Error explaining slow statement: {e}")
+
+
+# -------------- reading --------------
+async def get_slow_statements(top: int = 20, order_by: str = "total") -> list[dict[str, Any]]:
+    """The `top` slow statements by total or by maximum time, with their counts, timings, last route and plan.
+
+    Parameters
+    ----------
+    top: int, default 20
+        Number of statements to return.
+    order_by: str, default "total"
+        `"total"` for the statements costing the most time overall, `"max"` for the single slowest executions.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    ranking = await cache.client.zrevrange(TOTAL_KEY if order_by == "total" else MAX_KEY, 0, top - 1)
+    if not ranking:
+        return []
+
+    async with cache.client.pipeline(transaction=False) as pipe:
+        for key in ranking:
+            pipe.hgetall(STATEMENT_KEY.format(fingerprint=key.decode()))
+            pipe.zscore(MAX_KEY, key)
+        results = await pipe.execute()
+
+    statements = []
+    for key, fields, max_ms in zip(ranking, results[::2], results[1::2]):
+        if not fields:
+            continue
+
+        fields = {name.decode(): value.decode() for name, value in fields.items()}
+        count = int(fields["count"])
+        total_ms = float(fields["total_ms"])
+        statements.append(
+            {
+                "fingerprint": key.decode(),
+                "statement": fields.get("statement"),
+                "parameters": json.loads(fields.get("parameters", "null")),
+                "route": fields.get("route") or None,
+                "count": count,
+                "total_ms": round(total_ms, 3),
+                "mean_ms": round(total_ms / count, 3),
+                "max_ms": round(max_ms or 0, 3),
+                "last_seen": fields.get("last_seen"),
+                "plan": json.loads(fields["plan"]) if "plan" in fields else None,
+            }
+        )
+    return statements
@@ -1,8 +1,9 @@
 import uuid as uuid_pkg
 from datetime import UTC, datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Generic, TypeVar
 
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import BaseModel, Field, TypeAdapter, field_serializer
 
 
 class HealthCheck(BaseModel):
@@ -70,8 +71,20 @@ class TokenBlacklistUpdate(TokenBlacklistBase):
     pass
 
 
-class ResponseSchema(BaseModel):
+DataT = TypeVar("DataT")
+
+
+class ResponseSchema(BaseModel, Generic[DataT]):
+    """Response envelope. Parametrize it with the type of `data`, e.g. `ResponseSchema[list[ProductRead]]`, so responses
+    are validated and serialized by a compiled schema instead of being walked value by value as `Any`."""
+
     status_code: int | None = Field(default=200)
     message: str | None
-    data: Any
+    data: DataT
     # row_count: int | None
+
+
+@lru_cache
+def get_type_adapter(annotation: Any) -> TypeAdapter:
+    """The `TypeAdapter` of a type, built once per type and reused."""
+    return TypeAdapter(annotation)
@@ -1,3 +1,4 @@
+import os
 from collections.abc import AsyncGenerator, Callable
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
 from typing import Any
@@ -10,30 +11,69 @@ from arq.connections import RedisSettings
 from fastapi import APIRouter, Depends, FastAPI
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 
 from ..api.dependencies import get_current_superuser
 from ..middleware.client_cache_middleware import ClientCacheMiddleware
+from ..middleware.profiler_middleware import ProfilerMiddleware
+from ..service.utils import image_variants
 from .config import (
     AppSettings,
     ClientSideCacheSettings,
     DatabaseSettings,
     EnvironmentOption,
     EnvironmentSettings,
+    ProfilerSettings,
     RedisCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
+    SlowQuerySettings,
+    TracingSettings,
     settings,
 )
+from .db import slow_query_log
 from .db.database import Base, async_engine as engine
-from .utils import cache, queue, rate_limit
-from ..models import *
+from . import tracing
+from .utils import analytics, cache, live, queue, rate_limit
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "migrations")
+
 
 # -------------- database --------------
 async def create_tables() -> None:
+    from .. import models  # noqa: F401 - registers every table on Base.metadata
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def verify_database_revision() -> None:
+    """Check that the database is at the Alembic head revision instead of creating tables on start.
+
+    Costs one single-row query plus a read of the migration scripts' headers, so it is cheap enough for every boot.
+    Raises if the database is behind, or if the migrations or their revisions are missing from the deployment, so a
+    pod never starts serving against an outdated or unverified schema.
+    """
+    if not os.path.isdir(MIGRATIONS_DIR):
+        raise RuntimeError(f"Migrations directory {MIGRATIONS_DIR} not found, cannot verify the database revision.")
+
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    alembic_config = Config()
+    alembic_config.set_main_option("script_location", MIGRATIONS_DIR)
+    head = ScriptDirectory.from_config(alembic_config).get_current_head()
+    if head is None:
+        raise RuntimeError(f"No Alembic revisions found in {MIGRATIONS_DIR}, cannot verify the database revision.")
+
+    async with engine.connect() as conn:
+        current = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+
+    if current != head:
+        raise RuntimeError(f"Database revision {current} does not match Alembic head {head}, run the migrations.")
+
+
 # -------------- cache --------------
 async def create_redis_cache_pool() -> None:
     cache.pool = redis.ConnectionPool.from_url(settings.REDIS_CACHE_URL)
@@ -63,6 +103,26 @@ async def close_redis_rate_limit_pool() -> None:
     await rate_limit.client.aclose()  # type: ignore
 
 
+# -------------- warm up --------------
+async def warm_up_pools(settings: Any) -> None:
+    """Open a connection on each pool before serving, so the first requests do not pay for connection setup.
+
+    Any failure propagates and aborts the startup, so a worker never accepts traffic it cannot serve.
+    """
+    if isinstance(settings, DatabaseSettings):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    if isinstance(settings, RedisCacheSettings):
+        await cache.client.ping()  # type: ignore
+
+    if isinstance(settings, RedisQueueSettings):
+        await queue.pool.ping()  # type: ignore
+
+    if isinstance(settings, RedisRateLimiterSettings):
+        await rate_limit.client.ping()  # type: ignore
+
+
 # -------------- application --------------
 async def set_threadpool_tokens(number_of_tokens: int = 100) -> None:
     limiter = anyio.to_thread.current_default_thread_limiter()
@@ -87,8 +147,18 @@ def lifespan_factory(
     async def lifespan(app: FastAPI) -> AsyncGenerator:
         await set_threadpool_tokens()
 
-        if isinstance(settings, DatabaseSettings) and create_tables_on_start:
-            await create_tables()
+        if isinstance(settings, TracingSettings) and settings.TRACING_ENABLED:
+            tracing.configure()
+            tracing.instrument_sqlalchemy(engine)
+
+        if isinstance(settings, SlowQuerySettings) and settings.SLOW_QUERY_LOG_ENABLED:
+            slow_query_log.instrument(engine)
+
+        if isinstance(settings, DatabaseSettings):
+            if create_tables_on_start:
+                await create_tables()
+            else:
+                await verify_database_revision()
 
         if isinstance(settings, RedisCacheSettings):
             await create_redis_cache_pool()
@@ -98,18 +168,37 @@ def lifespan_factory(
 
         if isinstance(settings, RedisRateLimiterSettings):
             await create_redis_rate_limit_pool()
+            if settings.RATE_LIMIT_HYBRID:
+                rate_limit.start_reconciler()
+
+        if tracing.exporter is not None:
+            tracing.instrument_redis(cache.client, "cache")
+            tracing.instrument_redis(queue.pool, "queue")
+            tracing.instrument_redis(rate_limit.client, "rate_limit")
+
+        await warm_up_pools(settings)
+
+        if isinstance(settings, RedisCacheSettings):
+            await live.start()
+            analytics.start()
 
         yield
 
         if isinstance(settings, RedisCacheSettings):
+            await analytics.stop()
+            await live.stop()
             await close_redis_cache_pool()
 
         if isinstance(settings, RedisQueueSettings):
             await close_redis_queue_pool()
 
         if isinstance(settings, RedisRateLimiterSettings):
+            await rate_limit.stop_reconciler()
             await close_redis_rate_limit_pool()
 
+        image_variants.shutdown_executor()
+        tracing.shutdown()
+
     return lifespan
 
 
@@ -148,15 +237,21 @@ def create_application(
         - ClientSideCacheSettings: Integrates middleware for client-side caching.
         - RedisQueueSettings: Sets up event handlers for creating and closing a Redis queue pool.
         - RedisRateLimiterSettings: Sets up event handlers for creating and closing a Redis rate limiter pool.
+        - ProfilerSettings: Adds the middleware profiling superusers' requests on demand.
+        - SlowQuerySettings: Records slow statements, with sampled query plans, in the slow query log.
+        - TracingSettings: When tracing is enabled, adds the tracing middleware and instruments the database engine
+          and the Redis clients.
         - EnvironmentSettings: Conditionally sets documentation URLs and integrates custom routes for API documentation
           based on the environment type.
 
     create_tables_on_start : bool
         A flag to indicate whether to create database tables on application startup.
+        When False, the database is instead checked to be at the Alembic head revision.
         Defaults to True.
 
     **kwargs
-        Additional keyword arguments passed directly to the FastAPI constructor.
+        Additional keyword arguments passed directly to the FastAPI constructor. Responses are rendered with orjson
+        unless another `default_response_class` is given.
 
     Returns
     -------
@@ -181,6 +276,8 @@ def create_application(
     if isinstance(settings, EnvironmentSettings):
         kwargs.update({"docs_url": None, "redoc_url": None, "openapi_url": None})
 
+    kwargs.setdefault("default_response_class", ORJSONResponse)
+
     lifespan = lifespan_factory(settings, create_tables_on_start=create_tables_on_start)
 
     application = FastAPI(lifespan=lifespan, **kwargs)
@@ -189,6 +286,12 @@ def create_application(
     if isinstance(settings, ClientSideCacheSettings):
         application.add_middleware(ClientCacheMiddleware, max_age=settings.CLIENT_CACHE_MAX_AGE)
 
+    if isinstance(settings, ProfilerSettings) and settings.PROFILER_ENABLED:
+        application.add_middleware(ProfilerMiddleware)
+
+    if isinstance(settings, TracingSettings) and settings.TRACING_ENABLED:
+        application.add_middleware(tracing.TracingMiddleware)
+
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
             docs_router = APIRouter()
@@ -0,0 +1,381 @@
+"""Lightweight, OpenTelemetry compatible request tracing.
+
+Spans follow the OpenTelemetry data model and are exported as OTLP/JSON shaped objects, one per line, and context is
+propagated with W3C `traceparent` headers, so traces can be shipped to any OpenTelemetry collector (e.g. with its
+filelog receiver) and joined with traces of other services.
+
+Traces start at the edges, with `server` spans for HTTP requests (`TracingMiddleware`) and `consumer` spans for
+worker jobs (`traced_job`). Database statements, Redis commands and S3 calls only record `client` spans inside a
+sampled trace, so untraced work costs a single context variable lookup.
+"""
+
+import json
+import os
+import queue as queue_lib
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .logger import LOG_DIR, logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = settings.TRACING_SAMPLE_RATE
+SERVICE_NAME = settings.APP_NAME
+MAX_STATEMENT_LENGTH = 2000
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation in a trace. End it exactly once, with `end()` or by leaving `start_span`."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(
+        self, name: str, kind: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any] | None = None
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException | str) -> None:
+        self.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if exporter is not None:
+            exporter.export(self.to_dict())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "resource": {"service.name": SERVICE_NAME},
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+# -------------- exporters --------------
+class InMemoryExporter:
+    """Keep finished spans in a list, for tests."""
+
+    def __init__(self) -> None:
+        self.spans: list[dict[str, Any]] = []
+
+    def export(self, span: dict[str, Any]) -> None:
+        self.spans.append(span)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Append finished spans to a file as JSON lines, from a background thread so requests never wait on disk."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._queue: queue_lib.SimpleQueue[dict[str, Any] | None] = queue_lib.SimpleQueue()
+        self._thread = threading.Thread(target=self._write, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: dict[str, Any]) -> None:
+        self._queue.put(span)
+
+    def _write(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            while (span := self._queue.get()) is not None:
+                file.write(json.dumps(span, default=str) + "\n")
+                if self._queue.empty():
+                    file.flush()
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+exporter: InMemoryExporter | FileExporter | None = None
+
+
+def configure(new_exporter: InMemoryExporter | FileExporter | None = None) -> None:
+    """Install an exporter, by default the one chosen by `TRACING_EXPORTER`. Tracing stays off until this is called."""
+    global exporter
+    if new_exporter is None:
+        if settings.TRACING_EXPORTER == "memory":
+            new_exporter = InMemoryExporter()
+        elif settings.TRACING_EXPORTER == "file":
+            new_exporter = FileExporter(settings.TRACING_FILE or os.path.join(LOG_DIR, "traces.jsonl"))
+    exporter = new_exporter
+
+
+def shutdown() -> None:
+    global exporter
+    if exporter is not None:
+        exporter.shutdown()
+        exporter = None
+
+
+# -------------- spans --------------
+def parse_traceparent(traceparent: str | None) -> tuple[str, str, bool] | None:
+    """Parse a W3C `traceparent` header into `(trace_id, parent_id, sampled)`, or None if it is invalid."""
+    if not traceparent:
+        return None
+
+    parts = traceparent.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def current_traceparent() -> str | None:
+    span = _current_span.get()
+    return span.traceparent if span is not None else None
+
+
+def create_span(
+    name: str, kind: str = "internal", attributes: dict[str, Any] | None = None, traceparent: str | None = None
+) -> Span | None:
+    """Create a span without making it current, e.g. for a leaf operation ended from a callback.
+
+    A span is created as a child of the current span, or of `traceparent`, and a `server` or `consumer` span with no
+    parent starts a new trace with probability `TRACING_SAMPLE_RATE`. Otherwise nothing is recorded and None is
+    returned.
+    """
+    if exporter is None:
+        return None
+
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, kind, parent.trace_id, parent.span_id, attributes)
+
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+        return Span(name, kind, trace_id, parent_id, attributes) if sampled else None
+
+    if kind in ("server", "consumer") and random.random() < SAMPLE_RATE:
+        return Span(name, kind, f"{random.getrandbits(128):032x}", None, attributes)
+    return None
+
+
+@contextmanager
+def start_span(
+    name: str, kind: str = "internal", attributes: dict[str, Any] | None = None, traceparent: str | None = None
+) -> Iterator[Span | None]:
+    """Record the enclosed block as a span and make it the parent of the spans started inside it.
+
+    Example
+    -------
+    >>> with start_span("render menu", attributes={"menu.items": 42}):
+    ...     ...
+    """
+    span = create_span(name, kind, attributes, traceparent)
+    if span is None:
+        yield None
+        return
+
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+# -------------- HTTP --------------
+class TracingMiddleware:
+    """ASGI middleware starting a `server` span per HTTP request, continuing the caller's `traceparent` if any.
+
+    The span is named after the matched route template (`GET /api/v1/product/{product_id}`), so requests for different
+    ids aggregate together.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        with start_span(f"{scope['method']} {scope['path']}", "server", attributes, traceparent) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.record_error(f"HTTP {message['status']}")
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
+
+
+# -------------- SQLAlchemy --------------
+def instrument_sqlalchemy(engine: Any) -> None:
+    """Record a `client` span for every statement executed through `engine` (sync or async)."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if getattr(sync_engine, "_traced", False):
+        return
+    sync_engine._traced = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+    ) -> None:
+        span = create_span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            "client",
+            {"db.system": sync_engine.dialect.name, "db.statement": statement[:MAX_STATEMENT_LENGTH]},
+        )
+        if span is not None and context is not None:
+            context._trace_span = span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool) -> None:
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.set_attribute("db.rows", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context: Any) -> None:
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.record_error(exception_context.original_exception)
+            span.end()
+
+
+# -------------- Redis --------------
+def instrument_redis(client: Any, role: str) -> Any:
+    """Record a `client` span for every command and pipeline sent through a redis.asyncio client.
+
+    Parameters
+    ----------
+    client: Any
+        The client to instrument, in place.
+    role: str
+        What the client is used for (`cache`, `queue`, `rate_limit`), recorded as `db.redis.role`.
+    """
+    if client is None or getattr(client, "_traced", False):
+        return client
+
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def traced_execute_command(*args: Any, **options: Any) -> Any:
+        with start_span(f"redis {args[0]}", "client", {"db.system": "redis", "db.redis.role": role}):
+            return await execute_command(*args, **options)
+
+    def traced_pipeline(*args: Any, **kwargs: Any) -> Any:
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def traced_execute(raise_on_error: bool = True) -> Any:
+            attributes = {"db.system": "redis", "db.redis.role": role, "db.redis.commands": len(pipe.command_stack)}
+            with start_span("redis pipeline", "client", attributes):
+                return await execute(raise_on_error)
+
+        pipe.execute = traced_execute
+        return pipe
+
+    client.execute_command = traced_execute_command
+    client.pipeline = traced_pipeline
+    client._traced = True
+    return client
+
+
+# -------------- S3 --------------
+def instrument_boto3(client: Any) -> Any:
+    """Record a `client` span for every call made through a boto3 client, from any thread."""
+
+    def before_call(model: Any, params: Any, context: dict, **kwargs: Any) -> None:
+        span = create_span(f"s3 {model.name}", "client", {"rpc.system": "aws-api", "rpc.method": model.name})
+        if span is not None:
+            context["trace_span"] = span
+
+    def after_call(context: dict, http_response: Any = None, **kwargs: Any) -> None:
+        span = context.pop("trace_span", None)
+        if span is not None:
+            if http_response is not None:
+                span.set_attribute("http.status_code", http_response.status_code)
+            span.end()
+
+    def after_call_error(context: dict, exception: BaseException | None = None, **kwargs: Any) -> None:
+        span = context.pop("trace_span", None)
+        if span is not None:
+            span.record_error(exception or "error")
+            span.end()
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+    return client
+
+
+# -------------- ARQ --------------
+def traced_job(function: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Run an ARQ job in a `consumer` span, continuing the trace it was enqueued from (see `queue.enqueue`)."""
+
+    @wraps(function)
+    async def wrapper(ctx: Any, *args: Any, trace_context: str | None = None, **kwargs: Any) -> Any:
+        attributes = {"messaging.system": "arq", "arq.job_id": ctx.get("job_id"), "arq.job_try": ctx.get("job_try")}
+        with start_span(f"arq {function.__name__}", "consumer", attributes, trace_context):
+            return await function(ctx, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,156 @@
+import asyncio
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from ..logger import logging
+from . import cache
+from .popularity import popular_key
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SECONDS = settings.ANALYTICS_FLUSH_SECONDS
+MAX_KEYS = settings.ANALYTICS_MAX_KEYS
+RETENTION = settings.ANALYTICS_RETENTION_HOURS * 60 * 60
+
+SCANS_KEY = "analytics:{hour}:scans"
+VIEWS_KEY = "analytics:{hour}:views"
+VISITORS_KEY = "analytics:{hour}:visitors:{restaurant_uuid}"
+
+_scans: Counter[str] = Counter()
+_views: Counter[tuple[str, int]] = Counter()
+_visitors: dict[str, set[str]] = {}
+flusher: asyncio.Task | None = None
+
+
+def hour_of(moment: datetime) -> datetime:
+    return moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def _hour_key(hour: datetime) -> str:
+    return hour.strftime("%Y%m%d%H")
+
+
+def record_scan(restaurant_uuid: str, visitor: str | None) -> None:
+    """Count a menu scan in memory; it reaches Redis with the next flush."""
+    restaurant_uuid = cache.canonical_uuid(str(restaurant_uuid))
+    if restaurant_uuid not in _scans and len(_scans) >= MAX_KEYS:
+        return
+
+    _scans[restaurant_uuid] += 1
+    if visitor:
+        _visitors.setdefault(restaurant_uuid, set()).add(visitor)
+
+
+def record_view(restaurant_uuid: str, product_id: int) -> None:
+    """Count a product view in memory; it reaches Redis with the next flush."""
+    key = (cache.canonical_uuid(str(restaurant_uuid)), product_id)
+    if key not in _views and len(_views) >= MAX_KEYS:
+        return
+
+    _views[key] += 1
+
+
+async def flush() -> None:
+    """Move the in-process counters to the current hour's Redis hashes and HyperLogLogs in one round trip.
+
+    Product views are also added to the menu's popularity ranking (see `popularity`). The counters are swapped out
+    before the first `await`, so requests counted while the pipeline runs go to the next flush. Counters are lost if
+    Redis fails, which is the price of keeping the request path write free.
+    """
+    global _scans, _views, _visitors
+    if not (_scans or _views):
+        return
+
+    if cache.client is None:
+        raise MissingClientError
+
+    scans, views, visitors = _scans, _views, _visitors
+    _scans, _views, _visitors = Counter(), Counter(), {}
+
+    hour = _hour_key(hour_of(datetime.now(UTC)))
+    scans_key = SCANS_KEY.format(hour=hour)
+    views_key = VIEWS_KEY.format(hour=hour)
+    async with cache.client.pipeline(transaction=False) as pipe:
+        for restaurant_uuid, count in scans.items():
+            pipe.hincrby(scans_key, restaurant_uuid, count)
+        for restaurant_uuid, members in visitors.items():
+            visitors_key = VISITORS_KEY.format(hour=hour, restaurant_uuid=restaurant_uuid)
+            pipe.pfadd(visitors_key, *members)
+            pipe.expire(visitors_key, RETENTION)
+        for (restaurant_uuid, product_id), count in views.items():
+            pipe.hincrby(views_key, f"{restaurant_uuid}:{product_id}", count)
+            pipe.zincrby(popular_key(restaurant_uuid), count, product_id)
+        pipe.expire(scans_key, RETENTION)
+        pipe.expire(views_key, RETENTION)
+        await pipe.execute()
+
+
+async def _flush_periodically() -> None:
+    while True:
+        await asyncio.sleep(FLUSH_SECONDS)
+        try:
+            await flush()
+        except Exception as e:
+            logger.exception(f"Error flushing analytics counters: {e}")
+
+
+def start() -> None:
+    global flusher
+    flusher = asyncio.create_task(_flush_periodically())
+
+
+async def stop() -> None:
+    """Stop the periodic flush and write out what was counted since the last one."""
+    global flusher
+    if flusher is not None:
+        flusher.cancel()
+        try:
+            await flusher
+        except asyncio.CancelledError:
+            pass
+        flusher = None
+
+    try:
+        await flush()
+    except Exception as e:
+        logger.exception(f"Error flushing analytics counters on shutdown: {e}")
+
+
+async def read_hour(hour: datetime) -> dict[str, Any]:
+    """Read one hour of flushed counters back from Redis, for the rollup job.
+
+    Returns
+    -------
+    dict[str, Any]
+        `scans` and `unique_visitors` by restaurant uuid, and `views` by `(restaurant uuid, product id)`.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    hour_key = _hour_key(hour)
+    async with cache.client.pipeline(transaction=False) as pipe:
+        pipe.hgetall(SCANS_KEY.format(hour=hour_key))
+        pipe.hgetall(VIEWS_KEY.format(hour=hour_key))
+        raw_scans, raw_views = await pipe.execute()
+
+    scans = {restaurant_uuid.decode(): int(count) for restaurant_uuid, count in raw_scans.items()}
+    views: dict[tuple[str, int], int] = {}
+    for field, count in raw_views.items():
+        restaurant_uuid, _, product_id = field.decode().rpartition(":")
+        views[(restaurant_uuid, int(product_id))] = int(count)
+
+    async with cache.client.pipeline(transaction=False) as pipe:
+        for restaurant_uuid in scans:
+            pipe.pfcount(VISITORS_KEY.format(hour=hour_key, restaurant_uuid=restaurant_uuid))
+        unique_visitors = dict(zip(scans, await pipe.execute()))
+
+    return {"scans": scans, "unique_visitors": unique_visitors, "views": views}
+
+
+def recent_hours(now: datetime | None = None) -> list[datetime]:
+    """The previous and the current hour: the ones whose Redis counters may still change or were not rolled up."""
+    current = hour_of(now or datetime.now(UTC))
+    return [current - timedelta(hours=1), current]
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+import orjson
+from starlette.types import ASGIApp, Message, Scope
+
+from ..config import settings
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = settings.BATCH_TIMEOUT_SECONDS
+
+# Headers describing the batch request itself rather than the caller, which must not leak into sub-requests
+_REQUEST_ONLY_HEADERS = frozenset(
+    {
+        b"content-length",
+        b"content-type",
+        b"transfer-encoding",
+        b"accept-encoding",
+        b"if-none-match",
+        b"if-modified-since",
+    }
+)
+
+
+class SubResponse:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+def sub_scope(scope: Scope, url: str) -> Scope:
+    """The scope of a GET sub-request made by the caller of `scope`: same client, credentials and request state."""
+    parts = urlsplit(url)
+    return {
+        "type": "http",
+        "asgi": scope.get("asgi", {"version": "3.0"}),
+        "http_version": scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": scope.get("scheme", "http"),
+        "server": scope.get("server"),
+        "client": scope.get("client"),
+        "root_path": scope.get("root_path", ""),
+        "path": unquote(parts.path),
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "headers": [(name, value) for name, value in scope["headers"] if name not in _REQUEST_ONLY_HEADERS],
+        "state": dict(scope.get("state", {})),
+    }
+
+
+async def dispatch(app: ASGIApp, scope: Scope) -> SubResponse:
+    """Run a sub-request through the application in process and collect its response.
+
+    The sub-request goes through the whole middleware stack and gets its own dependencies, so its own database
+    session, rate limiting and caching, exactly like a request over the network. It is cut off with a 504 after
+    `BATCH_TIMEOUT_SECONDS`, which also ends streaming endpoints that would otherwise never finish, and an unhandled
+    error becomes a 500 for that sub-request alone.
+    """
+    status = 500
+    headers: list[tuple[bytes, bytes]] = []
+    chunks: list[bytes] = []
+    body_sent = False
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await asyncio.wait_for(app(scope, receive, send), timeout=TIMEOUT)
+    except TimeoutError:
+        return SubResponse(504, [(b"content-type", b"application/json")], b'{"detail":"Sub-request timed out"}')
+    except Exception as e:
+        # ServerErrorMiddleware re-raises after sending its 500; the failure stays with this sub-request
+        logger.exception(f"Unhandled error in batch sub-request {scope['path']}: {e}")
+        return SubResponse(500, [(b"content-type", b"application/json")], b'{"detail":"Internal Server Error"}')
+
+    return SubResponse(status, headers, b"".join(chunks))
+
+
+def render(urls: list[str], responses: dict[str, SubResponse]) -> bytes:
+    """Encode the responses of a batch, in request order, as `{"responses": [{"url", "status", "headers", "body"}]}`.
+
+    JSON bodies are embedded as they are instead of being parsed and encoded again; other bodies become strings.
+    """
+    items = []
+    for url in urls:
+        response = responses[url]
+        headers: dict[str, Any] = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in response.headers
+            if name != b"content-length"
+        }
+        item = orjson.dumps({"url": url, "status": response.status, "headers": headers})
+        if not response.body:
+            body = b"null"
+        elif headers.get("content-type", "").startswith("application/json"):
+            body = response.body
+        else:
+            body = orjson.dumps(response.body.decode("utf-8", errors="replace"))
+        items.append(item[:-1] + b',"body":' + body + b"}")
+
+    return b'{"responses":[' + b",".join(items) + b"]}"
@@ -1,18 +1,44 @@
 import functools
-import json
+import inspect
 import re
+import uuid as uuid_pkg
 from collections.abc import Callable
 from typing import Any
 
+import orjson
 from fastapi import Request, Response
 from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from pydantic_core import to_json
 from redis.asyncio import ConnectionPool, Redis
 
 from ..exceptions.cache_exceptions import CacheIdentificationInferenceError, InvalidRequestError, MissingClientError
+from ..schemas import ResponseSchema, get_type_adapter
 
 pool: ConnectionPool | None = None
 client: Redis | None = None
 
+MENU_KEYS = "menu_keys:{restaurant_uuid}"
+
+
+def canonical_uuid(value: Any) -> Any:
+    """Spell a uuid one way, lower case with hyphens, so every spelling of it maps to the same cache keys.
+
+    Values that are not uuid strings are returned unchanged.
+
+    Example
+    -------
+    >>> canonical_uuid("{0E1F7F3C-55A6-4B57-9F0C-2C4E6A0C8E11}")
+    '0e1f7f3c-55a6-4b57-9f0c-2c4e6a0c8e11'
+    """
+    if not isinstance(value, str):
+        return value
+
+    try:
+        return str(uuid_pkg.UUID(value))
+    except ValueError:
+        return value
+
 
 def _infer_resource_id(kwargs: dict[str, Any], resource_id_type: type | tuple[type, ...]) -> int | str:
     """Infer the resource ID from a dictionary of keyword arguments.
@@ -86,11 +112,12 @@ def _construct_data_dict(data_inside_brackets: list[str], kwargs: dict[str, Any]
 
     Returns
     -------
-    Dict[str, Any]: A dictionary with keys from data_inside_brackets and corresponding values from kwargs.
+    Dict[str, Any]: A dictionary with keys from data_inside_brackets and corresponding values from kwargs, uuids in
+    their canonical form (see `canonical_uuid`).
     """
     data_dict = {}
     for key in data_inside_brackets:
-        data_dict[key] = kwargs[key]
+        data_dict[key] = canonical_uuid(kwargs[key])
     return data_dict
 
 
@@ -181,6 +208,27 @@ async def _delete_keys_by_pattern(pattern: str) -> None:
             await client.delete(*keys)
 
 
+def _serialize(result: Any, return_type: Any) -> bytes:
+    """Serialize an endpoint's result to JSON through the compiled schema of its return annotation.
+
+    Results that are already a parametrized `ResponseSchema`, e.g. built with a sparse schema (see `fields`), are
+    dumped with their own schema. Endpoints without a usable annotation fall back to `jsonable_encoder`, which walks
+    the result value by value.
+    """
+    if isinstance(result, ResponseSchema) and type(result) is not ResponseSchema:
+        return to_json(result)
+
+    if return_type in (inspect.Signature.empty, Any) or isinstance(return_type, str) or (
+        isinstance(return_type, type) and issubclass(return_type, Response)
+    ):
+        return orjson.dumps(jsonable_encoder(result))
+
+    adapter = get_type_adapter(return_type)
+    if isinstance(result, BaseModel):
+        result = dict(result)
+    return adapter.dump_json(adapter.validate_python(result), by_alias=True)
+
+
 def cache(
     key_prefix: str,
     resource_id_name: Any = None,
@@ -188,6 +236,7 @@ def cache(
     resource_id_type: type | tuple[type, ...] = int,
     to_invalidate_extra: dict[str, Any] | None = None,
     pattern_to_invalidate_extra: list[str] | None = None,
+    index_key: str | None = None,
 ) -> Callable:
     """Cache decorator for FastAPI endpoints.
 
@@ -213,6 +262,9 @@ def cache(
     pattern_to_invalidate_extra: List[str] | None, optional
         A list of string patterns for cache keys that should be invalidated when the decorated function is called.
         This allows for bulk invalidation of cache keys based on a matching pattern.
+    index_key: str | None, optional
+        A template, formatted like `key_prefix`, for a Redis set the cache key is added to when a GET response is
+        stored, so the whole group can be deleted without scanning the keyspace (see `invalidate_menu_cache`).
 
     Returns
     -------
@@ -281,18 +333,23 @@ def cache(
     - `to_invalidate_extra` and `pattern_to_invalidate_extra` are used for cache invalidation on methods other than GET.
     - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets. Use it judiciously and
       consider the potential impact on Redis performance.
+    - GET responses are serialized once, with the endpoint's return annotation (e.g.
+      `ResponseSchema[list[ProductRead]]`), and served as stored JSON bytes, so a cache hit costs no parsing or
+      validation at all.
     """
 
     def wrapper(func: Callable) -> Callable:
+        return_type = inspect.signature(func).return_annotation
+
         @functools.wraps(func)
         async def inner(request: Request, *args: Any, **kwargs: Any) -> Response:
             if client is None:
                 raise MissingClientError
 
             if resource_id_name:
-                resource_id = kwargs[resource_id_name]
+                resource_id = canonical_uuid(kwargs[resource_id_name])
             else:
-                resource_id = _infer_resource_id(kwargs=kwargs, resource_id_type=resource_id_type)
+                resource_id = canonical_uuid(_infer_resource_id(kwargs=kwargs, resource_id_type=resource_id_type))
 
             formatted_key_prefix = _format_prefix(key_prefix, kwargs)
             cache_key = f"{formatted_key_prefix}:{resource_id}"
@@ -302,18 +359,20 @@ def cache(
 
                 cached_data = await client.get(cache_key)
                 if cached_data:
-                    return json.loads(cached_data.decode())
+                    return Response(content=cached_data, media_type="application/json")
 
             result = await func(request, *args, **kwargs)
 
             if request.method == "GET":
-                serializable_data = jsonable_encoder(result)
-                serialized_data = json.dumps(serializable_data)
+                if isinstance(result, Response):
+                    return result
 
-                await client.set(cache_key, serialized_data)
-                await client.expire(cache_key, expiration)
-
-                serialized_data = json.loads(serialized_data)
+                serialized_data = _serialize(result, return_type)
+                if index_key is None:
+                    await client.set(cache_key, serialized_data, ex=expiration)
+                else:
+                    await set_indexed(_format_prefix(index_key, kwargs), {cache_key: serialized_data}, expiration)
+                return Response(content=serialized_data, media_type="application/json")
 
             else:
                 await client.delete(cache_key)
@@ -333,3 +392,45 @@ def cache(
         return inner
 
     return wrapper
+
+
+async def set_indexed(index: str, items: dict[str, bytes], expiration: int) -> None:
+    """Store cache entries and record their keys in the `index` set, in one round trip.
+
+    The set's expiration is pushed back with every entry, so it outlives the entries it lists as long as the entries
+    of an index share their expiration.
+    """
+    if client is None:
+        raise MissingClientError
+
+    async with client.pipeline(transaction=False) as pipe:
+        for key, value in items.items():
+            pipe.set(key, value, ex=expiration)
+        pipe.sadd(index, *items)
+        pipe.expire(index, expiration)
+        await pipe.execute()
+
+
+def menu_keys(restaurant_uuid: Any) -> str:
+    """The set listing the cache keys of a restaurant's public menu responses."""
+    return MENU_KEYS.format(restaurant_uuid=canonical_uuid(str(restaurant_uuid)))
+
+
+async def invalidate_menu_cache(restaurant_uuid: Any) -> None:
+    """Invalidate every cached public menu response of a restaurant.
+
+    The menu endpoints record the keys they cache under in the menu's `MENU_KEYS` set, so a write deletes exactly
+    those keys, at a cost proportional to the menu's cached responses rather than to the whole keyspace. Keys are
+    popped from the set, so one cached while the invalidation runs stays listed for the next one.
+
+    Parameters
+    ----------
+    restaurant_uuid: Any
+        The uuid of the user owning the menu, in any spelling.
+    """
+    if client is None:
+        raise MissingClientError
+
+    index = menu_keys(restaurant_uuid)
+    while keys := await client.spop(index, 500):
+        await client.delete(*keys)
@@ -0,0 +1,83 @@
+import ipaddress
+from functools import lru_cache
+
+from fastapi import Request
+
+from ..config import settings
+
+IPAddress = ipaddress.IPv4Address | ipaddress.IPv6Address
+
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network.strip(), strict=False) for network in settings.TRUSTED_PROXIES.split(",") if network
+]
+IPV4_PREFIX = settings.RATE_LIMIT_IPV4_PREFIX
+IPV6_PREFIX = settings.RATE_LIMIT_IPV6_PREFIX
+
+
+def _parse(value: str) -> IPAddress | None:
+    try:
+        address = ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+        return address.ipv4_mapped
+    return address
+
+
+@lru_cache(maxsize=4096)
+def is_trusted_proxy(address: IPAddress) -> bool:
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def get_client_ip(request: Request) -> str | None:
+    """Return the address of the client behind any trusted proxies.
+
+    `X-Forwarded-For` is only believed when the connection comes from a proxy listed in `TRUSTED_PROXIES`, and is then
+    read right to left, skipping trusted proxies, so a client cannot spoof its address by sending the header itself.
+
+    Example
+    -------
+    With nginx at 172.18.0.2 trusted, a request from it carrying `X-Forwarded-For: 1.2.3.4, 203.0.113.7` comes from
+    `203.0.113.7`: the header's leftmost entry was written by the client and is ignored.
+    """
+    if request.client is None:
+        return None
+
+    address = _parse(request.client.host)
+    if address is None:
+        return request.client.host
+
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for and is_trusted_proxy(address):
+        for hop in reversed(forwarded_for.split(",")):
+            hop_address = _parse(hop)
+            if hop_address is None:
+                break
+            address = hop_address
+            if not is_trusted_proxy(address):
+                break
+
+    return str(address)
+
+
+def rate_limit_bucket(client_ip: str) -> str:
+    """Map a client address to the network it is rate limited as.
+
+    IPv6 clients usually get a whole /64, so limiting single addresses would let one client rotate through billions
+    of buckets; they are aggregated to `RATE_LIMIT_IPV6_PREFIX` bits. IPv4 clients are aggregated to
+    `RATE_LIMIT_IPV4_PREFIX` bits (32 by default, i.e. per address).
+
+    Example
+    -------
+    >>> rate_limit_bucket("2001:db8:1:2:3:4:5:6")
+    '2001:db8:1:2::/64'
+    """
+    address = _parse(client_ip)
+    if address is None:
+        return client_ip
+
+    prefix = IPV6_PREFIX if address.version == 6 else IPV4_PREFIX
+    if prefix >= address.max_prefixlen:
+        return str(address)
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRUCache:
+    """A size-bounded, least recently used cache of files in a local directory.
+
+    Entries are stored under the sha256 of their key and written atomically (temporary file + `os.replace`), so
+    readers never see a partial file. Recency is the files' access time, which `get` refreshes, and the index of
+    sizes is rebuilt from the directory before every eviction, so processes sharing the directory (e.g. the
+    gunicorn workers) keep it under `max_bytes` together, and a restarted process keeps the warm cache of the
+    previous one. Every method touches the disk: call them off the event loop. They are thread safe.
+
+    Parameters
+    ----------
+    directory: str
+        The directory holding the cached files. Created if missing.
+    max_bytes: int
+        The total size above which the least recently used files are evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._load()
+            self._evict()
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _load(self) -> None:
+        """Rebuild the index from the directory, least recently used first, including other processes' files."""
+        existing = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    existing.append((stat.st_atime_ns, entry.name, stat.st_size))
+            except FileNotFoundError:
+                continue
+
+        self._entries = OrderedDict((name, size) for _, name, size in sorted(existing))
+        self.size = sum(self._entries.values())
+
+    def get(self, key: str) -> str | None:
+        """Return the path of the cached file for `key`, or None on a miss."""
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            try:
+                stat = os.stat(path)
+                # Refresh only the access time: the modification time is part of the served ETag
+                os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+            except FileNotFoundError:
+                if name in self._entries:
+                    self.size -= self._entries.pop(name)
+                return None
+
+            self.size += stat.st_size - self._entries.pop(name, 0)
+            self._entries[name] = stat.st_size
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store `data` for `key`, evicting the least recently used files of the directory if needed."""
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        # Stamp with the clock `get` uses, the filesystem's own is coarser and would tie recent entries
+        now = time.time_ns()
+        os.utime(tmp_path, ns=(now, now))
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._load()
+            if name in self._entries:
+                self._entries.move_to_end(name)
+            self._evict()
+        return path
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not evict cached file {name}: {e}")
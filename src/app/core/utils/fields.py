@@ -0,0 +1,78 @@
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Annotated
+
+from fastapi import Query
+from pydantic import BaseModel, create_model
+
+from ..exceptions.http_exceptions import BadRequestException
+
+ALWAYS_SELECTED = frozenset({"id"})
+FIELDS_DESCRIPTION = "Comma separated fields to return, e.g. `name,price,image`. Defaults to every field."
+
+
+@lru_cache(maxsize=512)
+def _project(schema: type[BaseModel], fields: frozenset[str]) -> type[BaseModel]:
+    definitions = {name: (field.annotation, field) for name, field in schema.model_fields.items() if name in fields}
+    return create_model(f"{schema.__name__}[{','.join(sorted(fields))}]", **definitions)  # type: ignore[call-overload]
+
+
+def _requested(schema: type[BaseModel], fields: str | None) -> frozenset[str] | None:
+    if not fields:
+        return None
+
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - schema.model_fields.keys()
+    if unknown:
+        raise BadRequestException(
+            f"Unknown fields {', '.join(sorted(unknown))}, choose from {', '.join(schema.model_fields)}"
+        )
+
+    requested |= ALWAYS_SELECTED & schema.model_fields.keys()
+    if requested == schema.model_fields.keys():
+        return None
+    return requested
+
+
+def canonical_fields(schema: type[BaseModel], fields: str | None) -> str | None:
+    """Spell a `fields` parameter one way: validated, deduplicated, sorted and with `id`, or None for every field.
+
+    Example
+    -------
+    >>> canonical_fields(ProductRead, "price, name,price")
+    'id,name,price'
+    """
+    requested = _requested(schema, fields)
+    return ",".join(sorted(requested)) if requested is not None else None
+
+
+def fields_query(schema: type[BaseModel]) -> Callable[..., str | None]:
+    """A dependency reading the `fields` query parameter of `schema` in its canonical form.
+
+    Endpoints cached per projection should take `fields` through it, so the different spellings of one projection,
+    e.g. `name,price` and `price, name`, share a cache entry.
+    """
+
+    def fields_dependency(fields: Annotated[str | None, Query(description=FIELDS_DESCRIPTION)] = None) -> str | None:
+        return canonical_fields(schema, fields)
+
+    return fields_dependency
+
+
+def sparse_schema(schema: type[BaseModel], fields: str | None) -> type[BaseModel]:
+    """Narrow a read schema to the comma separated `fields` a client asked for.
+
+    The result is meant for FastCRUD's `schema_to_select`, so unrequested columns are left out of the `SELECT` and are
+    never fetched, decoded or serialized, and for the response envelope. Only the schema's own fields can be
+    requested, so a client cannot reach columns the schema does not expose; `id` is always included. Schemas are built
+    once per combination of fields and reused.
+
+    Example
+    -------
+    >>> sparse_schema(ProductRead, "name,price,image").model_fields.keys()
+    dict_keys(['id', 'name', 'image', 'price'])
+    """
+    requested = _requested(schema, fields)
+    if requested is None:
+        return schema
+    return _project(schema, requested)
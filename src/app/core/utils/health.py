@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import text
+
+from ...service.external.s3_bucket import BUCKET, get_s3_probe_client
+from ..config import settings
+from ..db.database import async_engine
+from . import cache, queue, rate_limit
+
+TIMEOUT = settings.HEALTH_CHECK_TIMEOUT
+CACHE_SECONDS = settings.HEALTH_CHECK_CACHE_SECONDS
+
+_last_checked_at = 0.0
+_last_result: dict[str, Any] | None = None
+_running: asyncio.Task | None = None
+_storage_probe: asyncio.Future | None = None
+
+
+def database_pool_status() -> dict[str, Any]:
+    """Connections in use in the database pool, and whether a request would have to wait for one."""
+    pool = async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"exhausted": False}
+
+    capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+    checked_out = pool.checkedout()
+    return {"checked_out": checked_out, "capacity": capacity, "exhausted": checked_out >= capacity}
+
+
+async def _check_database() -> None:
+    if database_pool_status()["exhausted"]:
+        raise RuntimeError("Connection pool exhausted")
+
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _check_redis(client: Any) -> None:
+    if client is None:
+        raise RuntimeError("Client is not initialized")
+    await client.ping()
+
+
+async def _check_storage() -> None:
+    """`head_bucket` in a thread, through a client bounded by `HEALTH_CHECK_TIMEOUT` and without retries.
+
+    A thread cannot be cancelled, so a probe outliving its timeout keeps running; while it does, later rounds wait on
+    it instead of starting another, so an S3 outage never holds more than one thread of the default executor.
+    """
+    global _storage_probe
+    if _storage_probe is None or _storage_probe.done():
+        _storage_probe = asyncio.ensure_future(
+            asyncio.to_thread(lambda: get_s3_probe_client(TIMEOUT).head_bucket(Bucket=BUCKET))
+        )
+        _storage_probe.add_done_callback(lambda done: done.cancelled() or done.exception())
+    await asyncio.shield(_storage_probe)
+
+
+async def _probe(check: Callable[[], Awaitable[None]]) -> dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(check(), timeout=TIMEOUT)
+        error = None
+    except TimeoutError:
+        error = f"Timed out after {TIMEOUT}s"
+    except Exception as e:
+        error = str(e) or type(e).__name__
+
+    return {"ok": error is None, "latency_ms": round((time.perf_counter() - start) * 1000, 2), "error": error}
+
+
+async def _check_all() -> dict[str, Any]:
+    checks: dict[str, Callable[[], Awaitable[None]]] = {
+        "database": _check_database,
+        "redis_cache": lambda: _check_redis(cache.client),
+        "redis_queue": lambda: _check_redis(queue.pool),
+        "redis_rate_limit": lambda: _check_redis(rate_limit.client),
+        "storage": _check_storage,
+    }
+    results = await asyncio.gather(*(_probe(check) for check in checks.values()))
+    dependencies = dict(zip(checks, results))
+    dependencies["database"]["pool"] = database_pool_status()
+    return {"ready": all(result["ok"] for result in results), "dependencies": dependencies}
+
+
+async def check_readiness() -> dict[str, Any]:
+    """Probe every dependency concurrently, each bounded by `HEALTH_CHECK_TIMEOUT`.
+
+    The result is reused for `HEALTH_CHECK_CACHE_SECONDS`, and concurrent callers share one round of probes, so however
+    often the orchestrator and load balancers ask, dependencies see at most one probe per interval from this process.
+
+    Returns
+    -------
+    dict[str, Any]
+        `ready`, and per dependency whether it answered, its latency in milliseconds and the error if any. The database
+        is reported down as soon as its connection pool is exhausted, so traffic is routed to other instances.
+    """
+    global _last_checked_at, _last_result, _running
+    if _last_result is not None and time.monotonic() - _last_checked_at < CACHE_SECONDS:
+        return _last_result
+
+    if _running is None:
+        _running = asyncio.create_task(_check_all())
+    task = _running
+    try:
+        result = await asyncio.shield(task)
+    finally:
+        if _running is task and task.done():
+            _running = None
+
+    _last_checked_at, _last_result = time.monotonic(), result
+    return result
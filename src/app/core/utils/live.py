@@ -0,0 +1,186 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import Any
+
+from redis.asyncio.client import PubSub
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from ..logger import logging
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "menu_events:"
+MAX_CONNECTIONS = settings.LIVE_MAX_CONNECTIONS
+HEARTBEAT_SECONDS = settings.LIVE_HEARTBEAT_SECONDS
+QUEUE_SIZE = settings.LIVE_QUEUE_SIZE
+PRODUCT_FIELDS = ("id", "category_id", "name", "price", "stock_available", "is_deleted")
+
+pubsub: PubSub | None = None
+listener: asyncio.Task | None = None
+_subscribers: dict[str, set["Subscriber"]] = {}
+_connections = 0
+
+
+class TooManyConnectionsError(Exception):
+    def __init__(self, message: str = "Too many live connections on this instance.") -> None:
+        self.message = message
+        super().__init__(self.message)
+
+
+class Subscriber:
+    """One live connection: a bounded queue of encoded events and a flag set when it fell too far behind."""
+
+    __slots__ = ("restaurant_uuid", "queue", "dropped")
+
+    def __init__(self, restaurant_uuid: str) -> None:
+        self.restaurant_uuid = restaurant_uuid
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = False
+
+
+def _dispatch(restaurant_uuid: str, data: bytes) -> None:
+    for subscriber in list(_subscribers.get(restaurant_uuid, ())):
+        try:
+            subscriber.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.info(f"Dropping slow live subscriber of menu {restaurant_uuid}.")
+            subscriber.dropped = True
+            unsubscribe(subscriber)
+
+
+async def _listen() -> None:
+    assert pubsub is not None
+    while True:
+        try:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_SECONDS)
+            if message is not None:
+                channel = message["channel"].decode()
+                _dispatch(channel.removeprefix(CHANNEL_PREFIX), message["data"])
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Error in live menu listener, retrying: {e}")
+            await asyncio.sleep(1)
+
+
+async def start() -> None:
+    """Subscribe this process to every menu channel and start fanning messages out to local connections.
+
+    Each API process holds a single Redis subscription whatever the number of connected clients, so a node can keep
+    tens of thousands of idle connections open at the cost of one queue each.
+    """
+    global pubsub, listener
+    if cache.client is None:
+        raise MissingClientError
+
+    pubsub = cache.client.pubsub()
+    await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+    listener = asyncio.create_task(_listen())
+
+
+async def stop() -> None:
+    global pubsub, listener
+    if listener is not None:
+        listener.cancel()
+        try:
+            await listener
+        except asyncio.CancelledError:
+            pass
+        listener = None
+
+    if pubsub is not None:
+        await pubsub.aclose()
+        pubsub = None
+
+
+def at_capacity() -> bool:
+    """Whether this process already holds `LIVE_MAX_CONNECTIONS` live connections."""
+    return _connections >= MAX_CONNECTIONS
+
+
+def subscribe(restaurant_uuid: Any) -> Subscriber:
+    """Register a live connection to a menu, or raise `TooManyConnectionsError` if this process is full."""
+    global _connections
+    if at_capacity():
+        raise TooManyConnectionsError
+
+    subscriber = Subscriber(cache.canonical_uuid(str(restaurant_uuid)))
+    _subscribers.setdefault(subscriber.restaurant_uuid, set()).add(subscriber)
+    _connections += 1
+    return subscriber
+
+
+def unsubscribe(subscriber: Subscriber) -> None:
+    global _connections
+    subscribers = _subscribers.get(subscriber.restaurant_uuid)
+    if subscribers is None or subscriber not in subscribers:
+        return
+
+    subscribers.discard(subscriber)
+    _connections -= 1
+    if not subscribers:
+        del _subscribers[subscriber.restaurant_uuid]
+
+
+async def publish(restaurant_uuid: Any, event: dict[str, Any]) -> None:
+    """Send an event to every live connection to a menu, on every API process."""
+    if cache.client is None:
+        raise MissingClientError
+
+    channel = f"{CHANNEL_PREFIX}{cache.canonical_uuid(str(restaurant_uuid))}"
+    await cache.client.publish(channel, json.dumps(event, default=str))
+
+
+async def publish_products(
+    restaurant_uuid: Any, event_type: str, version: int, products: Iterable[Mapping[str, Any]]
+) -> None:
+    """Publish a product change, keeping only the fields diners' screens react to (stock, price, visibility).
+
+    Parameters
+    ----------
+    restaurant_uuid: Any
+        The uuid of the user owning the menu.
+    event_type: str
+        `"product.created"`, `"product.updated"` or `"product.deleted"`.
+    version: int
+        The menu version the change was committed as, so clients can detect missed events.
+    products: Iterable[Mapping[str, Any]]
+        The changed products; fields outside `PRODUCT_FIELDS` are left out.
+    """
+    event = {
+        "type": event_type,
+        "version": version,
+        "products": [{field: product[field] for field in PRODUCT_FIELDS if field in product} for product in products],
+    }
+    await publish(restaurant_uuid, event)
+
+
+async def event_stream(restaurant_uuid: Any) -> AsyncIterator[bytes]:
+    """Subscribe to a menu and encode its events as Server-Sent Events, with a comment line as heartbeat when idle.
+
+    The subscription lives inside the generator so it is released however the response ends. The stream ends when
+    the subscriber is dropped for falling behind; clients reconnect and resync through `/menu/{uuid}/changes`.
+    """
+    try:
+        subscriber = subscribe(restaurant_uuid)
+    except TooManyConnectionsError:
+        return
+
+    try:
+        yield b"retry: 5000\n\n"
+        while not subscriber.dropped:
+            try:
+                data = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except TimeoutError:
+                yield b": heartbeat\n\n"
+                continue
+
+            yield b"event: menu\ndata: " + data + b"\n\n"
+
+    finally:
+        unsubscribe(subscriber)
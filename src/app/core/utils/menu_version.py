@@ -0,0 +1,113 @@
+from datetime import UTC, datetime
+from typing import Any, NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...models.user import User
+from ..db.database import local_session
+from ..exceptions.cache_exceptions import MissingClientError
+from . import cache
+
+VERSION_KEY = "menu_version:{restaurant_uuid}"
+HISTORY_KEY = "menu_versions:{restaurant_uuid}"
+HISTORY_LENGTH = 1000
+
+# Only ever moves the version forward, so a writer publishing late cannot overwrite a newer version
+_SET_IF_GREATER = """
+if tonumber(redis.call('GET', KEYS[1]) or 0) < tonumber(ARGV[1]) then
+    return redis.call('SET', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+def _key(template: str, restaurant_uuid: Any) -> str:
+    return template.format(restaurant_uuid=cache.canonical_uuid(str(restaurant_uuid)))
+
+
+class MenuVersion(NamedTuple):
+    version: int
+    changed_at: datetime
+
+
+async def bump(db: AsyncSession, user_id: int) -> MenuVersion:
+    """Increment the menu version of a restaurant inside the caller's transaction.
+
+    Call it right before the Category/Product/Advertisement write and let that write commit both: the version then
+    moves if and only if the menu changed. The `UPDATE` also locks the restaurant's row until the commit, so
+    concurrent writes to one menu get strictly increasing versions in commit order.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        The session the menu write is about to commit.
+    user_id: int
+        The id of the user owning the menu.
+
+    Returns
+    -------
+    MenuVersion
+        The new version and when it was taken, to hand to `publish` once committed.
+    """
+    version: int = await db.scalar(
+        update(User).where(User.id == user_id).values(menu_version=User.menu_version + 1).returning(User.menu_version)
+    )
+    return MenuVersion(version=version, changed_at=datetime.now(UTC))
+
+
+async def publish(restaurant_uuid: Any, menu_version: MenuVersion) -> None:
+    """Publish a committed menu version to Redis and drop the cached menu responses.
+
+    Besides the current version, a bounded history of `version -> changed_at` is kept, which is what lets
+    `/menu/{uuid}/changes` turn a client's version into a point in time. Writers can publish in any order once
+    committed; the current version is only replaced by a greater one, so it never goes backwards.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    version_key = _key(VERSION_KEY, restaurant_uuid)
+    history_key = _key(HISTORY_KEY, restaurant_uuid)
+    async with cache.client.pipeline(transaction=False) as pipe:
+        pipe.eval(_SET_IF_GREATER, 1, version_key, menu_version.version)
+        pipe.zadd(history_key, {str(menu_version.version): menu_version.changed_at.timestamp()})
+        pipe.zremrangebyrank(history_key, 0, -HISTORY_LENGTH - 1)
+        await pipe.execute()
+
+    await cache.invalidate_menu_cache(restaurant_uuid)
+
+
+async def get_current(restaurant_uuid: Any) -> int | None:
+    """Return the current menu version of a restaurant, or None if no such restaurant exists.
+
+    Served from Redis; the database is only read (through a session of its own) to backfill a missing key.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    version_key = _key(VERSION_KEY, restaurant_uuid)
+    cached = await cache.client.get(version_key)
+    if cached is not None:
+        return int(cached)
+
+    async with local_session() as db:
+        version = await db.scalar(
+            select(User.menu_version).where(User.uuid == restaurant_uuid, User.is_deleted.is_(False))
+        )
+    if version is None:
+        return None
+
+    await cache.client.set(version_key, version, nx=True)
+    return int(version)
+
+
+async def get_changed_at(restaurant_uuid: Any, version: int) -> datetime | None:
+    """Return when a version was taken, or None if it is no longer in the history."""
+    if cache.client is None:
+        raise MissingClientError
+
+    score = await cache.client.zscore(_key(HISTORY_KEY, restaurant_uuid), str(version))
+    if score is None:
+        return None
+
+    return datetime.fromtimestamp(score, UTC)
@@ -0,0 +1,68 @@
+from collections.abc import Awaitable, Callable
+
+import orjson
+
+from ..exceptions.cache_exceptions import MissingClientError
+from . import cache
+
+ITEM_KEY = "menu:{restaurant_uuid}:{name}_by_id:{id}"
+EXPIRATION = 3600
+
+
+async def get_many(
+    restaurant_uuid: str,
+    name: str,
+    ids: list[int],
+    load: Callable[[list[int]], Awaitable[dict[int, bytes]]],
+    expiration: int = EXPIRATION,
+) -> list[bytes | None]:
+    """Fetch the JSON of some menu items by id, from the cache where possible, in the order of `ids`.
+
+    Cached items are read with a single `MGET`. The misses are loaded with one call to `load`, which receives the
+    missing ids and returns the JSON of the items it found, and are written back in one pipeline. Items are listed in
+    the menu's cache keys, so any write to the menu invalidates them (see `invalidate_menu_cache`).
+
+    Parameters
+    ----------
+    restaurant_uuid: str
+        The uuid of the user owning the menu.
+    name: str
+        The kind of item, e.g. `products`, part of the cache key.
+    ids: list[int]
+        The ids to fetch; may contain duplicates.
+    load: Callable[[list[int]], Awaitable[dict[int, bytes]]]
+        Loads the given ids from the database.
+    expiration: int, default 3600
+        How long loaded items stay cached, in seconds.
+
+    Returns
+    -------
+    list[bytes | None]
+        The JSON of each requested item, or None for ids that do not exist on this menu.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    restaurant_uuid = cache.canonical_uuid(restaurant_uuid)
+    keys = [ITEM_KEY.format(restaurant_uuid=restaurant_uuid, name=name, id=id) for id in ids]
+    items: list[bytes | None] = await cache.client.mget(keys)
+
+    missing = list(dict.fromkeys(id for id, item in zip(ids, items) if item is None))
+    if not missing:
+        return items
+
+    loaded = await load(missing)
+    if loaded:
+        await cache.set_indexed(
+            cache.menu_keys(restaurant_uuid),
+            {ITEM_KEY.format(restaurant_uuid=restaurant_uuid, name=name, id=id): item for id, item in loaded.items()},
+            expiration,
+        )
+
+    return [item if item is not None else loaded.get(id) for id, item in zip(ids, items)]
+
+
+def render(message: str, items: list[bytes | None]) -> bytes:
+    """Wrap items already encoded as JSON in a `ResponseSchema` envelope without decoding them."""
+    head = orjson.dumps({"status_code": 200, "message": message, "data": None})[: -len(b"null}")]
+    return head + b"[" + b",".join(item or b"null" for item in items) + b"]}"
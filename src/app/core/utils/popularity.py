@@ -0,0 +1,58 @@
+from typing import Any
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from . import cache
+
+POPULAR_KEY = "popular:{restaurant_uuid}"
+DECAY = settings.POPULARITY_DECAY
+MIN_SCORE = settings.POPULARITY_MIN_SCORE
+
+
+def popular_key(restaurant_uuid: Any) -> str:
+    """The ranking's key, with the uuid in its canonical spelling so the one the rollups read is the one written."""
+    return POPULAR_KEY.format(restaurant_uuid=cache.canonical_uuid(str(restaurant_uuid)))
+
+
+async def top(restaurant_uuid: Any, n: int = 10) -> list[dict[str, Any]]:
+    """Return the `n` most popular products of a menu, best first, with a single `ZREVRANGE`."""
+    if cache.client is None:
+        raise MissingClientError
+
+    ranked = await cache.client.zrevrange(popular_key(restaurant_uuid), 0, n - 1, withscores=True)
+    return [{"product_id": int(product_id), "score": round(score, 3)} for product_id, score in ranked]
+
+
+async def discard(restaurant_uuid: Any, product_id: int) -> None:
+    """Remove a deleted product from its menu's ranking."""
+    if cache.client is None:
+        raise MissingClientError
+
+    await cache.client.zrem(popular_key(restaurant_uuid), product_id)
+
+
+async def decay() -> int:
+    """Multiply every popularity score by `POPULARITY_DECAY` and drop the ones that fell below `POPULARITY_MIN_SCORE`.
+
+    Run periodically, this turns the view counts added by the analytics flush into an exponentially decayed score,
+    so what is popular now outranks what was popular last month.
+
+    Returns
+    -------
+    int
+        The number of rankings decayed.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    decayed = 0
+    async with cache.client.pipeline(transaction=False) as pipe:
+        async for key in cache.client.scan_iter(match=POPULAR_KEY.format(restaurant_uuid="*"), count=500):
+            pipe.zunionstore(key, {key: DECAY})
+            pipe.zremrangebyscore(key, "-inf", f"({MIN_SCORE}")
+            decayed += 1
+            if decayed % 500 == 0:
+                await pipe.execute()
+        await pipe.execute()
+
+    return decayed
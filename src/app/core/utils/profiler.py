@@ -0,0 +1,31 @@
+import json
+from typing import Any
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from . import cache
+
+PROFILE_KEY = "profile:{profile_id}"
+TTL = settings.PROFILER_TTL
+
+
+async def save_profile(profile_id: str, session: str) -> None:
+    """Keep a pyinstrument session, serialized with `Session.to_json`, for `PROFILER_TTL` seconds."""
+    if cache.client is None:
+        raise MissingClientError
+
+    await cache.client.set(PROFILE_KEY.format(profile_id=profile_id), session, ex=TTL)
+
+
+async def get_profile(profile_id: str) -> Any | None:
+    """Load a stored pyinstrument session, or None if it expired or never existed."""
+    if cache.client is None:
+        raise MissingClientError
+
+    session = await cache.client.get(PROFILE_KEY.format(profile_id=profile_id))
+    if session is None:
+        return None
+
+    from pyinstrument.session import Session
+
+    return Session.from_json(json.loads(session))
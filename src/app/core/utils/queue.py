@@ -1,3 +1,132 @@
+import hashlib
+import json
+import time
+from typing import Any, Literal
+
 from arq.connections import ArqRedis
+from arq.constants import in_progress_key_prefix
+from arq.jobs import Job
+
+from .. import tracing
+from ..exceptions.cache_exceptions import MissingClientError
+
+HIGH_PRIORITY_QUEUE = "arq:queue:high"
+LOW_PRIORITY_QUEUE = "arq:queue:low"
+QUEUES: dict[str, str] = {"high": HIGH_PRIORITY_QUEUE, "low": LOW_PRIORITY_QUEUE}
+Priority = Literal["high", "low"]
+
+METRICS_KEY = "arq:metrics:{queue_name}"
+WAIT_SAMPLES_KEY = "arq:metrics:{queue_name}:wait"
+RUN_SAMPLES_KEY = "arq:metrics:{queue_name}:run"
+SAMPLES = 1000
+# Running jobs are the oldest due ones, since ARQ starts due jobs in score order; only that many are checked
+MAX_CHECKED_IN_PROGRESS = 1000
 
 pool: ArqRedis | None = None
+
+
+def job_id_for(function: str, *args: Any, **kwargs: Any) -> str:
+    """Derive a job id from the function and its arguments, so the same work always gets the same id."""
+    payload = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return f"{function}:{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+
+async def enqueue(
+    function: str, *args: Any, priority: Priority = "high", job_id: str | None = None, **kwargs: Any
+) -> Job | None:
+    """Enqueue a job once.
+
+    The job id defaults to `job_id_for(function, *args, **kwargs)`, and ARQ refuses a job whose id is already queued,
+    running or still has a kept result, so enqueuing the same work twice runs it once. Inside a trace, the job gets a
+    `trace_context` keyword argument so it continues the trace (see `tracing.traced_job`).
+
+    Parameters
+    ----------
+    function: str
+        The name of the worker function.
+    priority: Priority, default "high"
+        `"high"` for work someone is waiting on, `"low"` for maintenance and batch work.
+    job_id: str | None
+        An explicit id, for work identified by something other than its arguments.
+
+    Returns
+    -------
+    Job | None
+        The new job, or None if a job with the same id already exists.
+    """
+    if pool is None:
+        raise MissingClientError
+
+    job_id = job_id or job_id_for(function, *args, **kwargs)
+    attributes = {"messaging.system": "arq", "messaging.destination": QUEUES[priority], "arq.job_id": job_id}
+    with tracing.start_span(f"enqueue {function}", "producer", attributes) as span:
+        if span is not None:
+            kwargs["trace_context"] = span.traceparent
+        return await pool.enqueue_job(function, *args, _job_id=job_id, _queue_name=QUEUES[priority], **kwargs)
+
+
+def _percentiles(samples: list[bytes]) -> dict[str, int | None]:
+    values = sorted(int(sample) for sample in samples)
+    if not values:
+        return {"p50": None, "p90": None, "p99": None}
+
+    def at(fraction: float) -> int:
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    return {"p50": at(0.5), "p90": at(0.9), "p99": at(0.99)}
+
+
+async def get_queue_stats(queue_name: str) -> dict[str, Any]:
+    """Read the health of one queue from the ARQ sorted set, its in-progress keys and the worker metrics.
+
+    Parameters
+    ----------
+    queue_name: str
+        The Redis key of the queue, e.g. `HIGH_PRIORITY_QUEUE`.
+
+    Returns
+    -------
+    dict[str, Any]
+        `pending` (due now), `deferred` (scheduled later), `in_progress`, the age in seconds of the oldest pending
+        job, wait and run time percentiles in milliseconds over the last `SAMPLES` jobs, and the completed, failed
+        and retried counts with the resulting failure rate. ARQ leaves running jobs in the queue until they end, so
+        `in_progress` counts the oldest `MAX_CHECKED_IN_PROGRESS` due jobs holding ARQ's `arq:in-progress:` key, which
+        expires with the job's timeout even if its worker was killed, and those are not counted as `pending`.
+    """
+    if pool is None:
+        raise MissingClientError
+
+    now_ms = int(time.time() * 1000)
+    async with pool.pipeline(transaction=False) as pipe:
+        pipe.zcard(queue_name)
+        pipe.zrangebyscore(queue_name, "-inf", now_ms, start=0, num=MAX_CHECKED_IN_PROGRESS, withscores=True)
+        pipe.zcount(queue_name, "-inf", now_ms)
+        pipe.hgetall(METRICS_KEY.format(queue_name=queue_name))
+        pipe.lrange(WAIT_SAMPLES_KEY.format(queue_name=queue_name), 0, -1)
+        pipe.lrange(RUN_SAMPLES_KEY.format(queue_name=queue_name), 0, -1)
+        total, oldest_due, due, raw_metrics, wait_samples, run_samples = await pipe.execute()
+
+    running: list[bool] = []
+    if oldest_due:
+        async with pool.pipeline(transaction=False) as pipe:
+            for job_id, _ in oldest_due:
+                pipe.exists(in_progress_key_prefix + job_id.decode())
+            running = [bool(exists) for exists in await pipe.execute()]
+
+    in_progress = sum(running)
+    oldest_pending = next((score for (_, score), is_running in zip(oldest_due, running) if not is_running), None)
+    metrics = {field.decode(): int(value) for field, value in raw_metrics.items()}
+    complete, failed = metrics.get("complete", 0), metrics.get("failed", 0)
+    return {
+        "queue": queue_name,
+        "pending": due - in_progress,
+        "deferred": total - due,
+        "in_progress": in_progress,
+        "oldest_pending_age": round((now_ms - oldest_pending) / 1000, 3) if oldest_pending is not None else None,
+        "wait_ms": _percentiles(wait_samples),
+        "run_ms": _percentiles(run_samples),
+        "complete": complete,
+        "failed": failed,
+        "retried": metrics.get("retried", 0),
+        "failure_rate": round(failed / (complete + failed), 4) if complete + failed else 0.0,
+    }
@@ -1,3 +1,5 @@
+import asyncio
+import time
 from datetime import UTC, datetime
 
 from redis.asyncio import ConnectionPool, Redis
@@ -5,14 +7,40 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.logger import logging
 from ...schemas.rate_limit import sanitize_path
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+SYNC_INTERVAL = settings.RATE_LIMIT_SYNC_MS / 1000
+ERROR_BOUND = settings.RATE_LIMIT_ERROR_BOUND
+
 pool: ConnectionPool | None = None
 client: Redis | None = None
+reconciler: asyncio.Task | None = None
+
+
+class LocalWindow:
+    """This process's view of one rate limit window: the last global count read from Redis, plus the requests
+    admitted here that Redis has not been told about yet."""
+
+    __slots__ = ("key", "period", "expires_at", "global_count", "pending", "touched")
 
+    def __init__(self, key: str, period: int, expires_at: float) -> None:
+        self.key = key
+        self.period = period
+        self.expires_at = expires_at
+        self.global_count = 0
+        self.pending = 0
+        self.touched = False
 
-async def is_rate_limited(db: AsyncSession, user_id: int, path: str, limit: int, period: int) -> bool:
+
+_windows: dict[str, LocalWindow] = {}
+
+
+async def is_rate_limited(
+    db: AsyncSession, user_id: int | str, path: str, limit: int, period: int, cost: int = 1
+) -> bool:
+    """Count a request of `cost` units against a fixed window and tell whether it goes over `limit`."""
     if client is None:
         logger.error("Redis client is not initialized.")
         raise Exception("Redis client is not initialized.")
@@ -23,10 +51,14 @@ async def is_rate_limited(db: AsyncSession, user_id: int, path: str, limit: int,
     sanitized_path = sanitize_path(path)
     key = f"ratelimit:{user_id}:{sanitized_path}:{window_start}"
 
+    if reconciler is not None:
+        return await _is_rate_limited_locally(key, limit, period, window_start + period, cost)
+
     try:
-        current_count = await client.incr(key)
-        if current_count == 1:
-            await client.expire(key, period)
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incrby(key, cost)
+            pipe.expire(key, period)
+            current_count, _ = await pipe.execute()
 
         if current_count > limit:
             return True
@@ -36,3 +68,88 @@ async def is_rate_limited(db: AsyncSession, user_id: int, path: str, limit: int,
         raise e
 
     return False
+
+
+async def _is_rate_limited_locally(key: str, limit: int, period: int, window_end: int, cost: int) -> bool:
+    """Admit or reject a request from this process's local window, going to Redis only once its budget is spent.
+
+    Each process may admit up to `max(1, limit * RATE_LIMIT_ERROR_BOUND)` units Redis has not seen yet, so with
+    P processes a limit can be exceeded by at most P times that budget, plus one request's cost. In practice the
+    reconciler syncs every `RATE_LIMIT_SYNC_MS` milliseconds and the overshoot is much lower.
+    """
+    window = _windows.get(key)
+    if window is None:
+        window = _windows[key] = LocalWindow(key, period, window_end)
+
+    if window.global_count + window.pending + cost > limit:
+        return True
+
+    window.pending += cost
+    window.touched = True
+    if window.pending >= max(1, int(limit * ERROR_BOUND)):
+        await _sync([window])
+
+    return False
+
+
+async def _sync(windows: list[LocalWindow]) -> None:
+    """Send the pending counts of some windows to Redis in one pipeline and read back the global counts."""
+    assert client is not None
+    sent = [window.pending for window in windows]
+    for window in windows:
+        window.pending = 0
+        window.touched = False
+
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for window, count in zip(windows, sent):
+                pipe.incrby(window.key, count)
+                pipe.expire(window.key, window.period)
+            results = await pipe.execute()
+
+    except Exception as e:
+        logger.exception(f"Error syncing {len(windows)} rate limit windows: {e}")
+        for window, count in zip(windows, sent):
+            window.pending += count
+            window.touched = True
+        return
+
+    for window, global_count in zip(windows, results[::2]):
+        window.global_count = global_count
+
+
+async def _reconcile_periodically() -> None:
+    while True:
+        await asyncio.sleep(SYNC_INTERVAL)
+        now = time.time()
+        for key in [key for key, window in _windows.items() if window.expires_at <= now]:
+            del _windows[key]
+
+        touched = [window for window in _windows.values() if window.touched]
+        if touched:
+            await _sync(touched)
+
+
+def start_reconciler() -> None:
+    """Switch this process to hybrid rate limiting: local windows reconciled with Redis in the background."""
+    global reconciler
+    reconciler = asyncio.create_task(_reconcile_periodically())
+
+
+async def stop_reconciler() -> None:
+    """Stop the reconciler and send the last pending counts to Redis."""
+    global reconciler
+    if reconciler is None:
+        return
+
+    reconciler.cancel()
+    try:
+        await reconciler
+    except asyncio.CancelledError:
+        pass
+    reconciler = None
+
+    touched = [window for window in _windows.values() if window.touched]
+    if touched:
+        await _sync(touched)
+    _windows.clear()
@@ -0,0 +1,78 @@
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy import Select, select
+
+from ..db.database import local_session
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+StreamFormat = Literal["json", "ndjson"]
+
+MEDIA_TYPES: dict[str, str] = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def select_schema_columns(model: Any, schema: type[BaseModel]) -> Select:
+    """Build a `SELECT` of the model columns that appear in the schema, in schema field order."""
+    columns = [model.__table__.c[name] for name in schema.model_fields if name in model.__table__.c]
+    return select(*columns)
+
+
+async def _encode_rows(statement: Select, stream_format: StreamFormat, chunk_size: int) -> AsyncIterator[bytes]:
+    """Fetch rows through a server-side cursor and encode them chunk by chunk.
+
+    A dedicated session is opened here rather than reusing the request's one, because the request scoped
+    dependencies are closed before the response body is sent.
+    """
+    separator = b"\n" if stream_format == "ndjson" else b","
+    first = True
+    if stream_format == "json":
+        yield b"["
+
+    async with local_session() as db:
+        try:
+            result = await db.stream(statement.execution_options(yield_per=chunk_size))
+            async for partition in result.mappings().partitions(chunk_size):
+                encoded = separator.join(to_json(dict(row)) for row in partition)
+                if stream_format == "ndjson":
+                    yield encoded + separator
+                else:
+                    yield encoded if first else separator + encoded
+                first = False
+
+        except Exception as e:
+            logger.exception(f"Error while streaming rows: {e}")
+            raise e
+
+    if stream_format == "json":
+        yield b"]"
+
+
+def stream_rows(statement: Select, stream_format: StreamFormat = "ndjson", chunk_size: int = 500) -> StreamingResponse:
+    """Stream the rows of a statement as a JSON array or as newline delimited JSON.
+
+    Rows are pulled from a server-side cursor `chunk_size` at a time and written out as soon as they are encoded,
+    so memory use stays constant no matter how many rows the statement returns.
+
+    Parameters
+    ----------
+    statement: Select
+        A column based `SELECT`, e.g. built with `select_schema_columns`.
+    stream_format: StreamFormat, default "ndjson"
+        `"json"` for a single JSON array, `"ndjson"` for one JSON object per line.
+    chunk_size: int, default 500
+        Number of rows fetched and written per chunk.
+
+    Returns
+    -------
+    StreamingResponse
+        The response streaming the encoded rows.
+    """
+    return StreamingResponse(
+        _encode_rows(statement, stream_format, chunk_size),
+        media_type=MEDIA_TYPES[stream_format],
+    )
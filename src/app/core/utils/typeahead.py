@@ -0,0 +1,198 @@
+import asyncio
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...models.category import Category
+from ...models.product import Product
+from ...models.user import User
+from ..config import settings
+from . import cache
+
+PRODUCT = 0
+CATEGORY = 1
+_KIND_NAMES = ("product", "category")
+
+MAX_MENUS = settings.TYPEAHEAD_MAX_MENUS
+TTL = settings.TYPEAHEAD_TTL
+
+_indexes: OrderedDict[str, "PrefixIndex"] = OrderedDict()
+_build_locks: dict[str, asyncio.Lock] = {}
+
+
+def normalize(value: str) -> str:
+    """Normalize a name for prefix matching: strip accents, casefold and collapse whitespace.
+
+    Example
+    -------
+    >>> normalize("  Crème   Brûlée ")
+    'creme brulee'
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def _keys_for(label: str) -> list[str]:
+    """Return one key per word start, so "Chicken Tikka" is found by typing either "chi" or "tik"."""
+    words = normalize(label).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+class PrefixIndex:
+    """A compact, sorted-array prefix index over the product and category names of one menu.
+
+    Keys are kept in a sorted list with a parallel `array` of references (`id * 2 + kind`), so a lookup is a
+    binary search followed by a short scan and the index costs little more than the strings themselves.
+
+    Parameters
+    ----------
+    entries: Iterable[tuple[int, int, str]]
+        `(kind, id, name)` tuples, where kind is `PRODUCT` or `CATEGORY`.
+    """
+
+    __slots__ = ("_keys", "_refs", "_labels", "built_at")
+
+    def __init__(self, entries: Iterable[tuple[int, int, str]] = ()) -> None:
+        pairs: list[tuple[str, int]] = []
+        self._labels: dict[int, str] = {}
+        for kind, id, label in entries:
+            ref = id * 2 + kind
+            self._labels[ref] = label
+            pairs.extend((key, ref) for key in _keys_for(label))
+
+        pairs.sort()
+        self._keys: list[str] = [key for key, _ in pairs]
+        self._refs = array("q", (ref for _, ref in pairs))
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def search(self, prefix: str, limit: int = 8) -> list[dict[str, Any]]:
+        """Return up to `limit` distinct entries with a word starting with `prefix`, in key order."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        results: list[dict[str, Any]] = []
+        seen: set[int] = set()
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and len(results) < limit:
+            if not self._keys[position].startswith(prefix):
+                break
+
+            ref = self._refs[position]
+            if ref not in seen:
+                seen.add(ref)
+                results.append({"type": _KIND_NAMES[ref & 1], "id": ref >> 1, "name": self._labels[ref]})
+            position += 1
+
+        return results
+
+    def upsert(self, kind: int, id: int, label: str) -> None:
+        """Add an entry, replacing any previous entry with the same kind and id."""
+        self.discard(kind, id)
+        ref = id * 2 + kind
+        self._labels[ref] = label
+        for key in _keys_for(label):
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._refs.insert(position, ref)
+
+    def discard(self, kind: int, id: int) -> None:
+        """Remove an entry if present."""
+        ref = id * 2 + kind
+        label = self._labels.pop(ref, None)
+        if label is None:
+            return
+
+        for key in _keys_for(label):
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._refs[position] == ref:
+                    del self._keys[position]
+                    del self._refs[position]
+                    break
+                position += 1
+
+
+async def _build_index(db: AsyncSession, restaurant_uuid: str) -> PrefixIndex | None:
+    owner_id = await db.scalar(select(User.id).where(User.uuid == restaurant_uuid, User.is_deleted.is_(False)))
+    if owner_id is None:
+        return None
+
+    products = await db.execute(
+        select(Product.id, Product.name).where(Product.created_by_user_id == owner_id, Product.is_deleted.is_(False))
+    )
+    categories = await db.execute(
+        select(Category.id, Category.name).where(
+            Category.created_by_user_id == owner_id, Category.is_deleted.is_(False)
+        )
+    )
+    entries = [(PRODUCT, id, name) for id, name in products]
+    entries.extend((CATEGORY, id, name) for id, name in categories)
+    return PrefixIndex(entries)
+
+
+async def get_index(db: AsyncSession, restaurant_uuid: Any) -> PrefixIndex | None:
+    """Return the prefix index of a restaurant's menu, building it from the database on first access.
+
+    Indexes are kept per process for up to `TYPEAHEAD_TTL` seconds and evicted least recently used first once more
+    than `TYPEAHEAD_MAX_MENUS` menus are held. Concurrent first requests for the same menu share a single build.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session, only used when the index has to be built.
+    restaurant_uuid: Any
+        The uuid of the user owning the menu.
+
+    Returns
+    -------
+    PrefixIndex | None
+        The index, or None if no such restaurant exists.
+    """
+    key = cache.canonical_uuid(str(restaurant_uuid))
+    index = _indexes.get(key)
+    if index is not None and time.monotonic() - index.built_at < TTL:
+        _indexes.move_to_end(key)
+        return index
+
+    lock = _build_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        index = _indexes.get(key)
+        if index is None or time.monotonic() - index.built_at >= TTL:
+            index = await _build_index(db, key)
+            if index is None:
+                _build_locks.pop(key, None)
+                return None
+
+            _indexes[key] = index
+            while len(_indexes) > MAX_MENUS:
+                evicted, _ = _indexes.popitem(last=False)
+                _build_locks.pop(evicted, None)
+
+    _indexes.move_to_end(key)
+    return index
+
+
+def upsert(restaurant_uuid: Any, kind: int, id: int, label: str) -> None:
+    """Apply a created or renamed product/category to the menu's index, if this process holds one."""
+    index = _indexes.get(cache.canonical_uuid(str(restaurant_uuid)))
+    if index is not None:
+        index.upsert(kind, id, label)
+
+
+def discard(restaurant_uuid: Any, kind: int, id: int) -> None:
+    """Remove a deleted product/category from the menu's index, if this process holds one."""
+    index = _indexes.get(cache.canonical_uuid(str(restaurant_uuid)))
+    if index is not None:
+        index.discard(kind, id)
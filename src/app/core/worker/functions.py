@@ -1,24 +1,175 @@
 import asyncio
+import functools
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from typing import Any
 
+import redis.asyncio as redis
 import uvloop
+from arq import Retry
 from arq.worker import Worker
+from sqlalchemy import delete, update
+
+from ...crud.crud_analytics import save_rollups
+from ...models.user import User
+from ...service.external.s3_bucket import S3Utils
+from ...service.utils.qr_code import MENU_URL, render_qr_code
+from .. import tracing
+from ..config import settings
+from ..db import slow_query_log
+from ..db.database import async_engine, local_session
+from ..db.token_blacklist import TokenBlacklist
+from ..utils import analytics, cache, popularity
+from ..utils.queue import METRICS_KEY, RUN_SAMPLES_KEY, SAMPLES, WAIT_SAMPLES_KEY
 
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
+MAX_TRIES = settings.WORKER_MAX_TRIES
+RETRY_BACKOFF = settings.WORKER_RETRY_BACKOFF
+
+
+def retry_with_backoff(function: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Retry a job on any error, waiting `WORKER_RETRY_BACKOFF * 2 ** (try - 1)` seconds, until `WORKER_MAX_TRIES`.
+
+    The outcome is left in the job's ctx for `on_job_end` to report.
+    """
+
+    @functools.wraps(function)
+    async def wrapper(ctx: Worker, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await function(ctx, *args, **kwargs)
+
+        except Retry:
+            ctx["job_outcome"] = "retried"
+            raise
+
+        except Exception as e:
+            if ctx["job_try"] < MAX_TRIES:
+                defer = RETRY_BACKOFF * 2 ** (ctx["job_try"] - 1)
+                logging.warning(f"Job {ctx['job_id']} failed on try {ctx['job_try']}, retrying in {defer}s: {e}")
+                ctx["job_outcome"] = "retried"
+                raise Retry(defer=defer) from e
+
+            ctx["job_outcome"] = "failed"
+            raise
+
+        except BaseException:
+            ctx["job_outcome"] = "failed"
+            raise
+
+    return wrapper
+
+
+async def run_in_process(ctx: Worker, function: Callable[..., Any], *args: Any) -> Any:
+    """Run CPU bound work (images, QR codes, PDFs) in the worker's process pool, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(ctx["process_pool"], function, *args)
+
 
 # -------- background tasks --------
+@tracing.traced_job
+@retry_with_backoff
 async def sample_background_task(ctx: Worker, name: str) -> str:
     await asyncio.sleep(5)
     return f"Task {name} is complete!"
 
 
+@tracing.traced_job
+@retry_with_backoff
+async def regenerate_qr_code(ctx: Worker, user_id: int, user_uuid: str) -> str:
+    """Render a user's menu QR code in the process pool, upload it under the user's uuid and store its URL."""
+    png = await run_in_process(ctx, render_qr_code, MENU_URL.format(user_uuid=user_uuid))
+    qr_code = await asyncio.to_thread(S3Utils().upload_qr_image_to_s3, name=user_uuid, file=BytesIO(png))
+    async with local_session() as db:
+        await db.execute(update(User).where(User.id == user_id).values(qr_code=qr_code))
+        await db.commit()
+    return qr_code
+
+
+# -------- cron jobs --------
+@tracing.traced_job
+@retry_with_backoff
+async def rollup_analytics(ctx: Worker) -> None:
+    """Aggregate the previous and current hour of Redis analytics counters into the rollup tables."""
+    async with local_session() as db:
+        for hour in analytics.recent_hours():
+            counters = await analytics.read_hour(hour)
+            await save_rollups(db=db, hour=hour, counters=counters)
+
+
+@tracing.traced_job
+@retry_with_backoff
+async def decay_popularity(ctx: Worker) -> None:
+    decayed = await popularity.decay()
+    logging.info(f"Decayed {decayed} popularity rankings")
+
+
+@tracing.traced_job
+@retry_with_backoff
+async def purge_token_blacklist(ctx: Worker) -> int:
+    """Delete blacklisted tokens that have expired anyway."""
+    async with local_session() as db:
+        result = await db.execute(delete(TokenBlacklist).where(TokenBlacklist.expires_at < datetime.now()))
+        await db.commit()
+    logging.info(f"Purged {result.rowcount} expired blacklisted tokens")
+    return result.rowcount
+
+
+# -------- job metrics --------
+JobHook = Callable[[Worker], Awaitable[None]]
+
+
+def job_metrics_hooks(queue_name: str) -> tuple[JobHook, JobHook]:
+    """Build `on_job_start`/`on_job_end` hooks recording per-queue timings and outcomes in Redis.
+
+    Each queue keeps the last `SAMPLES` wait times (from when the job was due to when it started) and run times, in
+    milliseconds, plus counters of completed, failed and retried jobs. Running jobs are not counted here: a worker
+    killed mid-job would never decrement the count, so `get_queue_stats` reads them from ARQ's own keys instead.
+    """
+    metrics_key = METRICS_KEY.format(queue_name=queue_name)
+    wait_key = WAIT_SAMPLES_KEY.format(queue_name=queue_name)
+    run_key = RUN_SAMPLES_KEY.format(queue_name=queue_name)
+
+    async def on_job_start(ctx: Worker) -> None:
+        ctx["started_at"] = time.time()
+        wait_ms = max(0, int(ctx["started_at"] * 1000 - ctx["score"]))
+        async with ctx["redis"].pipeline(transaction=False) as pipe:
+            pipe.lpush(wait_key, wait_ms)
+            pipe.ltrim(wait_key, 0, SAMPLES - 1)
+            await pipe.execute()
+
+    async def on_job_end(ctx: Worker) -> None:
+        run_ms = int((time.time() - ctx.get("started_at", time.time())) * 1000)
+        async with ctx["redis"].pipeline(transaction=False) as pipe:
+            pipe.hincrby(metrics_key, ctx.get("job_outcome", "complete"), 1)
+            pipe.lpush(run_key, run_ms)
+            pipe.ltrim(run_key, 0, SAMPLES - 1)
+            await pipe.execute()
+
+    return on_job_start, on_job_end
+
+
 # -------- base functions --------
 async def startup(ctx: Worker) -> None:
+    cache.pool = redis.ConnectionPool.from_url(settings.REDIS_CACHE_URL)
+    cache.client = redis.Redis.from_pool(cache.pool)  # type: ignore
+    if settings.TRACING_ENABLED:
+        tracing.configure()
+        tracing.instrument_sqlalchemy(async_engine)
+        tracing.instrument_redis(cache.client, "cache")
+    ctx["process_pool"] = ProcessPoolExecutor(max_workers=settings.WORKER_PROCESSES)
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        slow_query_log.instrument(async_engine)
     logging.info("Worker Started")
 
 
 async def shutdown(ctx: Worker) -> None:
+    ctx["process_pool"].shutdown(wait=True, cancel_futures=True)
+    await cache.client.aclose()  # type: ignore
+    tracing.shutdown()
     logging.info("Worker end")
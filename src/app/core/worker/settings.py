@@ -1,15 +1,50 @@
+from arq import cron
 from arq.connections import RedisSettings
 
 from ...core.config import settings
-from .functions import sample_background_task, shutdown, startup
+from ..utils.queue import HIGH_PRIORITY_QUEUE, LOW_PRIORITY_QUEUE
+from .functions import (
+    decay_popularity,
+    job_metrics_hooks,
+    purge_token_blacklist,
+    regenerate_qr_code,
+    rollup_analytics,
+    sample_background_task,
+    shutdown,
+    startup,
+)
 
 REDIS_QUEUE_HOST = settings.REDIS_QUEUE_HOST
 REDIS_QUEUE_PORT = settings.REDIS_QUEUE_PORT
 
 
 class WorkerSettings:
-    functions = [sample_background_task]
+    """Worker for the high priority queue: jobs someone is waiting on.
+
+    Run with `arq app.core.worker.settings.WorkerSettings`, and the low priority queue with
+    `arq app.core.worker.settings.LowPriorityWorkerSettings`, so maintenance never delays user facing jobs.
+    """
+
+    queue_name = HIGH_PRIORITY_QUEUE
+    functions = [sample_background_task, regenerate_qr_code, rollup_analytics, decay_popularity, purge_token_blacklist]
     redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
     on_startup = startup
     on_shutdown = shutdown
+    on_job_start, on_job_end = job_metrics_hooks(HIGH_PRIORITY_QUEUE)
+    max_jobs = settings.WORKER_MAX_JOBS
+    job_timeout = settings.WORKER_JOB_TIMEOUT
+    max_tries = settings.WORKER_MAX_TRIES
+    keep_result = settings.WORKER_KEEP_RESULT
     handle_signals = False
+
+
+class LowPriorityWorkerSettings(WorkerSettings):
+    """Worker for the low priority queue, which also runs the maintenance cron jobs."""
+
+    queue_name = LOW_PRIORITY_QUEUE
+    on_job_start, on_job_end = job_metrics_hooks(LOW_PRIORITY_QUEUE)
+    cron_jobs = [
+        cron(rollup_analytics, minute=set(range(0, 60, 5)), unique=True),
+        cron(decay_popularity, minute=0, unique=True),
+        cron(purge_token_blacklist, hour=4, minute=30, unique=True),
+    ]
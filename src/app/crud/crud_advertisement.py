@@ -1,7 +1,54 @@
+from datetime import UTC, datetime
+
 from fastcrud import FastCRUD
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.advertisement import Advertisement
 from ..schemas.advertisement import AdvertisementCreateInternal, AdvertisementDelete, AdvertisementUpdate, AdvertisementUpdateInternal
 
 CRUDAdvertisement = FastCRUD[Advertisement, AdvertisementCreateInternal, AdvertisementUpdate, AdvertisementUpdateInternal, AdvertisementDelete]
 crud_advertisement = CRUDAdvertisement(Advertisement)
+
+
+async def create_advertisements(db: AsyncSession, created_by_user_id: int, name: str, images: list[str]) -> list[dict]:
+    """Create one advertisement per image with a single multi-row `INSERT ... RETURNING` and commit.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+    created_by_user_id: int
+        The owner of the advertisements.
+    name: str
+        The name shared by the advertisements.
+    images: list[str]
+        The URLs of the uploaded images.
+
+    Returns
+    -------
+    list[dict]
+        The created advertisements, in the order of `images`.
+    """
+    created_at = datetime.now(UTC)
+    stmt = (
+        insert(Advertisement)
+        .values(
+            [
+                {"created_by_user_id": created_by_user_id, "name": name, "image": image, "created_at": created_at}
+                for image in images
+            ]
+        )
+        .returning(
+            Advertisement.id,
+            Advertisement.name,
+            Advertisement.image,
+            Advertisement.created_by_user_id,
+            Advertisement.created_at,
+        )
+    )
+    result = await db.execute(stmt)
+    created = sorted((dict(row) for row in result.mappings()), key=lambda row: row["id"])
+    await db.commit()
+
+    return created
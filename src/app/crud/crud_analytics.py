@@ -0,0 +1,135 @@
+import uuid as uuid_pkg
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.analytics import MenuScanRollup, ProductViewRollup
+from ..models.product import Product
+from ..models.user import User
+
+
+def _parse_uuids(values: Any) -> list[uuid_pkg.UUID]:
+    parsed = []
+    for value in values:
+        try:
+            parsed.append(uuid_pkg.UUID(value))
+        except ValueError:
+            continue
+    return parsed
+
+
+def _insert(db: AsyncSession, table: Any) -> Any:
+    """An `INSERT` supporting `ON CONFLICT DO UPDATE` on the session's database, Postgres or SQLite."""
+    insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+    return insert(table)
+
+
+async def save_rollups(db: AsyncSession, hour: datetime, counters: dict[str, Any]) -> None:
+    """Write one hour of counters, as returned by `analytics.read_hour`, to the rollup tables.
+
+    Rows are upserted with the full count of the hour, so running the job again for the same hour is harmless. The
+    upsert is built for the session's dialect, so this works on Postgres as well as SQLite.
+    Counters for unknown restaurants, or for products that do not belong to the restaurant they were viewed on,
+    are dropped.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+    hour: datetime
+        The start of the hour the counters belong to.
+    counters: dict[str, Any]
+        `scans` and `unique_visitors` by restaurant uuid, and `views` by `(restaurant uuid, product id)`.
+    """
+    restaurant_uuids = {restaurant_uuid for restaurant_uuid, _ in counters["views"]} | set(counters["scans"])
+    result = await db.execute(
+        select(User.uuid, User.id).where(User.uuid.in_(_parse_uuids(restaurant_uuids)), User.is_deleted.is_(False))
+    )
+    owner_ids = {str(restaurant_uuid): id for restaurant_uuid, id in result}
+
+    scan_rows = [
+        {
+            "created_by_user_id": owner_ids[restaurant_uuid],
+            "hour": hour,
+            "scans": scans,
+            "unique_visitors": counters["unique_visitors"].get(restaurant_uuid, 0),
+        }
+        for restaurant_uuid, scans in counters["scans"].items()
+        if restaurant_uuid in owner_ids
+    ]
+    if scan_rows:
+        stmt = _insert(db, MenuScanRollup).values(scan_rows)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[MenuScanRollup.created_by_user_id, MenuScanRollup.hour],
+                set_={"scans": stmt.excluded.scans, "unique_visitors": stmt.excluded.unique_visitors},
+            )
+        )
+
+    product_ids = {product_id for _, product_id in counters["views"]}
+    result = await db.execute(select(Product.id, Product.created_by_user_id).where(Product.id.in_(product_ids)))
+    product_owners = dict(result.tuples().all())
+    view_rows = [
+        {"created_by_user_id": owner_ids[restaurant_uuid], "product_id": product_id, "hour": hour, "views": views}
+        for (restaurant_uuid, product_id), views in counters["views"].items()
+        if restaurant_uuid in owner_ids and product_owners.get(product_id) == owner_ids[restaurant_uuid]
+    ]
+    if view_rows:
+        stmt = _insert(db, ProductViewRollup).values(view_rows)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ProductViewRollup.product_id, ProductViewRollup.hour],
+                set_={"views": stmt.excluded.views},
+            )
+        )
+
+    await db.commit()
+
+
+async def get_dashboard(db: AsyncSession, created_by_user_id: int, since: datetime, top: int = 10) -> dict[str, Any]:
+    """Read a restaurant's analytics from the rollup tables only.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+    created_by_user_id: int
+        The owner of the menu.
+    since: datetime
+        The first hour to include.
+    top: int, default 10
+        Number of most viewed products to return.
+
+    Returns
+    -------
+    dict[str, Any]
+        The totals, the per hour scans and unique visitors under `hourly`, and the most viewed products under
+        `top_products`. Unique visitors are counted per hour, so their total may count a visitor more than once.
+    """
+    result = await db.execute(
+        select(MenuScanRollup.hour, MenuScanRollup.scans, MenuScanRollup.unique_visitors)
+        .where(MenuScanRollup.created_by_user_id == created_by_user_id, MenuScanRollup.hour >= since)
+        .order_by(MenuScanRollup.hour)
+    )
+    hourly = [dict(row) for row in result.mappings()]
+
+    views = func.sum(ProductViewRollup.views).label("views")
+    result = await db.execute(
+        select(ProductViewRollup.product_id, Product.name, views)
+        .join(Product, Product.id == ProductViewRollup.product_id)
+        .where(ProductViewRollup.created_by_user_id == created_by_user_id, ProductViewRollup.hour >= since)
+        .group_by(ProductViewRollup.product_id, Product.name)
+        .order_by(views.desc())
+        .limit(top)
+    )
+    top_products = [dict(row) for row in result.mappings()]
+
+    return {
+        "scans": sum(row["scans"] for row in hourly),
+        "unique_visitors": sum(row["unique_visitors"] for row in hourly),
+        "hourly": hourly,
+        "top_products": top_products,
+    }
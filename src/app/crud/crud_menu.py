@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ARRAY, Integer, any_, bindparam, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.advertisement import Advertisement
+from ..models.category import Category
+from ..models.product import Product
+from ..schemas.advertisement import AdvertisementRead
+from ..schemas.category import CategoryRead
+from ..schemas.product import ProductRead
+
+MENU_MODELS: dict[str, tuple[Any, Any]] = {
+    "categories": (Category, CategoryRead),
+    "products": (Product, ProductRead),
+    "advertisements": (Advertisement, AdvertisementRead),
+}
+
+
+async def get_menu_changes(db: AsyncSession, created_by_user_id: int, since: datetime) -> dict[str, Any]:
+    """Return the menu rows of a restaurant created, updated or deleted at or after `since`.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+    created_by_user_id: int
+        The owner of the menu.
+    since: datetime
+        The lower bound, usually when the first version the client has not seen was taken.
+
+    Returns
+    -------
+    dict[str, Any]
+        For each of `categories`, `products` and `advertisements`, the changed rows, plus the ids of the deleted ones
+        under `deleted`.
+    """
+    changes: dict[str, Any] = {"deleted": {}}
+    for name, (model, schema) in MENU_MODELS.items():
+        columns = [model.__table__.c[field] for field in schema.model_fields if field in model.__table__.c]
+        stmt = select(*columns, model.is_deleted).where(
+            model.created_by_user_id == created_by_user_id,
+            or_(model.created_at >= since, model.updated_at >= since, model.deleted_at >= since),
+        )
+        result = await db.execute(stmt)
+
+        changes[name] = []
+        changes["deleted"][name] = []
+        for row in result.mappings():
+            row = dict(row)
+            if row.pop("is_deleted"):
+                changes["deleted"][name].append(row["id"])
+            else:
+                changes[name].append(row)
+
+    return changes
+
+
+async def get_menu_items_by_ids(
+    db: AsyncSession, name: str, created_by_user_id: int, ids: list[int]
+) -> dict[int, dict[str, Any]]:
+    """Load some categories or products of a restaurant by id in one query.
+
+    The ids are bound as a single array (`WHERE id = ANY($1::INTEGER[])`), so the statement is the same for any
+    number of ids and its prepared plan is reused.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+    name: str
+        `categories` or `products`.
+    created_by_user_id: int
+        The owner of the menu; rows of other menus are never returned.
+    ids: list[int]
+        The ids to load.
+
+    Returns
+    -------
+    dict[int, dict[str, Any]]
+        The rows found, as their read schema's columns, by id. Deleted and unknown ids are left out.
+    """
+    model, schema = MENU_MODELS[name]
+    columns = [model.__table__.c[field] for field in schema.model_fields if field in model.__table__.c]
+    stmt = select(*columns).where(
+        model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))),
+        model.created_by_user_id == created_by_user_id,
+        model.is_deleted.is_(False),
+    )
+    result = await db.execute(stmt)
+    return {row["id"]: dict(row) for row in result.mappings()}
@@ -1,7 +1,66 @@
+from datetime import UTC, datetime
+
 from fastcrud import FastCRUD
+from sqlalchemy import Boolean, Integer, column, func, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.product import Product
-from ..schemas.product import ProductCreateInternal, ProductDelete, ProductUpdate, ProductUpdateInternal
+from ..schemas.product import (
+    ProductBulkUpdateItem,
+    ProductCreateInternal,
+    ProductDelete,
+    ProductUpdate,
+    ProductUpdateInternal,
+)
 
 CRUDProduct = FastCRUD[Product, ProductCreateInternal, ProductUpdate, ProductUpdateInternal, ProductDelete]
 crud_product = CRUDProduct(Product)
+
+
+async def bulk_update_products(
+    db: AsyncSession, created_by_user_id: int, items: list[ProductBulkUpdateItem]
+) -> list[dict]:
+    """Apply price and stock changes to many products of one owner in a single statement.
+
+    The changes are sent as a `VALUES` list joined against `product` (`UPDATE ... FROM (VALUES ...)`), so the whole
+    batch costs one round trip no matter how many products it touches. Fields left as `None` keep their current value.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+    created_by_user_id: int
+        The owner of the products. Rows belonging to anyone else are never touched.
+    items: list[ProductBulkUpdateItem]
+        The changes to apply. If an id is repeated, the last entry wins.
+
+    Returns
+    -------
+    list[dict]
+        The `id`, `price` and `stock_available` of every product that was updated.
+    """
+    rows = {item.id: item for item in items}.values()
+    changes = values(
+        column("id", Integer), column("price", Integer), column("stock_available", Boolean), name="changes"
+    ).data([(item.id, item.price, item.stock_available) for item in rows])
+
+    stmt = (
+        update(Product)
+        .where(
+            Product.id == changes.c.id,
+            Product.created_by_user_id == created_by_user_id,
+            Product.is_deleted.is_(False),
+        )
+        .values(
+            price=func.coalesce(changes.c.price, Product.price),
+            stock_available=func.coalesce(changes.c.stock_available, Product.stock_available),
+            updated_at=datetime.now(UTC),
+        )
+        .returning(Product.id, Product.price, Product.stock_available)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    updated = [dict(row) for row in result.mappings()]
+    await db.commit()
+
+    return updated
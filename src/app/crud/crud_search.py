@@ -0,0 +1,99 @@
+import re
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_POSTGRES_SEARCH = text(
+    """
+    WITH q AS (SELECT websearch_to_tsquery('simple', :query) AS tsq)
+    SELECT p.id, p.name, p.description, p.price, p.image, p.stock_available, p.category_id,
+           c.name AS category_name,
+           ts_rank(p.search_vector, q.tsq)
+             + greatest(word_similarity(:query, p.name), word_similarity(:query, c.name) * 0.5) AS rank,
+           count(*) OVER () AS total_count
+    FROM q, product AS p
+    JOIN category AS c ON c.id = p.category_id
+    WHERE p.created_by_user_id = :created_by_user_id
+      AND p.is_deleted IS FALSE
+      AND (p.search_vector @@ q.tsq OR :query <% p.name OR :query <% c.name)
+    ORDER BY rank DESC, p.id
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+_SQLITE_SEARCH = text(
+    """
+    SELECT p.id, p.name, p.description, p.price, p.image, p.stock_available, p.category_id,
+           c.name AS category_name,
+           -bm25(product_fts, 10.0, 1.0, 5.0) AS rank,
+           count(*) OVER () AS total_count
+    FROM product_fts
+    JOIN product AS p ON p.id = product_fts.rowid
+    JOIN category AS c ON c.id = p.category_id
+    WHERE product_fts MATCH :query
+      AND p.created_by_user_id = :created_by_user_id
+      AND p.is_deleted = 0
+    ORDER BY rank DESC, p.id
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+
+def _to_fts5_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix.
+
+    Example
+    -------
+    >>> _to_fts5_query('chicken "tikka')
+    '"chicken"* "tikka"*'
+    """
+    tokens = re.findall(r"\w+", query)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+async def search_products(
+    db: AsyncSession, created_by_user_id: int, query: str, offset: int = 0, limit: int = 20
+) -> dict[str, Any]:
+    """Search the products of one restaurant by product name, description and category name.
+
+    On Postgres the generated `product.search_vector` column (GIN indexed) is matched with `websearch_to_tsquery`,
+    and `pg_trgm` word similarity on the product and category names catches typos and partial words. On SQLite the
+    `product_fts` FTS5 table is used with prefix matching, so local and benchmark runs behave alike.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+    created_by_user_id: int
+        The owner of the menu being searched.
+    query: str
+        The free text typed by the user.
+    offset: int, default 0
+        Number of results to skip.
+    limit: int, default 20
+        Maximum number of results to return.
+
+    Returns
+    -------
+    dict[str, Any]
+        A dictionary with the ranked results under `data` and the number of matches under `total_count`,
+        matching the shape returned by FastCRUD's `get_multi`.
+    """
+    params: dict[str, Any] = {"created_by_user_id": created_by_user_id, "limit": limit, "offset": offset}
+    if db.bind.dialect.name == "sqlite":
+        params["query"] = _to_fts5_query(query)
+        if not params["query"]:
+            return {"data": [], "total_count": 0}
+        statement = _SQLITE_SEARCH
+    else:
+        params["query"] = query
+        statement = _POSTGRES_SEARCH
+
+    result = await db.execute(statement, params)
+    rows = [dict(row) for row in result.mappings()]
+    total_count = rows[0].pop("total_count") if rows else 0
+    for row in rows[1:]:
+        row.pop("total_count")
+
+    return {"data": rows, "total_count": total_count}
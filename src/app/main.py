@@ -4,7 +4,7 @@ from .api import router
 from .core.config import settings
 from .core.setup import create_application
 
-app = create_application(router=router, settings=settings)
+app = create_application(router=router, settings=settings, create_tables_on_start=settings.CREATE_TABLES_ON_START)
 
 origins = ["*"]
 app.add_middleware(
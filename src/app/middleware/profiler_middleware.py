@@ -0,0 +1,93 @@
+import json
+import uuid as uuid_pkg
+from urllib.parse import parse_qs
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..api.dependencies import get_optional_user
+from ..core.config import settings
+from ..core.db.database import local_session
+from ..core.logger import logging
+from ..core.utils import profiler
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+INTERVAL = settings.PROFILER_INTERVAL
+
+
+class ProfilerMiddleware:
+    """Middleware running a superuser's request under pyinstrument when it asks for it.
+
+    A request carrying an `X-Profile: 1` header or a `profile=1` query parameter is sampled every
+    `PROFILER_INTERVAL` seconds, with time spent awaiting attributed to the coroutine that awaited. The report is
+    stored in Redis for `PROFILER_TTL` seconds and its id returned in the `X-Profile-Id` response header; read it
+    back from `GET /api/v1/profiles/{profile_id}`.
+
+    Parameters
+    ----------
+    app: ASGIApp
+        The application to wrap.
+
+    Note
+    ----
+        - Requests without the flag only pay for a header and query string lookup.
+        - Flagged requests from anyone but a superuser run normally, without profiling.
+        - pyinstrument is an optional dependency (`poetry install -E profiling`); without it the flag is ignored.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        try:
+            from pyinstrument import Profiler
+
+            self.profiler_class: type | None = Profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed, request profiling is disabled.")
+            self.profiler_class = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.profiler_class is None or not _is_flagged(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not await _is_superuser(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid_pkg.uuid4().hex
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        sampler = self.profiler_class(interval=INTERVAL, async_mode="enabled")
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            session = sampler.stop()
+            try:
+                await profiler.save_profile(profile_id, json.dumps(session.to_json()))
+            except Exception as e:
+                logger.exception(f"Error storing profile {profile_id} of {scope['path']}: {e}")
+
+
+def _is_flagged(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value not in (b"", b"0", b"false")
+
+    query_string = scope.get("query_string", b"")
+    if b"profile=" not in query_string:
+        return False
+    return parse_qs(query_string.decode("latin-1")).get("profile", ["0"])[-1] not in ("", "0", "false")
+
+
+async def _is_superuser(scope: Scope) -> bool:
+    async with local_session() as db:
+        user = await get_optional_user(Request(scope), db=db)
+    return bool(user and user["is_superuser"])
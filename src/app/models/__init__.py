@@ -3,4 +3,6 @@ from .rate_limit import RateLimit
 from .tier import Tier
 from .user import User
 from .category import Category
-from .product import Product
\ No newline at end of file
+from .product import Product
+from .advertisement import Advertisement
+from .analytics import MenuScanRollup, ProductViewRollup
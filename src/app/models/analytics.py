@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db.database import Base
+
+
+class MenuScanRollup(Base):
+    __tablename__ = "menu_scan_rollup"
+    __table_args__ = (UniqueConstraint("created_by_user_id", "hour"),)
+
+    id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
+    created_by_user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    scans: Mapped[int] = mapped_column(Integer, default=0)
+    unique_visitors: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ProductViewRollup(Base):
+    __tablename__ = "product_view_rollup"
+    __table_args__ = (UniqueConstraint("product_id", "hour"),)
+
+    id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
+    created_by_user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("product.id"), index=True)
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    views: Mapped[int] = mapped_column(Integer, default=0)
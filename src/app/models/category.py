@@ -1,7 +1,7 @@
 import uuid as uuid_pkg
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DDL, DateTime, ForeignKey, String, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..core.db.database import Base
@@ -19,3 +19,19 @@ class Category(Base):
     updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
     is_deleted: Mapped[bool] = mapped_column(default=False, index=True)
+
+
+# -------------- search --------------
+# Trigram index backing typo tolerant category name matches in `crud_search.search_products`.
+event.listen(
+    Category.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Category.__table__,
+    "after_create",
+    DDL("CREATE INDEX IF NOT EXISTS ix_category_name_trgm ON category USING gin (name gin_trgm_ops)").execute_if(
+        dialect="postgresql"
+    ),
+)
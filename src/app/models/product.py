@@ -1,7 +1,7 @@
 import uuid as uuid_pkg
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Integer
+from sqlalchemy import DDL, DateTime, ForeignKey, Integer, String, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..core.db.database import Base
@@ -22,3 +22,62 @@ class Product(Base):
     updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
     is_deleted: Mapped[bool] = mapped_column(default=False, index=True)
+
+
+# -------------- search --------------
+# Postgres: a generated, weighted `tsvector` with a GIN index for full-text search, plus a trigram index on the name
+# for typo tolerance. Kept out of the mapped columns so FastCRUD never selects or writes it.
+_POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE product ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_product_search_vector ON product USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_product_name_trgm ON product USING gin (name gin_trgm_ops)",
+]
+
+# SQLite (local and benchmark runs): an FTS5 table keyed by the product id, kept in sync by triggers.
+_SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+        name, description, category_name, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (
+            new.id, new.name, coalesce(new.description, ''), (SELECT name FROM category WHERE id = new.category_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_au AFTER UPDATE ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+        INSERT INTO product_fts (rowid, name, description, category_name)
+        VALUES (
+            new.id, new.name, coalesce(new.description, ''), (SELECT name FROM category WHERE id = new.category_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_category_au AFTER UPDATE OF name ON category BEGIN
+        UPDATE product_fts SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM product WHERE category_id = new.id);
+    END
+    """,
+]
+
+for _statement in _POSTGRES_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+for _statement in _SQLITE_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
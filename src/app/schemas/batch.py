@@ -0,0 +1,16 @@
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BatchItem(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    method: Literal["GET"] = "GET"
+    url: Annotated[str, Field(pattern=r"^/api/v1/", examples=["/api/v1/user/product?fields=name,price"])]
+
+
+class BatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    requests: Annotated[list[BatchItem], Field(min_length=1)]
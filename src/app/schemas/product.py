@@ -15,12 +15,15 @@ class Product(TimestampSchema, ProductBase, PersistentDeletion):
     created_by_user_id: int
 
 class ProductRead(BaseModel):
-    name: Annotated[str, Field(min_length=2, max_length=30, examples=["This is my product name"])]
-    description: Annotated[str, Field(min_length=1, max_length=63206, examples=["This is the product description"])]
-    image: Optional[Annotated[str, Field(min_length=1, max_length=100000, examples=["This is the product image content."])]]
+    id: int
+    category_id: int
+    name: Annotated[str, Field(max_length=30, examples=["This is my product name"])]
+    description: Annotated[str | None, Field(max_length=63206, examples=["This is the product description"])]
+    image: Annotated[str | None, Field(examples=["This is the product image content."])]
     created_by_user_id: int
     created_at: datetime
     price : int
+    stock_available: bool
 class ProductCreate(ProductBase):
     model_config = ConfigDict(extra="forbid")
 
@@ -53,6 +56,14 @@ class ProductUpdateInternal(BaseModel):
     stock_available : bool | None = None
 
 
+class ProductBulkUpdateItem(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    id: int
+    price: int | None = None
+    stock_available: bool | None = None
+
+
 class ProductDelete(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
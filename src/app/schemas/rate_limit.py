@@ -14,6 +14,7 @@ class RateLimitBase(BaseModel):
     path: Annotated[str, Field(examples=["users"])]
     limit: Annotated[int, Field(examples=[5])]
     period: Annotated[int, Field(examples=[60])]
+    cost: Annotated[int, Field(default=1, ge=1, examples=[1])]
 
     @field_validator("path")
     def validate_and_sanitize_path(cls, v: str) -> str:
@@ -45,6 +46,7 @@ class RateLimitUpdate(BaseModel):
     path: str | None = Field(default=None)
     limit: int | None = None
     period: int | None = None
+    cost: int | None = Field(default=None, ge=1)
     name: str | None = None
 
     @field_validator("path")
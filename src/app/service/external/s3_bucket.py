@@ -1,5 +1,8 @@
-import boto3
+import asyncio
+from functools import lru_cache
+from typing import Any
 
+from app.core import tracing
 from app.core.config import settings
 from app.core.logger import logging
 
@@ -9,20 +12,57 @@ s3_bucket_access_key = settings.S3_BUCKET_ACCESS_KEY
 s3_bucket_secret_key = settings.S3_BUCKET_SECRET_KEY
 region = settings.S3_BUCKET_REGION
 BUCKET = settings.S3_BUCKET
+UPLOAD_CONCURRENCY = settings.S3_UPLOAD_CONCURRENCY
 
 
+@lru_cache
+def get_s3_client() -> Any:
+    """Create the S3 client on first use, so boto3 is only imported by processes that talk to S3."""
+    import boto3
+
+    client = boto3.client(
+        's3',
+        aws_access_key_id=s3_bucket_access_key,
+        aws_secret_access_key=s3_bucket_secret_key,
+        region_name=region,
+    )
+    return tracing.instrument_boto3(client)
+
+
+@lru_cache
+def get_s3_probe_client(timeout: float) -> Any:
+    """A client for health probes: it gives up after `timeout` seconds instead of boto3's 60s and never retries."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        's3',
+        aws_access_key_id=s3_bucket_access_key,
+        aws_secret_access_key=s3_bucket_secret_key,
+        region_name=region,
+        config=Config(connect_timeout=timeout, read_timeout=timeout, retries={"max_attempts": 0}),
+    )
+
+
+def qr_image_key(name: str) -> str:
+    return f'menu-card/qr-{name}.png'.replace(' ', '-')
+
+
+def qr_image_url(name: str) -> str:
+    """The URL a QR code uploaded with `upload_qr_image_to_s3(name=name)` is served from."""
+    return f'https://{BUCKET}.s3.amazonaws.com/{qr_image_key(name)}'
+
+
+class ObjectTooLargeError(ValueError):
+    """The object is larger than the `max_bytes` it was downloaded with."""
+
 
 class S3Utils:
     
     def upload_image_to_s3(self, name: str, file):
             """Upload the file to S3."""
             logger.info(f'Uploading file {file} to S3 Bucket')
-            s3 = boto3.client(
-                    's3',
-                    aws_access_key_id=s3_bucket_access_key,
-                    aws_secret_access_key=s3_bucket_secret_key,
-                    region_name=region,
-            )
+            s3 = get_s3_client()
             obj_name = f'menu-card/{name}-{file.filename}'.replace(' ', '-')
             try:
                 
@@ -37,16 +77,24 @@ class S3Utils:
             except FileNotFoundError:
                     logger.error(f"The file '{file}' was not found.")
                     
+    async def upload_images_to_s3(self, name: str, files: list) -> list[str | BaseException | None]:
+            """Upload many files concurrently, at most `S3_UPLOAD_CONCURRENCY` at a time, off the event loop.
+
+            Returns one entry per file, in order: its URL, or the exception (or None) its upload ended with.
+            """
+            semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+            async def upload(file) -> str | None:
+                    async with semaphore:
+                            return await asyncio.to_thread(self.upload_image_to_s3, name=name, file=file)
+
+            return await asyncio.gather(*(upload(file) for file in files), return_exceptions=True)
+
     def upload_qr_image_to_s3(self, name: str, file):
             """Upload the image to S3."""
             logger.info(f'Uploading file {file} to S3 Bucket')
-            s3 = boto3.client(
-                    's3',
-                    aws_access_key_id=s3_bucket_access_key,
-                    aws_secret_access_key=s3_bucket_secret_key,
-                    region_name=region,
-            )
-            obj_name = f'menu-card/qr-{name}.png'.replace(' ', '-')
+            s3 = get_s3_client()
+            obj_name = qr_image_key(name)
             try:
                 
                 #     s3.upload_fileobj(file.file, BUCKET, obj_name, ExtraArgs={'ACL': 'public-read'})
@@ -60,16 +108,49 @@ class S3Utils:
             except FileNotFoundError:
                     logger.error(f"The file '{file}' was not found.")
 
+    def download_image_from_s3(self, key: str, max_bytes: int | None = None) -> bytes | None:
+            """Download an object from S3, returning None if it does not exist.
+
+            With `max_bytes`, raise `ObjectTooLargeError` for larger objects without buffering them: the announced
+            `ContentLength` is checked first and at most `max_bytes + 1` bytes are ever read.
+            """
+            s3 = get_s3_client()
+            try:
+                    response = s3.get_object(Bucket=BUCKET, Key=key)
+            except s3.exceptions.NoSuchKey:
+                    logger.warning(f"The file '{key}' was not found in S3 Bucket.")
+                    return None
+
+            body = response['Body']
+            try:
+                    if max_bytes is None:
+                            return body.read()
+
+                    if response.get('ContentLength', 0) > max_bytes:
+                            raise ObjectTooLargeError(f"Object '{key}' is larger than {max_bytes} bytes.")
+                    data = body.read(max_bytes + 1)
+                    if len(data) > max_bytes:
+                            raise ObjectTooLargeError(f"Object '{key}' is larger than {max_bytes} bytes.")
+                    return data
+            finally:
+                    body.close()
+
+    def delete_images_from_s3(self, file_urls: list[str]):
+            """Delete many uploaded files from S3 in a single request."""
+            keys = [file_url.split('.amazonaws.com/', 1)[-1] for file_url in file_urls]
+            try:
+                    s3 = get_s3_client()
+                    s3.delete_objects(Bucket=BUCKET, Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True})
+                    logger.info(f'{len(keys)} files deleted successfully from S3 bucket')
+
+            except Exception as e:
+                    logger.error(f'Error during deleting: {e}')
+
     def delete_image_from_s3(self, file_url):
             """Delete the attachment file from S3"""
             try:
                     obj_name = file_url.split('/')[-1]
-                    s3 = boto3.client(
-                            's3',
-                            aws_access_key_id=s3_bucket_access_key,
-                            aws_secret_access_key=s3_bucket_secret_key,
-                            region_name=region,
-                    )
+                    s3 = get_s3_client()
                     s3.delete_object(Bucket=BUCKET, Key=obj_name)
                     logger.info(f'The file {obj_name} deleted successfully from S3 bucket')
 
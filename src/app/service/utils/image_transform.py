@@ -0,0 +1,57 @@
+from io import BytesIO
+from typing import Any
+
+FORMATS: dict[str, tuple[str, str]] = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+
+SAVE_OPTIONS: dict[str, dict[str, Any]] = {
+    "WEBP": {"quality": 80, "method": 4},
+    "JPEG": {"quality": 80, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+}
+
+
+class UnsupportedImageError(ValueError):
+    """The source is not an image Pillow can identify."""
+
+
+class InvalidImageError(ValueError):
+    """The source looks like an image but cannot be decoded, e.g. it is truncated or a decompression bomb."""
+
+
+def transform_image(data: bytes, width: int, fmt: str) -> bytes:
+    """Resize an image to at most `width` pixels wide, keeping its aspect ratio, and re-encode it as `fmt`.
+
+    Runs in a worker process, so it only takes and returns bytes. Pillow is imported here rather than at module level
+    so the API process never pays for it, and its errors are raised as `UnsupportedImageError`/`InvalidImageError`,
+    which the API process can catch without importing Pillow.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        return _transform(Image, ImageOps, data, width, fmt)
+    except UnidentifiedImageError as e:
+        raise UnsupportedImageError(str(e)) from None
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(f"{type(e).__name__}: {e}") from None
+
+
+def _transform(Image: Any, ImageOps: Any, data: bytes, width: int, fmt: str) -> bytes:
+    pil_format, _ = FORMATS[fmt]
+    with Image.open(BytesIO(data)) as source:
+        img = ImageOps.exif_transpose(source)
+        if img.width > width:
+            img.thumbnail((width, img.height), Image.Resampling.LANCZOS)
+
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA")
+
+        buffer = BytesIO()
+        img.save(buffer, format=pil_format, **SAVE_OPTIONS[pil_format])
+
+    return buffer.getvalue()
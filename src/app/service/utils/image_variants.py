@@ -0,0 +1,133 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from ...core.config import settings
+from ...core.logger import logging
+from ...core.utils.disk_cache import DiskLRUCache
+from ..external.s3_bucket import ObjectTooLargeError, S3Utils
+from .image_transform import transform_image
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_WIDTHS = frozenset(int(width) for width in settings.IMAGE_WIDTHS.split(","))
+MAX_SOURCE_BYTES = settings.IMAGE_MAX_SOURCE_BYTES
+
+executor: ProcessPoolExecutor | None = None
+disk_cache: DiskLRUCache | None = None
+_disk_cache_lock = threading.Lock()
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+class SourceTooLargeError(ValueError):
+    """The source image is larger than `IMAGE_MAX_SOURCE_BYTES`."""
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global executor
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return executor
+
+
+def _get_disk_cache() -> DiskLRUCache:
+    """The variants' disk cache, created on first use; called from threads, since it scans the directory."""
+    global disk_cache
+    with _disk_cache_lock:
+        if disk_cache is None:
+            disk_cache = DiskLRUCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
+    return disk_cache
+
+
+def shutdown_executor() -> None:
+    global executor
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
+
+
+async def _render_variant(variant: str, key: str, width: int, fmt: str) -> str | None:
+    try:
+        data = await asyncio.to_thread(S3Utils().download_image_from_s3, key, MAX_SOURCE_BYTES)
+    except ObjectTooLargeError as e:
+        raise SourceTooLargeError(str(e)) from None
+    if data is None:
+        return None
+
+    loop = asyncio.get_running_loop()
+    output = await loop.run_in_executor(_get_executor(), transform_image, data, width, fmt)
+    return await asyncio.to_thread(lambda: _get_disk_cache().put(variant, output))
+
+
+async def get_variant(key: str, width: int, fmt: str) -> str | None:
+    """Return the path of a resized copy of a stored image, rendering it on the first request.
+
+    Rendered variants live in a size-bounded LRU directory on local disk. Concurrent first requests for the same
+    variant wait on a single download and transform instead of each doing their own. A failed render is never
+    cached: it is only shared with the requests already waiting on it, and the next request tries again.
+
+    Parameters
+    ----------
+    key: str
+        The storage key of the source image.
+    width: int
+        The maximum width, one of `ALLOWED_WIDTHS`.
+    fmt: str
+        The output format, one of `image_transform.FORMATS`.
+
+    Returns
+    -------
+    str | None
+        The path of the cached variant, or None if the source image does not exist.
+
+    Raises
+    ------
+    SourceTooLargeError
+        If the source is larger than `IMAGE_MAX_SOURCE_BYTES`.
+    image_transform.UnsupportedImageError
+        If the source is not an image.
+    image_transform.InvalidImageError
+        If the source image cannot be decoded.
+    """
+    variant = f"{key}|{width}|{fmt}"
+    path = await asyncio.to_thread(lambda: _get_disk_cache().get(variant))
+    if path is not None:
+        return path
+
+    future = _in_flight.get(variant)
+    if future is None:
+        future = asyncio.ensure_future(_render_variant(variant, key, width, fmt))
+        _in_flight[variant] = future
+        future.add_done_callback(lambda _: _in_flight.pop(variant, None))
+        # Retrieve the exception even when every waiter was cancelled, so a failure is not logged as never retrieved
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    return await asyncio.shield(future)
+
+
+def _read(path: str) -> tuple[os.stat_result, bytes] | None:
+    try:
+        with open(path, "rb") as file:
+            return os.fstat(file.fileno()), file.read()
+    except FileNotFoundError:
+        return None
+
+
+async def read_variant(key: str, width: int, fmt: str) -> tuple[os.stat_result, bytes] | None:
+    """Like `get_variant`, but return the variant's stat and bytes, read from one open file.
+
+    The cached file can be evicted by this or another process between `get_variant` returning its path and the file
+    being opened. Statting the open descriptor keeps the stat and the content consistent, and a variant evicted in
+    between is rendered again once.
+    """
+    for _ in range(2):
+        path = await get_variant(key, width, fmt)
+        if path is None:
+            return None
+
+        variant = await asyncio.to_thread(_read, path)
+        if variant is not None:
+            return variant
+
+    raise FileNotFoundError(f"Variant of '{key}' was evicted while being served.")
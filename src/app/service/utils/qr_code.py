@@ -1,9 +1,12 @@
-import qrcode
 from io import BytesIO
-from PIL import Image
-from ..external.s3_bucket import S3Utils
 
-def generate_qr_code(url: str) -> BytesIO:
+MENU_URL = "https://menucard.site/users/index/{user_uuid}"
+
+
+def render_qr_code(url: str) -> bytes:
+    """Render a QR code for `url` as PNG bytes. CPU bound, picklable, so it can run in a process pool."""
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -19,7 +22,4 @@ def generate_qr_code(url: str) -> BytesIO:
     
     buffer = BytesIO()
     img.save(buffer, format="PNG")
-    buffer.seek(0)
-    s3_object = S3Utils() 
-
-    return s3_object.upload_qr_image_to_s3(name="qr-code", file=buffer)
+    return buffer.getvalue()
@@ -0,0 +1,37 @@
+"""add product search
+
+Revision ID: 3f9c1a7e5b21
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c1a7e5b21"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# IF NOT EXISTS: databases created by `create_all` already got these from the model's after_create listener
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        ALTER TABLE product ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_product_search_vector ON product USING gin (search_vector)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_product_name_trgm ON product USING gin (name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_product_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_product_search_vector")
+    op.execute("ALTER TABLE product DROP COLUMN IF EXISTS search_vector")
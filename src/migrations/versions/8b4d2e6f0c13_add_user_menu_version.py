@@ -0,0 +1,24 @@
+"""add user menu_version
+
+Revision ID: 8b4d2e6f0c13
+Revises: 3f9c1a7e5b21
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4d2e6f0c13"
+down_revision: Union[str, None] = "3f9c1a7e5b21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS menu_version INTEGER NOT NULL DEFAULT 0')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE "user" DROP COLUMN IF EXISTS menu_version')
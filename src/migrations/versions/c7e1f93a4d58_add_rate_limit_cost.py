@@ -0,0 +1,24 @@
+"""add rate_limit cost
+
+Revision ID: c7e1f93a4d58
+Revises: 8b4d2e6f0c13
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e1f93a4d58"
+down_revision: Union[str, None] = "8b4d2e6f0c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE rate_limit ADD COLUMN IF NOT EXISTS cost INTEGER NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE rate_limit DROP COLUMN IF EXISTS cost")
@@ -0,0 +1,87 @@
+"""Measure how long the API takes to become ready.
+
+Reports the import time of the application module broken down by top-level package (from `python -X importtime`)
+and the time until the first request is answered, including the lifespan startup. Exits with status 1 when the
+time to first request is over the budget.
+
+Run from the repository root:
+
+    python -m src.scripts.profile_startup --budget 2.0
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any
+
+_FIRST_REQUEST = """
+import importlib, json, time
+started = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(module.app) as client:
+    ready = time.perf_counter()
+    client.get("/__startup_probe__")
+    answered = time.perf_counter()
+print(json.dumps({{"import": imported - started, "lifespan": ready - imported, "first_request": answered - ready}}))
+"""
+
+
+def import_breakdown(module: str, top: int = 15) -> list[tuple[str, float]]:
+    """Return the `top` slowest top-level packages imported by `module`, with their cumulative seconds."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    totals: dict[str, float] = defaultdict(float)
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.startswith("  "):  # nested import, already counted in its parent's cumulative time
+            continue
+        totals[name.strip().split(".")[0]] += int(cumulative) / 1_000_000
+
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def time_to_first_request(module: str) -> dict[str, Any]:
+    """Start a fresh interpreter, import the app, run its lifespan and answer one request."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _FIRST_REQUEST.format(module=module)], capture_output=True, text=True, check=True
+    )
+    timings: dict[str, Any] = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings["total"] = time.perf_counter() - started
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.app.main", help="module exposing the FastAPI `app`")
+    parser.add_argument("--budget", type=float, default=2.0, help="maximum seconds until the first response")
+    parser.add_argument("--top", type=int, default=15, help="number of packages in the import breakdown")
+    args = parser.parse_args()
+
+    print(f"Import time of {args.module} by top-level package:")
+    for package, seconds in import_breakdown(args.module, top=args.top):
+        print(f"  {package:<30} {seconds * 1000:8.1f} ms")
+
+    timings = time_to_first_request(args.module)
+    print("Time to first request:")
+    for phase, seconds in timings.items():
+        print(f"  {phase:<30} {seconds * 1000:8.1f} ms")
+
+    if timings["total"] > args.budget:
+        print(f"Startup took {timings['total']:.2f}s, over the {args.budget:.2f}s budget.")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
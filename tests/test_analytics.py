@@ -0,0 +1,22 @@
+import pytest
+
+from src.app.core.utils import analytics
+from src.app.core.utils.popularity import popular_key
+
+UUID = "0e1f7f3c-55a6-4b57-9f0c-2c4e6a0c8e11"
+
+
+def test_every_spelling_of_a_menu_uuid_counts_for_the_same_menu(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(analytics, "_scans", analytics.Counter())
+    monkeypatch.setattr(analytics, "_views", analytics.Counter())
+    monkeypatch.setattr(analytics, "_visitors", {})
+
+    analytics.record_scan(UUID.upper(), "10.0.0.1")
+    analytics.record_scan(UUID.replace("-", ""), "10.0.0.2")
+    analytics.record_view(UUID.upper(), 1)
+    analytics.record_view(UUID, 1)
+
+    assert analytics._scans == {UUID: 2}
+    assert analytics._visitors == {UUID: {"10.0.0.1", "10.0.0.2"}}
+    assert analytics._views == {(UUID, 1): 2}
+    assert popular_key(UUID.upper()) == f"popular:{UUID}"
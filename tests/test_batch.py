@@ -0,0 +1,69 @@
+import asyncio
+import json
+from typing import Any
+
+from src.app.core.utils.batch import SubResponse, dispatch, render, sub_scope
+
+SCOPE = {
+    "type": "http",
+    "method": "POST",
+    "path": "/api/v1/batch",
+    "headers": [
+        (b"authorization", b"Bearer token"),
+        (b"content-type", b"application/json"),
+        (b"content-length", b"80"),
+    ],
+    "client": ("203.0.113.7", 51234),
+    "state": {"user_token": "token"},
+}
+
+
+def test_sub_requests_keep_the_callers_credentials_and_state() -> None:
+    scope = sub_scope(SCOPE, "/api/v1/user/product?fields=name,price")
+
+    assert scope["method"] == "GET"
+    assert scope["path"] == "/api/v1/user/product"
+    assert scope["query_string"] == b"fields=name,price"
+    assert scope["headers"] == [(b"authorization", b"Bearer token")]
+    assert scope["client"] == SCOPE["client"]
+    assert scope["state"] == SCOPE["state"] and scope["state"] is not SCOPE["state"]
+
+
+def test_sub_request_paths_are_decoded_like_over_the_network() -> None:
+    scope = sub_scope(SCOPE, "/api/v1/img/menu-card/caf%C3%A9%20menu.jpg?w=320")
+
+    assert scope["path"] == "/api/v1/img/menu-card/café menu.jpg"
+    assert scope["raw_path"] == b"/api/v1/img/menu-card/caf%C3%A9%20menu.jpg"
+
+
+def test_responses_are_rendered_in_request_order_with_json_bodies_embedded() -> None:
+    responses = {
+        "/api/v1/user/me/": SubResponse(200, [(b"content-type", b"application/json")], b'{"id":1}'),
+        "/api/v1/user/product": SubResponse(404, [(b"content-type", b"text/plain")], b"Not found"),
+    }
+    urls = ["/api/v1/user/product", "/api/v1/user/me/", "/api/v1/user/product"]
+
+    body = json.loads(render(urls, responses))
+
+    assert [item["url"] for item in body["responses"]] == urls
+    assert body["responses"][0]["status"] == 404 and body["responses"][0]["body"] == "Not found"
+    assert body["responses"][1]["body"] == {"id": 1}
+
+
+def test_a_failing_sub_request_answers_500_without_failing_the_others() -> None:
+    async def app(scope: dict, receive: Any, send: Any) -> None:
+        if scope["path"] == "/api/v1/fail":
+            await send({"type": "http.response.start", "status": 500, "headers": []})
+            await send({"type": "http.response.body", "body": b"Internal Server Error"})
+            raise RuntimeError("boom")
+
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def run() -> list[SubResponse]:
+        return await asyncio.gather(*(dispatch(app, sub_scope(SCOPE, url)) for url in ["/api/v1/ok", "/api/v1/fail"]))
+
+    ok, failed = asyncio.run(run())
+
+    assert (ok.status, ok.body) == (200, b"ok")
+    assert failed.status == 500 and json.loads(failed.body) == {"detail": "Internal Server Error"}
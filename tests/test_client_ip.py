@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from src.app.core.utils.client_ip import get_client_ip, rate_limit_bucket
+
+
+def make_request(host: str, forwarded_for: str | None = None) -> SimpleNamespace:
+    headers = {"x-forwarded-for": forwarded_for} if forwarded_for else {}
+    return SimpleNamespace(client=SimpleNamespace(host=host), headers=headers)
+
+
+def test_forwarded_for_ignored_from_untrusted_peer() -> None:
+    assert get_client_ip(make_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+def test_forwarded_for_read_from_the_right_behind_trusted_proxy() -> None:
+    assert get_client_ip(make_request("172.18.0.2", "1.2.3.4, 203.0.113.7")) == "203.0.113.7"
+    assert get_client_ip(make_request("172.18.0.2", "203.0.113.7, 10.0.0.5")) == "203.0.113.7"
+
+
+def test_invalid_forwarded_for_entry_stops_the_walk() -> None:
+    assert get_client_ip(make_request("172.18.0.2", "203.0.113.7, not-an-ip")) == "172.18.0.2"
+
+
+def test_ipv6_clients_are_bucketed_by_prefix() -> None:
+    assert rate_limit_bucket("2001:db8:1:2:3:4:5:6") == "2001:db8:1:2::/64"
+    assert rate_limit_bucket("2001:db8:1:2:ffff::1") == "2001:db8:1:2::/64"
+    assert rate_limit_bucket("203.0.113.7") == "203.0.113.7"
+    assert rate_limit_bucket("::ffff:203.0.113.7") == "203.0.113.7"
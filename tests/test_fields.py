@@ -0,0 +1,29 @@
+import pytest
+from fastcrud.exceptions.http_exceptions import BadRequestException
+
+from src.app.core.utils.fields import canonical_fields, sparse_schema
+from src.app.schemas.product import ProductRead
+
+
+def test_no_fields_selects_the_whole_schema() -> None:
+    assert sparse_schema(ProductRead, None) is ProductRead
+    assert sparse_schema(ProductRead, "") is ProductRead
+
+
+def test_requested_fields_and_id_are_selected() -> None:
+    schema = sparse_schema(ProductRead, "name, price,image")
+
+    assert set(schema.model_fields) == {"id", "name", "price", "image"}
+    assert sparse_schema(ProductRead, "image,price,name") is schema
+
+
+def test_fields_outside_the_schema_are_rejected() -> None:
+    with pytest.raises(BadRequestException):
+        sparse_schema(ProductRead, "name,is_deleted")
+
+
+def test_spellings_of_one_projection_share_a_canonical_form() -> None:
+    assert canonical_fields(ProductRead, "name,price") == "id,name,price"
+    assert canonical_fields(ProductRead, " price, name,price,id") == "id,name,price"
+    assert canonical_fields(ProductRead, None) is None
+    assert canonical_fields(ProductRead, ",".join(ProductRead.model_fields)) is None
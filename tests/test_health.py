@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from typing import Any
+
+import pytest
+from fastapi import Response
+
+from src.app.api.v1 import health as health_api
+from src.app.core.utils import health
+
+NOT_READY = {"ready": False, "dependencies": {"database": {"ok": False, "latency_ms": 1000.0, "error": "Timed out"}}}
+
+
+@pytest.fixture
+def checks(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    calls: list[int] = []
+
+    async def check_all() -> dict[str, Any]:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ready": True, "dependencies": {}}
+
+    monkeypatch.setattr(health, "_check_all", check_all)
+    monkeypatch.setattr(health, "_last_result", None)
+    monkeypatch.setattr(health, "_running", None)
+    return calls
+
+
+def test_results_are_reused_for_the_cache_interval(checks: list[int], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(health, "CACHE_SECONDS", 60)
+
+    async def run() -> None:
+        await health.check_readiness()
+        await health.check_readiness()
+
+    asyncio.run(run())
+    assert len(checks) == 1
+
+
+def test_concurrent_callers_share_one_round_of_probes(checks: list[int], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(health, "CACHE_SECONDS", 0)
+
+    async def run() -> list[dict[str, Any]]:
+        return await asyncio.gather(*(health.check_readiness() for _ in range(5)))
+
+    assert all(result["ready"] for result in asyncio.run(run()))
+    assert len(checks) == 1
+
+
+def test_a_hanging_storage_probe_is_not_started_again(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+    calls: list[str] = []
+
+    class HangingClient:
+        def head_bucket(self, Bucket: str) -> None:
+            calls.append(Bucket)
+            release.wait(5)
+
+    monkeypatch.setattr(health, "TIMEOUT", 0.05)
+    monkeypatch.setattr(health, "_storage_probe", None)
+    monkeypatch.setattr(health, "get_s3_probe_client", lambda timeout: HangingClient())
+
+    async def run() -> list[dict[str, Any]]:
+        results = [await health._probe(health._check_storage) for _ in range(3)]
+        release.set()
+        await health._storage_probe
+        return results
+
+    results = asyncio.run(run())
+    assert [result["ok"] for result in results] == [False, False, False]
+    assert len(calls) == 1
+
+
+def test_readiness_answers_503_when_a_dependency_is_down(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def check_readiness() -> dict[str, Any]:
+        return NOT_READY
+
+    monkeypatch.setattr(health_api, "check_readiness", check_readiness)
+    response = Response()
+
+    body = asyncio.run(health_api.readiness(response))
+
+    assert response.status_code == body.status_code == 503
+    assert response.headers["Cache-Control"] == "no-store"
+    assert body.data == NOT_READY["dependencies"]
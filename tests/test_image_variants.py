@@ -0,0 +1,68 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from src.app.core.utils.disk_cache import DiskLRUCache
+from src.app.service.external.s3_bucket import ObjectTooLargeError
+from src.app.service.utils import image_variants
+from src.app.service.utils.image_transform import UnsupportedImageError, transform_image
+
+
+class FakeS3:
+    source = b""
+
+    def download_image_from_s3(self, key: str, max_bytes: int | None = None) -> bytes:
+        if max_bytes is not None and len(self.source) > max_bytes:
+            raise ObjectTooLargeError(key)
+        return self.source
+
+
+@pytest.fixture
+def disk_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> DiskLRUCache:
+    cache = DiskLRUCache(str(tmp_path), 1024 * 1024)
+    monkeypatch.setattr(image_variants, "disk_cache", cache)
+    monkeypatch.setattr(image_variants, "S3Utils", FakeS3)
+    return cache
+
+
+def test_non_images_are_unsupported() -> None:
+    with pytest.raises(UnsupportedImageError):
+        transform_image(b"not an image", 160, "webp")
+
+
+def test_oversized_sources_fail_without_being_cached(disk_cache: DiskLRUCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(image_variants, "MAX_SOURCE_BYTES", 4)
+    monkeypatch.setattr(FakeS3, "source", b"0123456789")
+
+    with pytest.raises(image_variants.SourceTooLargeError):
+        asyncio.run(image_variants.get_variant("menu-card/a.jpg", 160, "webp"))
+
+    assert image_variants._in_flight == {}
+    assert disk_cache.get("menu-card/a.jpg|160|webp") is None
+
+
+def test_evicted_variants_are_rendered_again(disk_cache: DiskLRUCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = disk_cache.put("menu-card/a.jpg|160|webp", b"old")
+    os.remove(path)
+
+    async def render(variant: str, key: str, width: int, fmt: str) -> str:
+        return disk_cache.put(variant, b"new")
+
+    monkeypatch.setattr(image_variants, "_render_variant", render)
+    stat, content = asyncio.run(image_variants.read_variant("menu-card/a.jpg", 160, "webp"))
+
+    assert content == b"new" and stat.st_size == 3
+
+
+def test_processes_sharing_the_directory_stay_under_the_limit_together(tmp_path: Path) -> None:
+    first, second = DiskLRUCache(str(tmp_path), 10), DiskLRUCache(str(tmp_path), 10)
+
+    first.put("a", b"aaaa")
+    second.put("b", b"bbbb")
+    first.get("a")
+    second.put("c", b"cccc")
+
+    assert sum(entry.stat().st_size for entry in os.scandir(tmp_path)) <= 10
+    assert first.get("b") is None and first.get("a") is not None
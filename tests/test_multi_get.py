@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from src.app.core.utils import cache, multi_get
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.commands: list[tuple[str, bytes]] = []
+        self.members: list[tuple[str, str]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        pass
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.commands.append((key, value))
+
+    def sadd(self, key: str, *members: str) -> None:
+        self.members.extend((key, member) for member in members)
+
+    def expire(self, key: str, seconds: int) -> None:
+        pass
+
+    async def execute(self) -> None:
+        self.redis.store.update(self.commands)
+        for key, member in self.members:
+            self.redis.sets.setdefault(key, set()).add(member)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.mgets = 0
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        self.mgets += 1
+        return [self.store.get(key) for key in keys]
+
+    async def spop(self, key: str, count: int) -> list[str]:
+        members = self.sets.get(key, set())
+        return [members.pop() for _ in range(min(count, len(members)))]
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.store.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    client = FakeRedis()
+    monkeypatch.setattr(cache, "client", client)
+    return client
+
+
+def test_misses_are_loaded_once_backfilled_and_returned_in_request_order(redis: FakeRedis) -> None:
+    loads: list[list[int]] = []
+
+    async def load(ids: list[int]) -> dict[int, bytes]:
+        loads.append(ids)
+        return {id: json.dumps({"id": id}).encode() for id in ids if id != 404}
+
+    items = asyncio.run(multi_get.get_many("uuid", "products", [3, 404, 1, 3], load))
+    assert [json.loads(item) if item else None for item in items] == [{"id": 3}, None, {"id": 1}, {"id": 3}]
+    assert loads == [[3, 404, 1]]
+
+    items = asyncio.run(multi_get.get_many("uuid", "products", [1, 3], load))
+    assert [json.loads(item) for item in items] == [{"id": 1}, {"id": 3}]
+    assert loads == [[3, 404, 1]] and redis.mgets == 2
+
+
+def test_every_spelling_of_a_restaurant_uuid_shares_its_cache_keys(redis: FakeRedis) -> None:
+    restaurant_uuid = "0e1f7f3c-55a6-4b57-9f0c-2c4e6a0c8e11"
+
+    async def load(ids: list[int]) -> dict[int, bytes]:
+        return {id: json.dumps({"id": id}).encode() for id in ids}
+
+    asyncio.run(multi_get.get_many(restaurant_uuid.upper(), "products", [1], load))
+
+    assert list(redis.store) == [f"menu:{restaurant_uuid}:products_by_id:1"]
+    assert cache.canonical_uuid("0E1F7F3C55A64B579F0C2C4E6A0C8E11") == restaurant_uuid
+    assert cache.canonical_uuid("name,price") == "name,price" and cache.canonical_uuid(7) == 7
+
+
+def test_invalidating_a_menu_deletes_only_its_listed_keys(redis: FakeRedis) -> None:
+    restaurant_uuid = "0e1f7f3c-55a6-4b57-9f0c-2c4e6a0c8e11"
+    redis.store["menu:other:products_by_id:1"] = b"{}"
+
+    async def load(ids: list[int]) -> dict[int, bytes]:
+        return {id: json.dumps({"id": id}).encode() for id in ids}
+
+    asyncio.run(multi_get.get_many(restaurant_uuid, "products", [1, 2], load))
+    asyncio.run(cache.invalidate_menu_cache(restaurant_uuid.upper()))
+
+    assert list(redis.store) == ["menu:other:products_by_id:1"]
+    assert redis.sets[cache.menu_keys(restaurant_uuid)] == set()
+
+
+def test_render_embeds_items_in_the_envelope() -> None:
+    body = json.loads(multi_get.render("Products successfully fetched", [b'{"id":1}', None]))
+    assert body == {"status_code": 200, "message": "Products successfully fetched", "data": [{"id": 1}, None]}
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from src.app.core.utils import cache, profiler
+from src.app.middleware import profiler_middleware
+from src.app.middleware.profiler_middleware import PROFILE_ID_HEADER, ProfilerMiddleware, _is_flagged
+
+
+def make_scope(headers: list[tuple[bytes, bytes]] | None = None, query_string: bytes = b"") -> dict:
+    return {"type": "http", "headers": headers or [], "query_string": query_string}
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    async def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    async def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+
+async def endpoint(scope: dict, receive: Any, send: Any) -> None:
+    await asyncio.sleep(0.01)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(middleware: ProfilerMiddleware, scope: dict) -> dict[bytes, bytes]:
+    messages: list[dict] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    asyncio.run(middleware({**scope, "path": "/api/v1/menu"}, receive, send))
+    return dict(messages[0]["headers"])
+
+
+@pytest.fixture
+def redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    client = FakeRedis()
+    monkeypatch.setattr(cache, "client", client)
+    return client
+
+
+def superuser(is_superuser: bool) -> Any:
+    async def _is_superuser(scope: dict) -> bool:
+        return is_superuser
+
+    return _is_superuser
+
+
+def test_requests_without_the_flag_are_not_profiled() -> None:
+    assert not _is_flagged(make_scope())
+    assert not _is_flagged(make_scope(query_string=b"page=2&items_per_page=10"))
+    assert not _is_flagged(make_scope([(b"x-profile", b"0")]))
+    assert not _is_flagged(make_scope(query_string=b"profile=false"))
+
+
+def test_header_or_query_flag_asks_for_a_profile() -> None:
+    assert _is_flagged(make_scope([(b"x-profile", b"1")]))
+    assert _is_flagged(make_scope(query_string=b"page=2&profile=1"))
+
+
+def test_flagged_requests_of_other_users_are_not_profiled(redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profiler_middleware, "_is_superuser", superuser(False))
+    middleware = ProfilerMiddleware(endpoint)
+    middleware.profiler_class = lambda **kwargs: pytest.fail("a non superuser's request was profiled")
+
+    headers = call(middleware, make_scope([(b"x-profile", b"1")]))
+
+    assert PROFILE_ID_HEADER not in headers
+    assert redis.values == {}
+
+
+def test_flagged_superuser_requests_store_a_readable_profile(redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("pyinstrument")
+    monkeypatch.setattr(profiler_middleware, "_is_superuser", superuser(True))
+
+    headers = call(ProfilerMiddleware(endpoint), make_scope(query_string=b"profile=1"))
+
+    session = asyncio.run(profiler.get_profile(headers[PROFILE_ID_HEADER].decode()))
+    assert session is not None and session.duration > 0
@@ -0,0 +1,35 @@
+import inspect
+import json
+from datetime import UTC, datetime
+
+from src.app.core.schemas import ResponseSchema
+from src.app.core.utils.cache import _serialize
+from src.app.schemas.product import ProductRead
+
+ROW = {
+    "id": 1,
+    "category_id": 2,
+    "name": "Margherita",
+    "description": None,
+    "image": None,
+    "created_by_user_id": 3,
+    "created_at": datetime(2024, 5, 1, 12, tzinfo=UTC),
+    "price": 1200,
+    "stock_available": True,
+    "is_deleted": False,
+}
+
+
+def test_typed_envelope_serializes_only_the_read_schema() -> None:
+    response = ResponseSchema(message="Product successfully fetched", data=[ROW])
+    body = json.loads(_serialize(response, ResponseSchema[list[ProductRead]]))
+
+    assert body["message"] == "Product successfully fetched"
+    assert body["data"] == [
+        {key: value for key, value in ROW.items() if key != "is_deleted"} | {"created_at": "2024-05-01T12:00:00Z"}
+    ]
+
+
+def test_unannotated_endpoints_fall_back_to_jsonable_encoder() -> None:
+    body = _serialize({"created_at": ROW["created_at"]}, inspect.Signature.empty)
+    assert json.loads(body) == {"created_at": "2024-05-01T12:00:00+00:00"}
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.app.core.db import slow_query_log
+from src.app.core.db.database import DATABASE_URL
+from src.app.core.db.slow_query_log import fingerprint, normalize, parameter_shape
+
+
+def test_statements_differing_only_in_values_share_a_fingerprint() -> None:
+    first = normalize("SELECT * FROM product WHERE id IN ($1::INTEGER, $2::INTEGER) AND name = 'x' LIMIT 10")
+    second = normalize("SELECT *\n  FROM product WHERE id IN ($1::INTEGER) AND name = 'it''s' LIMIT 20")
+
+    assert first == "SELECT * FROM product WHERE id IN (?, ...) AND name = ? LIMIT ?"
+    assert second == "SELECT * FROM product WHERE id IN (?) AND name = ? LIMIT ?"
+    third, fourth = normalize("SELECT 1 FROM t WHERE a = 2"), normalize("SELECT 3 FROM t WHERE a = 4")
+    assert fingerprint(third) == fingerprint(fourth)
+
+
+def test_casts_on_columns_are_kept() -> None:
+    assert normalize("SELECT x::text FROM t WHERE y = :y") == "SELECT x::text FROM t WHERE y = ?"
+
+
+def test_parameter_shapes_hide_values() -> None:
+    assert parameter_shape((3, "pizza", [1, 2])) == ["int", "str", "list[2]"]
+    assert parameter_shape({"name": "pizza"}) == {"name": "str"}
+    assert parameter_shape([(1, "a"), (2, "b")], many=True) == {"executemany": 2, "rows": ["int", "str"]}
+
+
+def test_statements_past_the_threshold_are_recorded_from_a_real_engine(monkeypatch: pytest.MonkeyPatch) -> None:
+    recorded: list[tuple[str, float, str | None]] = []
+
+    async def record(engine: Any, statement: str, parameters: Any, many: bool, elapsed_ms: float, route: Any) -> None:
+        recorded.append((statement, elapsed_ms, route))
+
+    monkeypatch.setattr(slow_query_log, "THRESHOLD", 0)
+    monkeypatch.setattr(slow_query_log, "_record", record)
+
+    async def run() -> None:
+        engine = create_async_engine(DATABASE_URL)
+        slow_query_log.instrument(engine)
+        slow_query_log.instrument(engine)
+        slow_query_log.current_route.set("/api/v1/menu/{restaurant_uuid}")
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await asyncio.gather(*slow_query_log._tasks)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+    statements = [statement for statement, _, _ in recorded]
+    assert statements.count("SELECT 1") == 1
+    assert all(route == "/api/v1/menu/{restaurant_uuid}" for statement, _, route in recorded if statement == "SELECT 1")
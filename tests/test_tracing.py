@@ -0,0 +1,86 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.app.core import tracing
+from src.app.core.db.database import DATABASE_URL
+
+
+@pytest.fixture
+def exporter(monkeypatch: pytest.MonkeyPatch) -> Iterator[tracing.InMemoryExporter]:
+    monkeypatch.setattr(tracing, "SAMPLE_RATE", 1.0)
+    exporter = tracing.InMemoryExporter()
+    tracing.configure(exporter)
+    yield exporter
+    tracing.shutdown()
+
+
+def test_client_spans_are_children_of_the_server_span(exporter: tracing.InMemoryExporter) -> None:
+    with tracing.start_span("GET /menu", "server") as server:
+        with tracing.start_span("SELECT", "client"):
+            pass
+
+    child, root = exporter.spans
+    assert root["spanId"] == server.span_id and root["parentSpanId"] is None
+    assert child["traceId"] == root["traceId"] and child["parentSpanId"] == root["spanId"]
+
+
+def test_statements_of_an_instrumented_engine_are_children_of_the_server_span(
+    exporter: tracing.InMemoryExporter,
+) -> None:
+    async def run() -> None:
+        engine = create_async_engine(DATABASE_URL)
+        tracing.instrument_sqlalchemy(engine)
+        tracing.instrument_sqlalchemy(engine)
+        try:
+            with tracing.start_span("GET /menu", "server"):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+    root = exporter.spans[-1]
+    [statement] = [span for span in exporter.spans if span["attributes"].get("db.statement") == "SELECT 1"]
+    assert statement["parentSpanId"] == root["spanId"] and statement["traceId"] == root["traceId"]
+
+
+def test_client_spans_outside_a_trace_are_not_recorded(exporter: tracing.InMemoryExporter) -> None:
+    with tracing.start_span("SELECT", "client") as span:
+        assert span is None
+    assert exporter.spans == []
+
+
+def test_remote_traceparent_is_continued_unless_unsampled(exporter: tracing.InMemoryExporter) -> None:
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    with tracing.start_span("arq job", "consumer", traceparent=f"00-{trace_id}-{parent_id}-01"):
+        pass
+    with tracing.start_span("arq job", "consumer", traceparent=f"00-{trace_id}-{parent_id}-00") as span:
+        assert span is None
+
+    [span] = exporter.spans
+    assert span["traceId"] == trace_id and span["parentSpanId"] == parent_id
+
+
+def test_errors_are_recorded_on_the_span(exporter: tracing.InMemoryExporter) -> None:
+    with pytest.raises(ValueError):
+        with tracing.start_span("job", "consumer"):
+            raise ValueError("boom")
+
+    assert exporter.spans[0]["status"] == {"code": "ERROR", "message": "ValueError: boom"}
+
+
+def test_traced_job_continues_the_enqueuing_trace(exporter: tracing.InMemoryExporter) -> None:
+    @tracing.traced_job
+    async def job(ctx: dict, name: str) -> str:
+        return name
+
+    with tracing.start_span("POST /tasks/task", "server") as server:
+        traceparent = server.traceparent
+
+    assert asyncio.run(job({"job_id": "1", "job_try": 1}, "x", trace_context=traceparent)) == "x"
+    assert exporter.spans[-1]["parentSpanId"] == server.span_id
@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+import pytest
+
+from src.app.core.utils import typeahead
+from src.app.core.utils.typeahead import CATEGORY, PRODUCT, PrefixIndex, normalize
+
+
+def test_normalize() -> None:
+    assert normalize("  Crème   Brûlée ") == "creme brulee"
+
+
+def test_search_matches_any_word_prefix() -> None:
+    index = PrefixIndex([(PRODUCT, 1, "Chicken Tikka"), (PRODUCT, 2, "Paneer Tikka"), (CATEGORY, 1, "Starters")])
+
+    assert [item["id"] for item in index.search("tik")] == [1, 2]
+    assert index.search("STAR") == [{"type": "category", "id": 1, "name": "Starters"}]
+    assert index.search("xyz") == []
+    assert index.search("") == []
+
+
+def test_search_respects_limit() -> None:
+    index = PrefixIndex([(PRODUCT, i, f"Dosa {i}") for i in range(10)])
+
+    assert len(index.search("dosa", limit=3)) == 3
+
+
+def test_incremental_updates() -> None:
+    index = PrefixIndex([(PRODUCT, 1, "Masala Dosa")])
+
+    index.upsert(PRODUCT, 1, "Ghee Roast")
+    assert index.search("masala") == []
+    assert index.search("roast") == [{"type": "product", "id": 1, "name": "Ghee Roast"}]
+
+    index.upsert(CATEGORY, 1, "Roasts")
+    assert [item["type"] for item in index.search("roast")] == ["product", "category"]
+
+    index.discard(PRODUCT, 1)
+    assert index.search("ghee") == []
+    assert len(index) == 1
+
+
+def test_updates_reach_the_index_whatever_the_uuid_spelling(monkeypatch: pytest.MonkeyPatch) -> None:
+    uuid = "0e1f7f3c-55a6-4b57-9f0c-2c4e6a0c8e11"
+    monkeypatch.setattr(typeahead, "_indexes", OrderedDict({uuid: PrefixIndex([(PRODUCT, 1, "Masala Dosa")])}))
+
+    typeahead.upsert(uuid.upper(), PRODUCT, 2, "Ghee Roast")
+    typeahead.discard(uuid.replace("-", ""), PRODUCT, 1)
+
+    assert typeahead._indexes[uuid].search("dosa") == []
+    assert typeahead._indexes[uuid].search("ghee") == [{"type": "product", "id": 2, "name": "Ghee Roast"}]